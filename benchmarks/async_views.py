@@ -0,0 +1,235 @@
+"""Пропускная способность лент: синхронные view под WSGI против async под ASGI.
+
+Запросы подаются прямо в WSGIHandler и ASGIHandler без сетевого
+сервера. WSGI обслуживает их пулом из --threads потоков, как
+gunicorn с gthread; под ASGI столько же потоков получает пул, в котором
+async_views выполняют запросы к базе. --db-latency добавляет задержку
+к каждому SQL-запросу, имитируя базу по сети, — именно тогда
+параллельные запросы внутри одной страницы дают выигрыш.
+
+    python benchmarks/async_views.py --concurrency 200 --db-latency 2
+"""
+import argparse
+import asyncio
+import io
+import json
+import multiprocessing
+import random
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from wsgiref.util import setup_testing_defaults
+
+from common import percentiles, setup_django
+
+MODES = ('wsgi', 'asgi')
+N_POSTS = 1000
+N_COMMENTS = 5000
+
+
+def configure(db_path, mode, db_latency, migrate=False):
+    setup_django(
+        db_path,
+        migrate,
+        BLOG_ASYNC_VIEWS=mode == 'asgi',
+        CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+        }},
+    )
+    if db_latency:
+        from django.db.backends.signals import connection_created
+
+        def delay(execute, sql, params, many, context):
+            time.sleep(db_latency / 1000)
+            return execute(sql, params, many, context)
+
+        def add_delay(connection, **kwargs):
+            connection.execute_wrappers.append(delay)
+
+        connection_created.connect(add_delay, weak=False)
+
+
+def seed(db_path):
+    configure(db_path, 'wsgi', 0, migrate=True)
+    from django.utils import timezone
+
+    from blog.category_feed import rebuild_feeds
+    from blog.models import Category, Comment, Location, Post, User
+
+    author = User.objects.create(username='bench')
+    category = Category.objects.create(title='bench', slug='bench')
+    location = Location.objects.create(name='bench')
+    now = timezone.now()
+    Post.objects.bulk_create(
+        Post(
+            title=f'Пост {number}',
+            text='Текст публикации. ' * 20,
+            pub_date=now - timezone.timedelta(minutes=number),
+            updated_at=now,
+            is_visible=True,
+            author=author,
+            category=category,
+            location=location,
+        )
+        for number in range(N_POSTS)
+    )
+    Comment.objects.bulk_create(
+        Comment(
+            text='Комментарий',
+            post_id=number % N_POSTS + 1,
+            author=author,
+        )
+        for number in range(N_COMMENTS)
+    )
+    rebuild_feeds()
+
+
+def request_paths():
+    pages = ['/', '/?page=3', '/category/bench/', '/profile/bench/']
+    while True:
+        yield from pages
+        yield f'/posts/{random.randint(1, N_POSTS)}/'
+
+
+def wsgi_get(application, path, submitted):
+    path, _, query = path.partition('?')
+    environ = {
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'wsgi.input': io.BytesIO(),
+    }
+    setup_testing_defaults(environ)
+    status = []
+    body = application(environ, lambda code, headers: status.append(code))
+    b''.join(body)
+    body.close()
+    return time.perf_counter() - submitted, status[0].startswith('200')
+
+
+def run_wsgi(concurrency, threads, duration):
+    from django.core.wsgi import get_wsgi_application
+
+    application = get_wsgi_application()
+    paths = request_paths()
+    results = []
+    deadline = time.perf_counter() + duration
+    with ThreadPoolExecutor(threads) as pool:
+        pending = {
+            pool.submit(wsgi_get, application, next(paths),
+                        time.perf_counter())
+            for _ in range(concurrency)
+        }
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                results.append(future.result())
+                if time.perf_counter() < deadline:
+                    pending.add(pool.submit(
+                        wsgi_get, application, next(paths),
+                        time.perf_counter()
+                    ))
+    return results
+
+
+async def asgi_get(application, path):
+    path, _, query = path.partition('?')
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query.encode(),
+        'root_path': '',
+        'headers': [(b'host', b'testserver')],
+        'client': ('127.0.0.1', 40000),
+        'server': ('testserver', 80),
+    }
+    status = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            status.append(message['status'])
+
+    started = time.perf_counter()
+    await application(scope, receive, send)
+    return time.perf_counter() - started, status[0] == 200
+
+
+def run_asgi(concurrency, threads, duration):
+    from django.core.asgi import get_asgi_application
+
+    application = get_asgi_application()
+    paths = request_paths()
+    results = []
+    deadline = time.perf_counter() + duration
+
+    async def client():
+        while time.perf_counter() < deadline:
+            results.append(await asgi_get(application, next(paths)))
+
+    async def main():
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(threads)
+        )
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+
+    asyncio.run(main())
+    return results
+
+
+def measure(db_path, mode, concurrency, threads, duration, db_latency):
+    configure(db_path, mode, db_latency)
+    run = run_asgi if mode == 'asgi' else run_wsgi
+    run(concurrency, threads, 1)
+    results = run(concurrency, threads, duration)
+    latencies = [latency * 1000 for latency, _ in results]
+    return {
+        'mode': mode,
+        'concurrency': concurrency,
+        'threads': threads,
+        'db_latency_ms': db_latency,
+        'requests': len(results),
+        'rps': round(len(results) / duration, 1),
+        'errors': sum(not ok for _, ok in results),
+        'latency_ms': {
+            name: round(value, 1)
+            for name, value in percentiles(latencies).items()
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--db-latency', type=float, default=2,
+                        help='Задержка каждого SQL-запроса, мс.')
+    args = parser.parse_args()
+    context = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / 'bench.sqlite3'
+        with context.Pool(1) as pool:
+            pool.apply(seed, (db_path,))
+        for mode in MODES:
+            with context.Pool(1) as pool:
+                result = pool.apply(measure, (
+                    db_path,
+                    mode,
+                    args.concurrency,
+                    args.threads,
+                    args.duration,
+                    args.db_latency,
+                ))
+            print(json.dumps(result, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""Общая настройка Django для скриптов из benchmarks/.
+
+Каждый скрипт работает со своей временной SQLite-базой, чтобы не трогать
+db.sqlite3 проекта.
+"""
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'blogicum'))
+
+
+def setup_django(db_path, migrate=True, db_options=None, **overrides):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
+    from django.conf import settings
+
+    settings.DATABASES['default']['NAME'] = str(db_path)
+    settings.DATABASES['default'].update(db_options or {})
+    settings.ALLOWED_HOSTS = ['*']
+    settings.DEBUG = False
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+
+    import django
+    django.setup()
+    if migrate:
+        from django.core.management import call_command
+        call_command('migrate', verbosity=0)
+
+
+def percentiles(samples):
+    if not samples:
+        return {'p50': 0, 'p95': 0, 'p99': 0, 'max': 0}
+    ordered = sorted(samples)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return {
+        'p50': statistics.median(ordered),
+        'p95': pick(0.95),
+        'p99': pick(0.99),
+        'max': ordered[-1],
+    }
+
+
+class Timer:
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
@@ -0,0 +1,265 @@
+"""Лента подписок: раскладка при записи против выборки при чтении.
+
+Читатель подписан на --authors обычных авторов и на --celebrities
+популярных, у каждого из которых ещё --fans подписчиков. Сравниваются
+три значения FEED_FANOUT_LIMIT:
+
+* read — 0: все посты выбираются при чтении ленты;
+* write — без ограничения: все посты лежат во входящих;
+* hybrid — --fanout-limit: популярные авторы читаются при чтении, у
+  остальных посты раскладываются при публикации.
+
+Для каждой стратегии меряется первая и глубокие страницы ленты, число
+запросов на страницу, публикация поста обычным и популярным автором и
+размер входящих.
+
+    python benchmarks/follow_feed.py --authors 1000 --fans 5000
+"""
+import argparse
+import json
+import multiprocessing
+import shutil
+import tempfile
+from pathlib import Path
+
+from common import Timer, percentiles, setup_django
+
+BATCH_SIZE = 5000
+FEED_REPEATS = 200
+DEEP_PAGES = 20
+PUBLISHES = 50
+
+
+def configure(db_path, fanout_limit=None, migrate=False):
+    overrides = {}
+    if fanout_limit is not None:
+        overrides['FEED_FANOUT_LIMIT'] = fanout_limit
+    setup_django(
+        db_path,
+        migrate,
+        CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+        }},
+        **overrides,
+    )
+
+
+def seed(db_path, authors, celebrities, fans, posts_per_author):
+    configure(db_path, migrate=True)
+    from django.db import connection
+    from django.utils import timezone
+
+    from blog.models import Category, Location, Post, User
+
+    category = Category.objects.create(title='bench', slug='bench')
+    location = Location.objects.create(name='bench')
+    User.objects.bulk_create(
+        [User(username='reader')]
+        + [User(username=f'author{number}') for number in range(authors)]
+        + [User(username=f'star{number}') for number in range(celebrities)]
+        + [User(username=f'fan{number}') for number in range(fans)],
+        batch_size=BATCH_SIZE,
+    )
+    writers = User.objects.filter(
+        username__regex=r'^(author|star)'
+    ).values_list('pk', flat=True)
+    now = timezone.now()
+    posts = []
+    for number, author_id in enumerate(writers):
+        for minute in range(posts_per_author):
+            posts.append(Post(
+                title='Пост',
+                text='Текст публикации.',
+                pub_date=now - timezone.timedelta(
+                    minutes=minute * len(writers) + number
+                ),
+                updated_at=now,
+                is_visible=True,
+                author_id=author_id,
+                category=category,
+                location=location,
+            ))
+    Post.objects.bulk_create(posts, batch_size=BATCH_SIZE)
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
+
+def follow_pairs():
+    """Подписки в порядке оформления: сначала фанаты, потом читатель."""
+    from blog.models import User
+
+    users = dict(User.objects.values_list('username', 'pk'))
+    stars = [pk for name, pk in users.items() if name.startswith('star')]
+    for name, pk in users.items():
+        if name.startswith('fan'):
+            for star in stars:
+                yield pk, star
+    reader = users['reader']
+    for name, pk in users.items():
+        if name.startswith('author'):
+            yield reader, pk
+    for star in stars:
+        yield reader, star
+
+
+def fill_follows(fanout_limit):
+    """То же, что follow() для каждой пары, но пачками."""
+    from collections import Counter
+
+    from django.db import connection
+
+    from blog.models import FeedInboxEntry, Follow, Post
+
+    fanned_out = Counter()
+    follows = []
+    for user_id, author_id in follow_pairs():
+        fanout = fanned_out[author_id] < fanout_limit
+        fanned_out[author_id] += fanout
+        follows.append(
+            Follow(user_id=user_id, author_id=author_id, fanout=fanout)
+        )
+    Follow.objects.bulk_create(follows, batch_size=BATCH_SIZE)
+    inbox = FeedInboxEntry._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {inbox} (user_id, post_id, author_id, pub_date) '
+            'SELECT f.user_id, p.id, p.author_id, p.pub_date '
+            f'FROM {Follow._meta.db_table} f '
+            f'JOIN {Post._meta.db_table} p ON p.author_id = f.author_id '
+            'WHERE f.fanout AND p.is_published'
+        )
+
+
+def rounded(samples):
+    return {
+        name: round(value, 2)
+        for name, value in percentiles(samples).items()
+    }
+
+
+def feed_latency(reader):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from blog.get_objects import posts_by_ids, subscription_sources
+    from blog.paginator_for_posts import merged_page
+
+    def page(params):
+        return merged_page(
+            subscription_sources(reader), params, posts_by_ids
+        )
+
+    first = []
+    for _ in range(FEED_REPEATS):
+        with Timer() as timer:
+            page({})
+        first.append(timer.elapsed * 1000)
+    deep = []
+    params = {}
+    for _ in range(DEEP_PAGES):
+        with Timer() as timer:
+            result = page(params)
+        deep.append(timer.elapsed * 1000)
+        params = {'after': result.next_cursor}
+    with CaptureQueriesContext(connection) as queries:
+        page({})
+    return {
+        'first_page_ms': rounded(first),
+        'deep_pages_ms': rounded(deep),
+        'queries_per_page': len(queries),
+    }
+
+
+def publish_latency(username):
+    from django.utils import timezone
+
+    from blog.models import Category, FeedInboxEntry, Location, Post, User
+
+    author = User.objects.get(username=username)
+    category = Category.objects.get(slug='bench')
+    location = Location.objects.get()
+    before = FeedInboxEntry.objects.count()
+    samples = []
+    for _ in range(PUBLISHES):
+        with Timer() as timer:
+            Post.objects.create(
+                title='Новый пост',
+                text='Текст публикации.',
+                pub_date=timezone.now(),
+                author=author,
+                category=category,
+                location=location,
+            )
+        samples.append(timer.elapsed * 1000)
+    written = FeedInboxEntry.objects.count() - before
+    return {
+        'latency_ms': rounded(samples),
+        'inbox_rows_per_post': written // PUBLISHES,
+    }
+
+
+def measure(template, db_path, strategy, fanout_limit):
+    shutil.copy(template, db_path)
+    configure(db_path, fanout_limit)
+    from blog.models import FeedInboxEntry, Follow, User
+
+    with Timer() as timer:
+        fill_follows(fanout_limit)
+    reader = User.objects.get(username='reader')
+    result = {
+        'strategy': strategy,
+        'fanout_limit': fanout_limit,
+        'fill_s': round(timer.elapsed, 2),
+        'inbox_rows': FeedInboxEntry.objects.count(),
+        'reader_inbox_rows': FeedInboxEntry.objects.filter(
+            user=reader
+        ).count(),
+        'reader_on_read_authors': Follow.objects.filter(
+            user=reader, fanout=False
+        ).count(),
+        'feed': feed_latency(reader),
+        'publish_regular': publish_latency('author0'),
+        'publish_celebrity': publish_latency('star0'),
+    }
+    result['feed_after_publish'] = feed_latency(reader)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--authors', type=int, default=1000)
+    parser.add_argument('--celebrities', type=int, default=10)
+    parser.add_argument('--fans', type=int, default=5000)
+    parser.add_argument('--posts-per-author', type=int, default=20)
+    parser.add_argument('--fanout-limit', type=int, default=1000,
+                        help='FEED_FANOUT_LIMIT гибридной стратегии.')
+    args = parser.parse_args()
+    context = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as tmp:
+        template = Path(tmp) / 'template.sqlite3'
+        with context.Pool(1) as pool:
+            pool.apply(seed, (
+                template,
+                args.authors,
+                args.celebrities,
+                args.fans,
+                args.posts_per_author,
+            ))
+        strategies = {
+            'read': 0,
+            'write': args.fans + 1,
+            'hybrid': args.fanout_limit,
+        }
+        for strategy, fanout_limit in strategies.items():
+            with context.Pool(1) as pool:
+                result = pool.apply(measure, (
+                    template,
+                    Path(tmp) / f'{strategy}.sqlite3',
+                    strategy,
+                    fanout_limit,
+                ))
+            print(json.dumps(result, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
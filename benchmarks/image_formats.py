@@ -0,0 +1,125 @@
+"""Сколько байт экономят превью и WebP/AVIF на постах из db.json.
+
+В фикстуре у постов нет картинок, поэтому каждому посту прикрепляется
+синтетическая «фотография»: чередуются JPEG с камеры 4000x3000 и
+PNG-скриншоты 1600x1200. Затем для всех строятся превью так же, как
+после загрузки через форму, и сравниваются размеры файлов.
+
+    python benchmarks/image_formats.py --limit 10
+"""
+import argparse
+import json
+import random
+import tempfile
+from io import BytesIO
+from pathlib import Path
+
+from common import ROOT, setup_django
+
+FEED_PAGE_SIZE = 10
+
+
+def synthetic_image(seed):
+    from PIL import Image, ImageChops, ImageFilter
+
+    rng = random.Random(seed)
+    photo = seed % 2 == 0
+    size = (4000, 3000) if photo else (1600, 1200)
+    extent = (
+        rng.uniform(-2.0, -1.0),
+        rng.uniform(-1.0, -0.5),
+        rng.uniform(0.0, 0.5),
+        rng.uniform(0.5, 1.0),
+    )
+    shapes = Image.effect_mandelbrot(
+        (size[0] // 4, size[1] // 4), extent, 60
+    ).resize(size, Image.Resampling.BICUBIC)
+    gradient = Image.linear_gradient('L').resize(size)
+    noise = Image.effect_noise(size, 24 if photo else 4)
+    image = Image.merge('RGB', (
+        shapes,
+        ImageChops.blend(gradient, noise, 0.3),
+        ImageChops.blend(shapes.filter(ImageFilter.BLUR), noise, 0.2),
+    ))
+    buffer = BytesIO()
+    if photo:
+        image.save(buffer, 'JPEG', quality=92)
+        return f'fixture_{seed}.jpg', buffer.getvalue()
+    image.save(buffer, 'PNG')
+    return f'fixture_{seed}.png', buffer.getvalue()
+
+
+def attach_images(limit=None):
+    from django.core.files.base import ContentFile
+    from django.core.files.storage import default_storage
+
+    from blog.models import Post
+
+    names = []
+    posts = Post.objects.order_by('pk').values_list('pk', flat=True)
+    for pk in posts[:limit]:
+        filename, content = synthetic_image(pk)
+        name = default_storage.save(
+            f'posts_images/{filename}', ContentFile(content)
+        )
+        Post.objects.filter(pk=pk).update(image=name)
+        names.append(name)
+    return names
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--limit', type=int, default=None,
+                        help='Сколько постов взять, по умолчанию все.')
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(Path(tmp) / 'bench.sqlite3', MEDIA_ROOT=Path(tmp))
+        from django.core.files.storage import default_storage
+        from django.core.management import call_command
+
+        from blog.thumbnails import (
+            RENDITIONS,
+            available_formats,
+            make_renditions,
+            rendition_name,
+        )
+
+        call_command('loaddata', ROOT / 'db.json', verbosity=0)
+        names = attach_images(args.limit)
+        for name in names:
+            make_renditions(name)
+        extensions = available_formats()
+
+        def total(rendition=None, extension=None, images=names):
+            return sum(
+                default_storage.size(
+                    rendition_name(name, rendition, extension)
+                    if rendition else name
+                )
+                for name in images
+            )
+
+        original = total()
+        result = {
+            'posts': len(names),
+            'formats': ['original', *extensions],
+            'original_bytes': original,
+        }
+        for rendition in RENDITIONS:
+            for extension in (None, *extensions):
+                size = total(rendition, extension)
+                result[f'{rendition}_{extension or "original"}_bytes'] = size
+        feed_page = names[:FEED_PAGE_SIZE]
+        best = extensions[0] if extensions else None
+        before = total(images=feed_page)
+        after = total('thumb', best, feed_page)
+        result['feed_page'] = {
+            'before_bytes': before,
+            'after_bytes': after,
+            'saved_percent': round(100 * (1 - after / before), 1),
+        }
+        print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
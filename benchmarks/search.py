@@ -0,0 +1,185 @@
+"""Задержка полнотекстового поиска на 100 000 постов.
+
+Тексты постов собираются из слов постов db.json с частотами по закону
+Ципфа, как в настоящих текстах. Сравниваются индекс FTS5 и
+инвертированный индекс в памяти, который используется без FTS5: время
+построения, задержка запросов из одного, двух и трёх слов, полный
+ответ /search/ и обновление индекса при сохранении поста.
+
+    python benchmarks/search.py --posts 100000
+"""
+import argparse
+import json
+import random
+import re
+import tempfile
+import time
+from pathlib import Path
+
+from common import ROOT, Timer, percentiles, setup_django
+
+WORDS_PER_POST = (30, 120)
+WORDS_PER_TITLE = (2, 6)
+QUERIES_PER_KIND = 100
+UPDATES = 200
+BATCH_SIZE = 5000
+
+
+def fixture_words():
+    from blog.stemming import STOP_WORDS
+
+    posts = json.loads((ROOT / 'db.json').read_text())
+    text = ' '.join(
+        f'{item["fields"]["title"]} {item["fields"]["text"]}'
+        for item in posts if item['model'] == 'blog.post'
+    )
+    words = set(re.findall(r'[а-яё]{3,}', text.lower()))
+    return sorted(word for word in words if word not in STOP_WORDS)
+
+
+def zipf_weights(count):
+    return [1 / rank for rank in range(1, count + 1)]
+
+
+def seed(count, words, rng):
+    from django.utils import timezone
+
+    from blog.models import Category, Location, Post, User
+
+    author = User.objects.create(username='bench')
+    category = Category.objects.create(title='bench', slug='bench')
+    location = Location.objects.create(name='bench')
+    weights = zipf_weights(len(words))
+    now = timezone.now()
+
+    def text(bounds):
+        return ' '.join(rng.choices(words, weights, k=rng.randint(*bounds)))
+
+    for start in range(0, count, BATCH_SIZE):
+        Post.objects.bulk_create(
+            Post(
+                title=text(WORDS_PER_TITLE).capitalize(),
+                text=text(WORDS_PER_POST).capitalize() + '.',
+                pub_date=now - timezone.timedelta(minutes=number),
+                updated_at=now,
+                is_visible=True,
+                author=author,
+                category=category,
+                location=location,
+            )
+            for number in range(start, min(start + BATCH_SIZE, count))
+        )
+
+
+def make_queries(words, rng):
+    frequent = words[:50]
+    return {
+        'one_frequent': [
+            rng.choice(frequent) for _ in range(QUERIES_PER_KIND)
+        ],
+        'one_rare': [
+            rng.choice(words[len(words) // 2:])
+            for _ in range(QUERIES_PER_KIND)
+        ],
+        'two_words': [
+            ' '.join(rng.sample(frequent, 2)) for _ in range(QUERIES_PER_KIND)
+        ],
+        'three_words': [
+            ' '.join(rng.sample(words[:200], 3))
+            for _ in range(QUERIES_PER_KIND)
+        ],
+    }
+
+
+def latency(func, queries):
+    """func возвращает число найденных постов."""
+    samples = []
+    found = 0
+    for query in queries:
+        started = time.perf_counter()
+        found += func(query)
+        samples.append((time.perf_counter() - started) * 1000)
+    return {
+        'avg_found': round(found / len(queries), 1),
+        'latency_ms': {
+            name: round(value, 2)
+            for name, value in percentiles(samples).items()
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=100_000)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(
+            Path(tmp) / 'bench.sqlite3',
+            CACHES={'default': {
+                'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+            }},
+        )
+        from django.db import connection
+        from django.test import Client
+
+        from blog.models import Post
+        from blog.search import (
+            SEARCH_LIMIT,
+            MemoryIndex,
+            fill_search_table,
+            fts_search,
+            index_post,
+            query_terms,
+        )
+        from blog.stemming import stem
+        words = fixture_words()
+        rng.shuffle(words)
+        seed(args.posts, words, rng)
+        queries = make_queries(words, rng)
+        result = {'posts': args.posts, 'vocabulary': len(words)}
+
+        stem.cache_clear()
+        with Timer() as timer:
+            fill_search_table(connection, Post.objects.all())
+        result['fts5_build_s'] = round(timer.elapsed, 2)
+        memory = MemoryIndex()
+        with Timer() as timer:
+            memory.fill(Post.objects.all())
+        result['memory_build_s'] = round(timer.elapsed, 2)
+
+        client = Client()
+        backends = {
+            'fts5': lambda query: len(fts_search(
+                connection, query_terms(query), SEARCH_LIMIT
+            )),
+            'memory': lambda query: len(memory.search(
+                query_terms(query), SEARCH_LIMIT
+            )),
+            'search_page': lambda query: client.get(
+                '/search/', {'q': query}
+            ).content.count(b'<article'),
+        }
+        for name, func in backends.items():
+            result[name] = {
+                kind: latency(func, kind_queries)
+                for kind, kind_queries in queries.items()
+            }
+
+        posts = list(Post.objects.order_by('?')[:UPDATES])
+        samples = []
+        for post in posts:
+            post.text += ' ' + rng.choice(words)
+            with Timer() as timer:
+                index_post(post)
+            samples.append(timer.elapsed * 1000)
+        result['fts5_update_ms'] = {
+            name: round(value, 2)
+            for name, value in percentiles(samples).items()
+        }
+        print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
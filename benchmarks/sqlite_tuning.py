@@ -0,0 +1,122 @@
+"""Пропускная способность SQLite с настройками blog.sqlite и без них.
+
+Несколько процессов-клиентов одновременно читают ленту и пишут
+комментарии в общую базу. После каждой операции вызывается
+close_old_connections(), как в конце запроса, поэтому CONN_MAX_AGE
+тоже влияет на результат.
+
+    python benchmarks/sqlite_tuning.py --clients 8 --duration 10
+"""
+import argparse
+import json
+import multiprocessing
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from common import setup_django
+
+MODES = {
+    'baseline': {'SQLITE_PRAGMAS': {}, 'CONN_MAX_AGE': 0},
+    'tuned': {'SQLITE_PRAGMAS': None, 'CONN_MAX_AGE': 600},
+}
+N_POSTS = 1000
+
+
+def configure(db_path, mode, migrate=False):
+    overrides = dict(MODES[mode])
+    db_options = {'CONN_MAX_AGE': overrides.pop('CONN_MAX_AGE')}
+    if overrides['SQLITE_PRAGMAS'] is None:
+        del overrides['SQLITE_PRAGMAS']
+    setup_django(db_path, migrate, db_options, **overrides)
+
+
+def seed(db_path, mode):
+    configure(db_path, mode, migrate=True)
+    from django.utils import timezone
+
+    from blog.models import Category, Location, Post, User
+
+    author = User.objects.create(username='bench')
+    category = Category.objects.create(title='bench', slug='bench')
+    location = Location.objects.create(name='bench')
+    now = timezone.now()
+    Post.objects.bulk_create(
+        Post(
+            title=f'Пост {number}',
+            text='Текст публикации. ' * 20,
+            pub_date=now - timezone.timedelta(minutes=number),
+            updated_at=now,
+            is_visible=True,
+            author=author,
+            category=category,
+            location=location,
+        )
+        for number in range(N_POSTS)
+    )
+
+
+def client(db_path, mode, duration, write_ratio):
+    configure(db_path, mode)
+    from django.db import OperationalError, close_old_connections
+
+    from blog.get_objects import post_with_filters
+    from blog.models import Comment
+
+    reads = writes = errors = 0
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        try:
+            if random.random() < write_ratio:
+                Comment.objects.create(
+                    post_id=random.randint(1, N_POSTS),
+                    author_id=1,
+                    text='Комментарий'
+                )
+                writes += 1
+            else:
+                list(post_with_filters()[:10])
+                reads += 1
+        except OperationalError:
+            errors += 1
+        close_old_connections()
+    return reads, writes, errors
+
+
+def run(mode, clients, duration, write_ratio):
+    context = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / 'bench.sqlite3'
+        with context.Pool(1) as pool:
+            pool.apply(seed, (db_path, mode))
+        with context.Pool(clients) as pool:
+            totals = pool.starmap(
+                client,
+                [(db_path, mode, duration, write_ratio)] * clients
+            )
+    reads, writes, errors = map(sum, zip(*totals))
+    return {
+        'mode': mode,
+        'clients': clients,
+        'reads_per_s': round(reads / duration, 1),
+        'writes_per_s': round(writes / duration, 1),
+        'locked_errors': errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    args = parser.parse_args()
+    for mode in MODES:
+        print(json.dumps(
+            run(mode, args.clients, args.duration, args.write_ratio),
+            ensure_ascii=False
+        ))
+
+
+if __name__ == '__main__':
+    main()
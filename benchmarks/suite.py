@@ -0,0 +1,328 @@
+"""Набор бенчмарков основных страниц блога на данных разного объёма.
+
+Для каждого масштаба (1k, 100k, 1m постов) командой generate_data
+создаётся база с пользователями, постами и комментариями; с --data-dir
+она сохраняется и переиспользуется в следующих запусках. Каждое
+измерение идёт на копии базы в отдельном процессе.
+
+Запросы подаются через django.test.Client без сетевого сервера и без
+кеша страниц (DummyCache), так что меряется сама работа view. Для
+index, category_posts, profile, post_detail, add_comment и posts_create
+записываются перцентили задержки, число SQL-запросов на запрос и пик
+памяти Python по tracemalloc. Результат — JSON в --output.
+
+Если какой-то view ответил статусом 4xx или 5xx, его замеры ничего не
+значат: скрипт сообщает об этом и завершается с кодом 1. С --baseline
+результат сравнивается с прошлым запуском: если p50 или пик памяти
+выросли больше чем на --threshold, или число запросов выросло, скрипт
+тоже завершается с кодом 1.
+
+    python benchmarks/suite.py --scales 1k 100k --output results.json
+    python benchmarks/suite.py --baseline results.json --threshold 0.2
+"""
+import argparse
+import json
+import multiprocessing
+import platform
+import random
+import resource
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import ExitStack
+from datetime import datetime, timezone
+from pathlib import Path
+
+import django
+
+from common import ROOT, percentiles, setup_django
+
+SCALES = {'1k': 1_000, '100k': 100_000, '1m': 1_000_000}
+COMMENTS_PER_POST = 3
+POSTS_PER_USER = 10
+VIEWS = (
+    'index',
+    'category_posts',
+    'profile',
+    'post_detail',
+    'add_comment',
+    'posts_create',
+)
+WARMUP = 10
+MEMORY_SAMPLES = 20
+# Рост p50 меньше этого числа миллисекунд считается шумом.
+MIN_DELTA_MS = 1.0
+# Ответы с кодом от этого и выше — ошибки; перенаправления после
+# add_comment и posts_create нормальны.
+MIN_ERROR_STATUS = 400
+
+
+def configure(db_path, migrate=False):
+    setup_django(
+        db_path,
+        migrate,
+        CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+        }},
+    )
+
+
+def seed(db_path, posts, seed_value):
+    configure(db_path, migrate=True)
+    from django.core.management import call_command
+    from django.db import connection
+
+    call_command(
+        'generate_data',
+        users=max(posts // POSTS_PER_USER, 10),
+        posts=posts,
+        comments=posts * COMMENTS_PER_POST,
+        seed=seed_value,
+        verbosity=0,
+    )
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    connection.close()
+
+
+class Targets:
+    """Случайные, но воспроизводимые адреса и данные для запросов."""
+
+    def __init__(self, rng):
+        from blog.get_objects import filter_for_post
+        from blog.models import Category, Location, Post
+
+        self.rng = rng
+        visible = filter_for_post(Post.objects)
+        self.posts = list(
+            visible.order_by('pk').values_list('pk', flat=True)
+        )
+        self.authors = list(
+            visible.order_by('author__username').values_list(
+                'author__username', flat=True
+            ).distinct()
+        )
+        categories = Category.objects.filter(is_published=True).order_by('pk')
+        self.categories = list(categories.values_list('slug', flat=True))
+        self.category_ids = list(categories.values_list('pk', flat=True))
+        self.location_ids = list(
+            Location.objects.order_by('pk').values_list('pk', flat=True)
+        )
+
+    def request(self, view):
+        """(метод, путь, данные) для одного запроса к view."""
+        rng = self.rng
+        if view == 'index':
+            return 'get', '/', None
+        if view == 'category_posts':
+            return 'get', f'/category/{rng.choice(self.categories)}/', None
+        if view == 'profile':
+            return 'get', f'/profile/{rng.choice(self.authors)}/', None
+        if view == 'post_detail':
+            return 'get', f'/posts/{rng.choice(self.posts)}/', None
+        if view == 'add_comment':
+            return 'post', f'/posts/{rng.choice(self.posts)}/comment/', {
+                'text': 'Комментарий из бенчмарка',
+            }
+        return 'post', '/posts/create/', {
+            'title': 'Пост из бенчмарка',
+            'text': 'Текст публикации. ' * 20,
+            'pub_date': '2020-01-01',
+            'category': rng.choice(self.category_ids),
+            'location': rng.choice(self.location_ids),
+        }
+
+
+def run_request(client, target):
+    method, path, data = target
+    if method == 'get':
+        return client.get(path)
+    return client.post(path, data)
+
+
+def measure_view(client, targets, view, requests):
+    from django.db import connections
+
+    from blog.query_budget import QueryCounter
+
+    statuses = set()
+    for _ in range(WARMUP):
+        statuses.add(run_request(client, targets.request(view)).status_code)
+    latencies = []
+    queries = []
+    for _ in range(requests):
+        target = targets.request(view)
+        counter = QueryCounter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            started = time.perf_counter()
+            response = run_request(client, target)
+            latencies.append((time.perf_counter() - started) * 1000)
+        queries.append(len(counter))
+        statuses.add(response.status_code)
+    peaks = []
+    tracemalloc.start()
+    for _ in range(MEMORY_SAMPLES):
+        target = targets.request(view)
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        statuses.add(run_request(client, target).status_code)
+        peaks.append(tracemalloc.get_traced_memory()[1] - before)
+    tracemalloc.stop()
+    return {
+        'statuses': sorted(statuses),
+        'latency_ms': {
+            name: round(value, 2)
+            for name, value in percentiles(latencies).items()
+        },
+        'queries': {
+            'mean': round(sum(queries) / len(queries), 1),
+            'max': max(queries),
+        },
+        'memory_peak_kb': round(max(peaks) / 1024, 1),
+    }
+
+
+def measure(db_path, views, requests, seed_value):
+    configure(db_path)
+    from django.test import Client
+    from django.test.utils import setup_test_environment
+
+    from blog.models import User
+
+    setup_test_environment()
+    targets = Targets(random.Random(seed_value))
+    client = Client()
+    client.force_login(User.objects.get(username=targets.authors[0]))
+    result = {
+        view: measure_view(client, targets, view, requests)
+        for view in views
+    }
+    result['max_rss_mb'] = round(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+    )
+    return result
+
+
+def metadata(args):
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'started_at': datetime.now(timezone.utc).isoformat(),
+        'commit': commit,
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'requests': args.requests,
+        'seed': args.seed,
+    }
+
+
+def failed_views(result):
+    """Описания view, которые отвечали ошибками."""
+    return [
+        f'{scale} {view}: статусы {current["statuses"]}'
+        for scale, views in result['scales'].items()
+        for view, current in views.items()
+        if isinstance(current, dict) and any(
+            status >= MIN_ERROR_STATUS for status in current['statuses']
+        )
+    ]
+
+
+def regressions(result, baseline, threshold):
+    """Описания всех ухудшений result относительно baseline."""
+    found = []
+    for scale, views in result['scales'].items():
+        for view, current in views.items():
+            previous = baseline.get('scales', {}).get(scale, {}).get(view)
+            if not isinstance(current, dict) or not previous:
+                continue
+            name = f'{scale} {view}'
+            old = previous['latency_ms']['p50']
+            new = current['latency_ms']['p50']
+            if new > old * (1 + threshold) and new - old > MIN_DELTA_MS:
+                found.append(f'{name}: p50 {old} -> {new} мс')
+            old = previous['queries']['max']
+            new = current['queries']['max']
+            if new > old:
+                found.append(f'{name}: SQL-запросов {old} -> {new}')
+            old = previous['memory_peak_kb']
+            new = current['memory_peak_kb']
+            if new > old * (1 + threshold):
+                found.append(f'{name}: пик памяти {old} -> {new} КБ')
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        '--scales', nargs='+', choices=SCALES, default=['1k', '100k']
+    )
+    parser.add_argument('--views', nargs='+', choices=VIEWS, default=VIEWS)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument(
+        '--data-dir', type=Path,
+        help='Где хранить сгенерированные базы между запусками.'
+    )
+    parser.add_argument('--output', type=Path)
+    parser.add_argument('--baseline', type=Path)
+    parser.add_argument('--threshold', type=float, default=0.2)
+    args = parser.parse_args()
+    context = multiprocessing.get_context('spawn')
+    result = {'meta': metadata(args), 'scales': {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.data_dir or Path(tmp)
+        data_dir.mkdir(parents=True, exist_ok=True)
+        for scale in args.scales:
+            template = data_dir / f'blog-{scale}-seed{args.seed}.sqlite3'
+            if not template.exists():
+                print(f'{scale}: генерация данных', file=sys.stderr)
+                with context.Pool(1) as pool:
+                    pool.apply(seed, (
+                        template.with_suffix('.tmp'), SCALES[scale], args.seed
+                    ))
+                template.with_suffix('.tmp').rename(template)
+            work = Path(tmp) / f'work-{scale}.sqlite3'
+            shutil.copy(template, work)
+            print(f'{scale}: измерение', file=sys.stderr)
+            with context.Pool(1) as pool:
+                result['scales'][scale] = pool.apply(measure, (
+                    work, args.views, args.requests, args.seed
+                ))
+            work.unlink()
+    report = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        args.output.write_text(report)
+    else:
+        print(report)
+    failed = failed_views(result)
+    for line in failed:
+        print(f'Ошибка: {line}', file=sys.stderr)
+    found = []
+    if args.baseline:
+        found = regressions(
+            result, json.loads(args.baseline.read_text()), args.threshold
+        )
+        for line in found:
+            print(f'Регрессия: {line}', file=sys.stderr)
+    if failed or found:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,273 @@
+"""Асинхронные версии лент и страницы поста для запуска под ASGI.
+
+ORM в Django 3.2 синхронный, поэтому каждый запрос к базе уходит в
+пул потоков через in_thread(), а независимые запросы одной страницы
+выполняются одновременно через asyncio.gather().
+"""
+import asyncio
+from calendar import timegm
+from functools import partial, wraps
+
+from django.http import HttpResponse
+from django.shortcuts import render
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .cache import (
+    cached_page,
+    conditional_cached,
+    posts_count,
+    store_page,
+)
+from .conditional import (
+    category_etag,
+    index_etag,
+    post_etag,
+    profile_etag,
+)
+from .db_threads import in_thread
+from .forms import CommentsForm
+from .get_objects import (
+    category_feed,
+    comments_for_viewer,
+    get_category,
+    get_list_comments,
+    get_list_posts,
+    get_user,
+    is_following,
+    post_for_viewer,
+    post_with_filters,
+    posts_by_ids,
+)
+from .paginator_for_posts import (
+    COMMENTS_ORDERING,
+    STREAM_CHUNK_SIZE,
+    comments_page,
+    page_number,
+    page_rows,
+    paginator_for_posts,
+)
+from .streaming import (
+    render_feed,
+    stream_all_comments,
+    stream_page_size,
+    stream_render,
+)
+
+
+def render_complete(render_func, *args):
+    """Рендерит ответ целиком.
+
+    Под ASGI Django 3.2 обходит потоковый ответ прямо в event loop, где
+    ORM недоступен, поэтому строки потоковой страницы читаются здесь.
+    """
+    response = render_func(*args)
+    if not response.streaming:
+        return response
+    return HttpResponse(
+        b''.join(response.streaming_content),
+        content_type=response['Content-Type']
+    )
+
+
+def conditional_values(request, etag_func, last_modified_func, args,
+                       kwargs):
+    # Пользователь из сессии загружается здесь, а не в event loop.
+    request.user.is_authenticated
+    etag = etag_func and etag_func(request, *args, **kwargs)
+    last_modified = (
+        last_modified_func and last_modified_func(request, *args, **kwargs)
+    )
+    return etag, last_modified
+
+
+def async_condition(etag_func=None, last_modified_func=None):
+    """Аналог django.views.decorators.http.condition для async-view.
+
+    Заодно загружает request.user, чтобы дальше его можно было читать
+    из event loop.
+    """
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            etag, last_modified = await in_thread(
+                conditional_values,
+                request,
+                etag_func,
+                last_modified_func,
+                args,
+                kwargs
+            )
+            etag = quote_etag(etag) if etag else None
+            if last_modified:
+                last_modified = timegm(last_modified.utctimetuple())
+            response = get_conditional_response(
+                request,
+                etag=etag,
+                last_modified=last_modified
+            )
+            if response is None:
+                response = await view(request, *args, **kwargs)
+            if request.method in ('GET', 'HEAD'):
+                if (last_modified
+                        and not response.has_header('Last-Modified')):
+                    response.headers['Last-Modified'] = http_date(
+                        last_modified
+                    )
+                if etag:
+                    response.headers.setdefault('ETag', etag)
+            return response
+        return wrapper
+    return decorator
+
+
+def async_cache_anonymous_page(view):
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        # Пользователь из сессии загружается в потоке, а не в event loop.
+        if request.method != 'GET' or await in_thread(
+            lambda: request.user.is_authenticated
+        ):
+            return await view(request, *args, **kwargs)
+        key, response = await in_thread(cached_page, request)
+        if response is not None:
+            return conditional_cached(request, response)
+        response = await view(request, *args, **kwargs)
+        await in_thread(store_page, key, response)
+        return response
+    return wrapper
+
+
+def fetched_rows(rows, fetch=None):
+    rows = list(rows)
+    return fetch(rows) if fetch else rows
+
+
+async def feed_page(request, post_list, count, fetch=None):
+    """Страница ленты; в режиме ?page= строки и счётчик читаются вместе."""
+    if 'page' not in request.GET:
+        return await in_thread(
+            paginator_for_posts,
+            post_list,
+            request.GET,
+            per_page=stream_page_size(request),
+            fetch=fetch
+        )
+    total, rows = await asyncio.gather(
+        count(),
+        in_thread(fetched_rows, page_rows(post_list, request.GET), fetch)
+    )
+    page = paginator_for_posts(post_list, request.GET, count=lambda: total)
+    if page.number == page_number(request.GET):
+        page.object_list = rows
+    elif fetch:
+        page.object_list = await in_thread(
+            fetched_rows, page.object_list, fetch
+        )
+    return page
+
+
+@async_cache_anonymous_page
+@async_condition(etag_func=index_etag)
+async def index(request):
+    page_obj = await feed_page(
+        request,
+        post_with_filters(),
+        partial(in_thread, posts_count, 'index')
+    )
+    context = {'page_obj': page_obj}
+    template = 'blog/index.html'
+    return await in_thread(
+        render_complete, render_feed, request, template, context
+    )
+
+
+@async_condition(etag_func=post_etag)
+async def post_detail(request, id):
+    form = CommentsForm()
+    template = 'blog/detail.html'
+    if stream_all_comments(request):
+        post = await in_thread(post_for_viewer, id, request.user)
+        comments = get_list_comments(post).order_by(
+            *COMMENTS_ORDERING
+        ).iterator(chunk_size=STREAM_CHUNK_SIZE)
+        context = {'post': post, 'form': form}
+        return await in_thread(
+            render_complete,
+            stream_render,
+            request,
+            template,
+            context,
+            comments,
+            'includes/comment.html',
+            'comment'
+        )
+    post, comments = await asyncio.gather(
+        in_thread(post_for_viewer, id, request.user),
+        in_thread(
+            comments_page,
+            comments_for_viewer(id, request.user),
+            request.GET.get('comments_after')
+        )
+    )
+    context = {'post': post, 'form': form, 'comments': comments}
+    return await in_thread(render_complete, render, request, template, context)
+
+
+@async_cache_anonymous_page
+@async_condition(etag_func=category_etag)
+async def category_posts(request, category_slug):
+    template = 'blog/category.html'
+    category_task = asyncio.ensure_future(
+        in_thread(get_category, category_slug)
+    )
+
+    async def count():
+        return await in_thread(
+            posts_count, 'category', category=await category_task
+        )
+
+    category, page_obj = await asyncio.gather(
+        category_task,
+        feed_page(
+            request,
+            category_feed(category_slug=category_slug),
+            count,
+            fetch=posts_by_ids
+        )
+    )
+    context = {'category': category, 'page_obj': page_obj}
+    return await in_thread(
+        render_complete, render_feed, request, template, context
+    )
+
+
+@async_cache_anonymous_page
+@async_condition(etag_func=profile_etag)
+async def profile(request, username):
+    profile_task = asyncio.ensure_future(in_thread(get_user, username))
+
+    async def count():
+        return await in_thread(
+            posts_count, 'profile', author=await profile_task
+        )
+
+    profile, page_obj = await asyncio.gather(
+        profile_task,
+        feed_page(
+            request,
+            get_list_posts().filter(author__username=username),
+            count
+        )
+    )
+    context = {
+        'profile': profile,
+        'page_obj': page_obj,
+        'is_following': await in_thread(
+            is_following, request.user, profile
+        ),
+    }
+    template_name = 'blog/profile.html'
+    return await in_thread(
+        render_complete, render_feed, request, template_name, context
+    )
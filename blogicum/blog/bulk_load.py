@@ -0,0 +1,267 @@
+"""Быстрая загрузка больших наборов объектов в базу.
+
+loaddata сохраняет объекты по одному. Здесь JSON-фикстура читается
+потоково, объект за объектом, а объекты копятся по моделям и
+вставляются bulk_create пачками по BATCH_SIZE. Всё идёт в одной
+транзакции с отключённой проверкой внешних ключей, как в loaddata:
+порядок моделей в фикстуре неважен, а ключи проверяются один раз в
+конце для всех затронутых таблиц. Объекты с уже существующим pk
+обновляются, как при loaddata.
+
+post_save не отправляется, поэтому то, что обычно ведут сигналы, —
+счётчики комментариев, ленты категорий, входящие подписок, поисковый
+индекс — перестраивает rebuild_derived_data. С rebuild=True bulk_load
+вызывает её в той же транзакции, так что читатели не видят загруженных
+объектов без лент и индекса.
+"""
+import gzip
+import json
+import re
+import sys
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.core.management.color import no_style
+from django.core.serializers.python import Deserializer
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models.signals import pre_save
+from django.utils import timezone
+
+from .cache import PAGES_VERSION_KEY, POSTS_VERSION_KEY, bump_version
+from .category_feed import rebuild_feeds
+from .following import rebuild_inboxes
+from .get_objects import count_comments_subquery
+from .models import Post
+from .search import rebuild_index
+
+BATCH_SIZE = 2000
+READ_CHUNK_SIZE = 64 * 1024
+WHITESPACE = re.compile(r'\s*')
+
+
+def open_fixture(path, mode='r'):
+    """Текстовый поток фикстуры: файл, файл .gz или stdin/stdout для «-»."""
+    if path == '-':
+        return sys.stdin if mode == 'r' else sys.stdout
+    if str(path).endswith('.gz'):
+        return gzip.open(path, f'{mode}t', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+class JsonArrayReader:
+    """Читает элементы JSON-массива по одному, не загружая поток целиком.
+
+    В памяти держится только недочитанный кусок потока; элемент,
+    разрезанный границей куска, дочитывается.
+    """
+
+    def __init__(self, stream, chunk_size=READ_CHUNK_SIZE):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.position = 0
+        self.eof = False
+
+    def read_more(self):
+        chunk = self.stream.read(self.chunk_size)
+        self.eof = not chunk
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+
+    def peek(self):
+        """Первый символ после пробелов или '' в конце потока."""
+        while True:
+            self.position = WHITESPACE.match(
+                self.buffer, self.position
+            ).end()
+            if self.position < len(self.buffer) or self.eof:
+                return self.buffer[self.position:self.position + 1]
+            self.read_more()
+
+    def expect(self, char):
+        if self.peek() != char:
+            found = self.buffer[self.position:self.position + 20]
+            raise ValueError(f'Ожидался {char!r}, найдено {found!r}')
+        self.position += 1
+
+    def decode(self):
+        self.peek()
+        while True:
+            try:
+                item, end = self.decoder.raw_decode(
+                    self.buffer, self.position
+                )
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                end = len(self.buffer)
+            # На границе куска элемент мог оборваться: дочитываем.
+            if end < len(self.buffer) or self.eof:
+                self.position = end
+                return item
+            self.read_more()
+
+    def __iter__(self):
+        self.expect('[')
+        if self.peek() == ']':
+            return
+        while True:
+            yield self.decode()
+            if self.peek() == ']':
+                return
+            self.expect(',')
+
+
+def deserialize(stream, using=DEFAULT_DB_ALIAS, ignorenonexistent=False):
+    return Deserializer(
+        iter(JsonArrayReader(stream)),
+        using=using,
+        ignorenonexistent=ignorenonexistent,
+    )
+
+
+def auto_date_fields():
+    """Поля с auto_now или auto_now_add по моделям."""
+    return {
+        model: [
+            field for field in model._meta.concrete_fields
+            if getattr(field, 'auto_now', False)
+            or getattr(field, 'auto_now_add', False)
+        ]
+        for model in apps.get_models(include_auto_created=True)
+    }
+
+
+@contextmanager
+def keep_dates(dated_fields):
+    """Отключает auto_now и auto_now_add, чтобы сохранить даты объектов."""
+    fields = {
+        field for fields in dated_fields.values() for field in fields
+    }
+    flags = {
+        field: (field.auto_now, field.auto_now_add) for field in fields
+    }
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in flags.items():
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class BulkLoader:
+    """Копит объекты по моделям и сохраняет их пачками.
+
+    Поля с auto_now и auto_now_add, которые у объекта не заполнены,
+    получают текущее время; заполненные сохраняются как есть.
+    """
+
+    def __init__(self, using=DEFAULT_DB_ALIAS, batch_size=BATCH_SIZE):
+        self.using = using
+        self.batch_size = batch_size
+        self.pending = defaultdict(list)
+        self.counts = Counter()
+        self.dated_fields = auto_date_fields()
+
+    def add(self, obj, m2m_data=None):
+        model = type(obj)
+        for field in self.dated_fields.get(model, ()):
+            if getattr(obj, field.attname) is None:
+                setattr(obj, field.attname, timezone.now())
+        pre_save.send(
+            sender=model,
+            instance=obj,
+            raw=True,
+            using=self.using,
+            update_fields=None,
+        )
+        self.pending[model].append(obj)
+        if len(self.pending[model]) >= self.batch_size:
+            self.flush(model)
+        for name, values in (m2m_data or {}).items():
+            field = model._meta.get_field(name)
+            through = field.remote_field.through
+            source = f'{field.m2m_field_name()}_id'
+            target = f'{field.m2m_reverse_field_name()}_id'
+            for value in values:
+                self.add(through(**{source: obj.pk, target: value}))
+
+    def flush(self, model):
+        objs = self.pending.pop(model, [])
+        if not objs:
+            return
+        manager = model._base_manager.using(self.using)
+        if model._meta.auto_created:
+            # Связи многие-ко-многим только добавляются.
+            manager.bulk_create(objs, ignore_conflicts=True)
+            self.counts[model._meta.label] += len(objs)
+            return
+        pks = [obj.pk for obj in objs if obj.pk is not None]
+        existing = set(
+            manager.filter(pk__in=pks).values_list('pk', flat=True)
+        ) if pks else set()
+        manager.bulk_create(
+            [obj for obj in objs if obj.pk not in existing]
+        )
+        if existing:
+            manager.bulk_update(
+                [obj for obj in objs if obj.pk in existing],
+                [
+                    field.name for field in model._meta.concrete_fields
+                    if not field.primary_key
+                ],
+            )
+        self.counts[model._meta.label] += len(objs)
+
+    def flush_all(self):
+        for model in list(self.pending):
+            self.flush(model)
+
+    def models(self):
+        return [apps.get_model(label) for label in self.counts]
+
+
+def bulk_load(objects, using=DEFAULT_DB_ALIAS, batch_size=BATCH_SIZE,
+              rebuild=False):
+    """Сохраняет объекты моделей или DeserializedObject пачками.
+
+    С rebuild=True производные данные перестраиваются до фиксации.
+    Возвращает Counter с числом объектов по меткам моделей.
+    """
+    connection = connections[using]
+    loader = BulkLoader(using, batch_size)
+    with transaction.atomic(using=using):
+        with connection.constraint_checks_disabled(), keep_dates(
+            loader.dated_fields
+        ):
+            for obj in objects:
+                if hasattr(obj, 'm2m_data'):
+                    loader.add(obj.object, obj.m2m_data)
+                else:
+                    loader.add(obj)
+            loader.flush_all()
+        models = loader.models()
+        connection.check_constraints(
+            table_names=[model._meta.db_table for model in models]
+        )
+        sequences = connection.ops.sequence_reset_sql(no_style(), models)
+        if sequences:
+            with connection.cursor() as cursor:
+                for sql in sequences:
+                    cursor.execute(sql)
+        if rebuild:
+            rebuild_derived_data()
+    return loader.counts
+
+
+def rebuild_derived_data():
+    """Перестраивает то, что при save() поддерживают сигналы."""
+    Post.objects.update(comment_count=count_comments_subquery())
+    rebuild_feeds()
+    rebuild_inboxes()
+    rebuild_index()
+    bump_version(POSTS_VERSION_KEY)
+    bump_version(PAGES_VERSION_KEY)
@@ -0,0 +1,87 @@
+import hashlib
+from functools import wraps
+
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+
+from .get_objects import count_posts
+
+COUNT_CACHE_TIMEOUT = 60 * 5
+PAGE_CACHE_TIMEOUT = 60 * 10
+PAGE_PARAMS = ('page', 'after', 'before')
+POSTS_VERSION_KEY = 'blog:posts_version'
+PAGES_VERSION_KEY = 'blog:pages_version'
+
+
+def get_version(key):
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 1, None)
+        version = cache.get(key, 1)
+    return version
+
+
+def bump_version(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 2, None)
+
+
+def posts_count(feed, category=None, author=None):
+    key = 'blog:posts_count:{}:{}:{}:{}'.format(
+        get_version(POSTS_VERSION_KEY),
+        feed,
+        category.pk if category else '',
+        author.pk if author else '',
+    )
+    return cache.get_or_set(
+        key,
+        lambda: count_posts(feed != 'profile', category, author),
+        COUNT_CACHE_TIMEOUT
+    )
+
+
+def page_cache_key(request):
+    params = '&'.join(
+        f'{name}={request.GET.get(name, "")}' for name in PAGE_PARAMS
+    )
+    url = hashlib.md5(f'{request.path}?{params}'.encode()).hexdigest()
+    return f'blog:page:{get_version(PAGES_VERSION_KEY)}:{url}'
+
+
+def cached_page(request):
+    key = page_cache_key(request)
+    return key, cache.get(key)
+
+
+def store_page(key, response):
+    if (response.status_code == 200 and not response.streaming
+            and not response.cookies):
+        cache.set(key, response, PAGE_CACHE_TIMEOUT)
+
+
+def conditional_cached(request, response):
+    """Ответ из кэша или 304, если у клиента та же версия страницы."""
+    return get_conditional_response(
+        request, etag=response.get('ETag'), response=response
+    )
+
+
+def cache_anonymous_page(view):
+    """Кэширует страницы для анонимов.
+
+    Снаружи условного GET: на попадание в кэш ETag не пересчитывается,
+    а берётся из сохранённого ответа.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method != 'GET' or request.user.is_authenticated:
+            return view(request, *args, **kwargs)
+        key, response = cached_page(request)
+        if response is not None:
+            return conditional_cached(request, response)
+        response = view(request, *args, **kwargs)
+        store_page(key, response)
+        return response
+    return wrapper
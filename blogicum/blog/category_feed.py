@@ -0,0 +1,86 @@
+"""Материализованные ленты категорий.
+
+Для каждого опубликованного поста в опубликованной категории хранится
+строка (категория, дата публикации, видимость, id поста). Страница
+категории — это диапазон по частичному индексу category_feed_visible_idx
+и выборка постов по первичному ключу, без соединения с категориями и
+сравнения pub_date с текущим временем. Отложенные посты попадают в
+ленту скрытыми, а publish_due_posts открывает их через сигнал
+visibility_changed.
+
+Строки обновляют сигналы сохранения постов и категорий; удаляются они
+каскадно вместе с постом или категорией. После bulk_create ленты
+перестраивает команда rebuild_category_feeds.
+"""
+from .models import CategoryFeedEntry, Post
+
+FEED_FIELDS = frozenset({'is_published', 'category', 'pub_date'})
+FILL_BATCH_SIZE = 2000
+IDS_BATCH_SIZE = 500
+
+
+def feed_entries(posts):
+    rows = posts.filter(
+        is_published=True,
+        category__is_published=True,
+    ).values_list('pk', 'category_id', 'pub_date', 'is_visible')
+    return [
+        CategoryFeedEntry(
+            post_id=pk,
+            category_id=category_id,
+            pub_date=pub_date,
+            is_visible=is_visible,
+        )
+        for pk, category_id, pub_date, is_visible in rows.iterator(
+            chunk_size=FILL_BATCH_SIZE
+        )
+    ]
+
+
+def refresh_post(post):
+    in_feed = (
+        post.is_published
+        and post.category is not None
+        and post.category.is_published
+    )
+    if in_feed:
+        CategoryFeedEntry(
+            post_id=post.pk,
+            category_id=post.category_id,
+            pub_date=post.pub_date,
+            is_visible=post.is_visible,
+        ).save()
+    else:
+        CategoryFeedEntry.objects.filter(post_id=post.pk).delete()
+
+
+def set_visibility(ids, is_visible):
+    for start in range(0, len(ids), IDS_BATCH_SIZE):
+        CategoryFeedEntry.objects.filter(
+            post_id__in=ids[start:start + IDS_BATCH_SIZE]
+        ).update(is_visible=is_visible)
+
+
+def refresh_visibility(published, withdrawn):
+    """Видимость строк после publish_due_posts."""
+    set_visibility(published, True)
+    set_visibility(withdrawn, False)
+
+
+def refresh_category(category):
+    entries = CategoryFeedEntry.objects.filter(category=category)
+    if not category.is_published:
+        entries.delete()
+    elif not entries.exists():
+        CategoryFeedEntry.objects.bulk_create(
+            feed_entries(Post.objects.filter(category=category)),
+            batch_size=FILL_BATCH_SIZE,
+        )
+
+
+def rebuild_feeds():
+    CategoryFeedEntry.objects.all().delete()
+    CategoryFeedEntry.objects.bulk_create(
+        feed_entries(Post.objects.all()),
+        batch_size=FILL_BATCH_SIZE,
+    )
@@ -0,0 +1,73 @@
+import hashlib
+
+from .cache import PAGES_VERSION_KEY, get_version
+from .get_objects import category_feed, get_list_posts, post_with_filters
+from .models import Post
+from .paginator_for_posts import page_rows
+
+
+def session_stamp(request):
+    """Для вошедшего пользователя — его CSRF-токен.
+
+    Формы на странице несут токен, который меняется при каждом входе:
+    страница из кэша браузера после нового входа отправляла бы старый.
+    """
+    if not request.user.is_authenticated:
+        return ''
+    return request.META.get('CSRF_COOKIE', '')
+
+
+def make_etag(request, *parts):
+    raw = '|'.join(map(str, (
+        get_version(PAGES_VERSION_KEY),
+        request.user.pk,
+        session_stamp(request),
+        *parts,
+    )))
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def feed_etag(request, post_list, fields=('updated_at', 'comment_count')):
+    if 'per_page' in request.GET:
+        return None
+    rows = list(page_rows(post_list, request.GET).values_list('pk', *fields))
+    if not rows:
+        return None
+    return make_etag(request, request.get_full_path(), *rows)
+
+
+def index_etag(request):
+    return feed_etag(request, post_with_filters())
+
+
+def category_etag(request, category_slug):
+    return feed_etag(
+        request,
+        category_feed(category_slug=category_slug),
+        ('post__updated_at', 'post__comment_count')
+    )
+
+
+def profile_etag(request, username):
+    return feed_etag(
+        request,
+        get_list_posts().filter(author__username=username)
+    )
+
+
+def post_etag(request, id):
+    """ETag страницы поста.
+
+    Last-Modified у страницы нет: она зависит и от категории, места и
+    автора, а у них нет даты изменения. Их правки учитывает версия
+    страниц в make_etag.
+    """
+    stamp = Post.objects.filter(pk=id).values_list(
+        'updated_at',
+        'is_visible',
+        'is_published',
+        'category__is_published',
+    ).first()
+    if stamp is None:
+        return None
+    return make_etag(request, request.get_full_path(), *stamp)
@@ -0,0 +1,16 @@
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+
+
+def in_thread(func, *args, **kwargs):
+    """Выполняет func в пуле потоков, не блокируя event loop.
+
+    У каждого потока своё соединение с базой; после вызова оно
+    проверяется так же, как в конце обычного запроса.
+    """
+    def call():
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return sync_to_async(call, thread_sensitive=False)()
@@ -0,0 +1,154 @@
+"""Подписки на авторов и лента «Мои подписки».
+
+Посты обычного автора раскладываются по входящим подписчиков при
+публикации (fan-out on write): на каждого подписчика строка
+FeedInboxEntry, и лента читается диапазоном по индексу inbox_feed_idx.
+У популярного автора это тысячи вставок на каждый пост, поэтому
+подписчики сверх FEED_FANOUT_LIMIT получают подписку с fanout=False:
+посты такого автора выбираются при чтении ленты (fan-out on read) и
+сливаются с входящими по (дата, id).
+
+Признак fanout задаётся при подписке и потом не меняется, поэтому пост
+попадает к подписчику ровно одним путём, а публикация поста вставляет
+не больше FEED_FANOUT_LIMIT строк. Во входящих лежат только видимые
+посты, поэтому лента читается без соединений и сравнения с now().
+Строки обновляют сигналы сохранения постов, категорий и подписок и
+сигнал visibility_changed от publish_due_posts; вместе с постом они
+удаляются каскадно.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from .get_objects import filter_for_post
+from .models import FeedInboxEntry, Follow, Post, User
+
+FANOUT_LIMIT = 1000
+FANOUT_FIELDS = frozenset({'is_published', 'pub_date', 'author', 'category'})
+FANOUT_BATCH_SIZE = 1000
+IDS_BATCH_SIZE = 500
+
+
+def get_fanout_limit():
+    return getattr(settings, 'FEED_FANOUT_LIMIT', FANOUT_LIMIT)
+
+
+def follow(user, author):
+    """Подписывает user на author; False, если подписка уже была."""
+    limit = get_fanout_limit()
+    with transaction.atomic():
+        # Пустая запись в строку автора: одновременные подписки на него
+        # ждут друг друга и не превышают limit. Транзакция начинается с
+        # записи, поэтому в SQLite она сразу берёт блокировку записи.
+        User.objects.filter(pk=author.pk).update(last_login=F('last_login'))
+        fanned_out = Follow.objects.filter(
+            author=author, fanout=True
+        )[:limit].count()
+        _, created = Follow.objects.get_or_create(
+            user=user,
+            author=author,
+            defaults={'fanout': fanned_out < limit}
+        )
+    return created
+
+
+def unfollow(user, author):
+    Follow.objects.filter(user=user, author=author).delete()
+
+
+def backfill_inbox(follow):
+    """Кладёт во входящие подписчика уже видимые посты автора."""
+    rows = filter_for_post(
+        Post.objects.filter(author_id=follow.author_id)
+    ).values_list('pk', 'pub_date')
+    FeedInboxEntry.objects.bulk_create(
+        (
+            FeedInboxEntry(
+                user_id=follow.user_id,
+                post_id=pk,
+                author_id=follow.author_id,
+                pub_date=pub_date,
+            )
+            for pk, pub_date in rows
+        ),
+        batch_size=FANOUT_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def clear_inbox(follow):
+    FeedInboxEntry.objects.filter(
+        user_id=follow.user_id, author_id=follow.author_id
+    ).delete()
+
+
+def rebuild_inboxes():
+    """Заново заполняет входящие, например после bulk_create подписок."""
+    FeedInboxEntry.objects.all().delete()
+    for follow in Follow.objects.filter(fanout=True).iterator():
+        backfill_inbox(follow)
+
+
+def is_shown(post):
+    return (
+        post.is_published
+        and post.is_visible
+        and post.category is not None
+        and post.category.is_published
+    )
+
+
+def fan_out_post(post):
+    """Раскладывает пост по входящим подписчиков или убирает оттуда."""
+    entries = FeedInboxEntry.objects.filter(post_id=post.pk)
+    if not is_shown(post):
+        entries.delete()
+        return
+    entries.exclude(author_id=post.author_id).delete()
+    if entries.update(pub_date=post.pub_date):
+        return
+    followers = Follow.objects.filter(
+        author_id=post.author_id, fanout=True
+    ).values_list('user_id', flat=True)
+    FeedInboxEntry.objects.bulk_create(
+        (
+            FeedInboxEntry(
+                user_id=user_id,
+                post_id=post.pk,
+                author_id=post.author_id,
+                pub_date=post.pub_date,
+            )
+            for user_id in followers
+        ),
+        batch_size=FANOUT_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def fan_out_posts(posts):
+    for post in posts.select_related('category').iterator():
+        fan_out_post(post)
+
+
+def refresh_inbox_visibility(published, withdrawn):
+    """Входящие после publish_due_posts."""
+    for start in range(0, len(published), IDS_BATCH_SIZE):
+        fan_out_posts(
+            Post.objects.filter(pk__in=published[start:start + IDS_BATCH_SIZE])
+        )
+    for start in range(0, len(withdrawn), IDS_BATCH_SIZE):
+        FeedInboxEntry.objects.filter(
+            post_id__in=withdrawn[start:start + IDS_BATCH_SIZE]
+        ).delete()
+
+
+def refresh_category_inboxes(category):
+    """Входящие после сохранения категории, как refresh_category."""
+    entries = FeedInboxEntry.objects.filter(post__category=category)
+    if not category.is_published:
+        entries.delete()
+    elif not entries.exists():
+        fan_out_posts(filter_for_post(Post.objects.filter(
+            category=category,
+            author__in=Follow.objects.filter(fanout=True).values('author'),
+        )))
@@ -1,13 +1,35 @@
 from django import forms
+from PIL import Image
 
 from .models import Post, User, Comment
 
 
+class BoundedImageField(forms.ImageField):
+    """Показывает ошибку, найденную BoundedImageUploadHandler.
+
+    Если обработчик уже прочитал формат из заголовка, картинка второй
+    раз не открывается.
+    """
+
+    def to_python(self, data):
+        error = getattr(data, 'upload_error', None)
+        if error:
+            raise forms.ValidationError(error, code='upload_limit')
+        image_format = getattr(data, 'image_format', None)
+        if image_format is None:
+            return super().to_python(data)
+        file = forms.FileField.to_python(self, data)
+        if file is not None:
+            file.content_type = Image.MIME.get(image_format)
+        return file
+
+
 class PostsForm(forms.ModelForm):
 
     class Meta:
         model = Post
         exclude = ('author', 'is_published')
+        field_classes = {'image': BoundedImageField}
         widgets = {'pub_date': forms.DateTimeInput(
             format='%Y-%m-%d',
             attrs={'type': 'date'}
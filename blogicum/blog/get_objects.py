@@ -1,8 +1,34 @@
-from django.utils import timezone
 from django.shortcuts import get_object_or_404
-from django.db.models import Count
-
-from .models import Category, User, Post, Comment
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import (
+    Category,
+    CategoryFeedEntry,
+    Comment,
+    FeedInboxEntry,
+    Follow,
+    Post,
+    User,
+)
+
+FEED_ROW_FIELDS = (
+    'title',
+    'text',
+    'pub_date',
+    'updated_at',
+    'image',
+    'renditions_for',
+    'renditions',
+    'is_published',
+    'comment_count',
+    'author__username',
+    'category__title',
+    'category__slug',
+    'category__is_published',
+    'location__name',
+    'location__is_published',
+)
 
 
 def get_user(username):
@@ -19,22 +45,97 @@ def filter_for_post(posts):
     return posts.filter(
         is_published=True,
         category__is_published=True,
-        pub_date__lte=timezone.now(),
+        is_visible=True,
     )
 
 
-def post_with_filters(id=None):
-    if id:
-        post = filter_for_post(Post.objects)
-        return get_object_or_404(post, pk=id)
-    return filter_for_post(get_list_posts())
+def post_with_filters(category=None):
+    posts = filter_for_post(get_list_posts())
+    if category:
+        return posts.filter(category=category)
+    return posts
 
 
-def get_list_posts(author=None):
-    list_posts = Post.objects.select_related(
+def feed_rows(posts):
+    return posts.select_related(
         'location',
         'author',
-    ).annotate(comment_count=Count('comments')).order_by('-pub_date')
+        'category',
+    ).only(*FEED_ROW_FIELDS)
+
+
+def category_feed(category=None, category_slug=None):
+    """Видимые строки материализованной ленты категории."""
+    entries = CategoryFeedEntry.objects.filter(is_visible=True)
+    if category_slug:
+        return entries.filter(category__slug=category_slug)
+    return entries.filter(category=category)
+
+
+def posts_by_ids(rows):
+    """Посты для строк ленты в том же порядке, одним запросом по pk."""
+    ids = [row.pk for row in rows]
+    found = feed_rows(Post.objects).in_bulk(ids)
+    return [found[pk] for pk in ids if pk in found]
+
+
+def subscription_sources(user):
+    """Источники ленты подписок для paginator_for_posts.merged_page.
+
+    Входящие с видимыми постами авторов, которые раскладывают их при
+    публикации, и посты авторов, на которых user подписан без раскладки.
+    """
+    inbox = FeedInboxEntry.objects.filter(user=user)
+    on_read = filter_for_post(Post.objects.filter(
+        author__in=Follow.objects.filter(
+            user=user, fanout=False
+        ).values('author')
+    ))
+    return (inbox, 'post'), (on_read, 'pk')
+
+
+def is_following(user, author):
+    return user.is_authenticated and user != author and Follow.objects.filter(
+        user=user, author=author
+    ).exists()
+
+
+def visible_to(user, prefix=''):
+    """Условие «пост виден пользователю»; prefix — путь до поста."""
+    visible = Q(**{
+        f'{prefix}is_published': True,
+        f'{prefix}category__is_published': True,
+        f'{prefix}is_visible': True,
+    })
+    if user.is_authenticated:
+        visible |= Q(**{f'{prefix}author': user})
+    return visible
+
+
+def post_for_viewer(pk, user):
+    posts = Post.objects.select_related(
+        'author',
+        'category',
+        'location',
+    ).filter(visible_to(user))
+    return get_object_or_404(posts, pk=pk)
+
+
+def get_list_comments(post):
+    return Comment.objects.filter(post=post).select_related('author')
+
+
+def comments_for_viewer(post_id, user):
+    """Комментарии видимого пользователю поста.
+
+    Видимость проверяется в том же запросе, поэтому комментарии можно
+    читать одновременно с post_for_viewer.
+    """
+    return get_list_comments(post_id).filter(visible_to(user, 'post__'))
+
+
+def get_list_posts(author=None):
+    list_posts = feed_rows(Post.objects).order_by('-pub_date')
     if author:
         return filter_author_for_post(list_posts, author)
     return list_posts
@@ -46,6 +147,19 @@ def filter_author_for_post(posts, author):
         )
 
 
+def count_posts(published=True, category=None, author=None):
+    if published and category and not author:
+        return category_feed(category).count()
+    posts = Post.objects.all()
+    if published:
+        posts = filter_for_post(posts)
+    if category:
+        posts = posts.filter(category=category)
+    if author:
+        posts = filter_author_for_post(posts, author)
+    return posts.count()
+
+
 def get_comment(comment_id, post_id, author):
     return get_object_or_404(
         Comment,
@@ -59,3 +173,10 @@ def get_category(category_slug):
         Category,
         slug=category_slug,
         is_published=True)
+
+
+def count_comments_subquery():
+    comments = Comment.objects.filter(
+        post=OuterRef('pk')
+    ).order_by().values('post').annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(comments), 0)
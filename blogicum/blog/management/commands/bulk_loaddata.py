@@ -0,0 +1,59 @@
+from contextlib import ExitStack
+from itertools import chain
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.base import DeserializationError
+from django.db import DEFAULT_DB_ALIAS, IntegrityError
+
+from blog.bulk_load import (
+    BATCH_SIZE,
+    bulk_load,
+    deserialize,
+    open_fixture,
+)
+
+
+class Command(BaseCommand):
+    help = ('Загружает большие JSON-фикстуры: читает их потоково и '
+            'сохраняет bulk_create пачками в одной транзакции.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'fixtures', nargs='+',
+            help='Файлы .json или .json.gz; «-» — стандартный ввод.'
+        )
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument(
+            '--ignorenonexistent', '-i', action='store_true',
+            help='Пропускать поля, которых нет в моделях.'
+        )
+        parser.add_argument(
+            '--skip-rebuild', action='store_true',
+            help='Не перестраивать ленты, индекс и счётчики после загрузки.'
+        )
+
+    def handle(self, *args, fixtures, batch_size, database,
+               ignorenonexistent, skip_rebuild, **options):
+        with ExitStack() as stack:
+            objects = chain.from_iterable(
+                deserialize(
+                    stack.enter_context(open_fixture(path)),
+                    using=database,
+                    ignorenonexistent=ignorenonexistent,
+                )
+                for path in fixtures
+            )
+            try:
+                counts = bulk_load(
+                    objects, database, batch_size, rebuild=not skip_rebuild
+                )
+            except (
+                DeserializationError, IntegrityError, OSError, ValueError
+            ) as error:
+                raise CommandError(f'Фикстура не загружена: {error}')
+        if options['verbosity'] > 1:
+            for label, count in sorted(counts.items()):
+                self.stdout.write(f'{label}: {count}')
+        if options['verbosity']:
+            self.stdout.write(f'Загружено объектов: {sum(counts.values())}')
@@ -0,0 +1,58 @@
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.models import Post
+from blog.thumbnails import RENDITIONS_DIR, rendition_source
+
+
+def walk(storage, path):
+    directories, files = storage.listdir(path)
+    for name in files:
+        yield f'{path}/{name}'
+    for directory in directories:
+        yield from walk(storage, f'{path}/{directory}')
+
+
+class Command(BaseCommand):
+    help = ('Удаляет картинки постов, на которые больше не ссылается ни '
+            'один пост, и их превью.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-age',
+            type=int,
+            default=3600,
+            help='Не трогать файлы моложе N секунд: они могут '
+                 'принадлежать посту, который ещё сохраняется.')
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, min_age, dry_run, **options):
+        field = Post._meta.get_field('image')
+        referenced = set(
+            Post.objects.exclude(image='').values_list('image', flat=True)
+        )
+        cutoff = timezone.now() - timedelta(seconds=min_age)
+        removed = 0
+        for storage, path, source in (
+            (field.storage, field.upload_to, str),
+            (default_storage, RENDITIONS_DIR, rendition_source),
+        ):
+            if not storage.exists(path):
+                continue
+            orphans = [
+                name for name in walk(storage, path)
+                if source(name) not in referenced
+            ]
+            for name in orphans:
+                if storage.get_modified_time(name) > cutoff:
+                    continue
+                if options['verbosity'] > 1 or dry_run:
+                    self.stdout.write(name)
+                if not dry_run:
+                    storage.delete(name)
+                removed += 1
+        action = 'Найдено' if dry_run else 'Удалено'
+        self.stdout.write(f'{action} неиспользуемых файлов: {removed}')
@@ -0,0 +1,99 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from blog.get_objects import (
+    category_feed,
+    get_list_posts,
+    post_with_filters,
+    subscription_sources,
+)
+from blog.models import (
+    Category,
+    CategoryFeedEntry,
+    Comment,
+    FeedInboxEntry,
+    Post,
+    User,
+)
+from blog.paginator_for_posts import COUNT_FOR_PAGINATOR, cursor_queryset
+
+# Поле с id поста, по которому ленты модели листаются курсором.
+CURSOR_KEYS = {Post: 'pk', CategoryFeedEntry: 'pk', FeedInboxEntry: 'post'}
+
+FULL_SCAN_PATTERNS = (
+    # SQLite: «SCAN blog_post» без «USING ... INDEX».
+    r'\bSCAN (?:TABLE )?{table}\b(?! USING (?:COVERING )?INDEX)',
+    # PostgreSQL.
+    r'\bSeq Scan on {table}\b',
+)
+
+
+def feed_queries():
+    category = Category(pk=0)
+    author = User(pk=0)
+    post = Post(pk=0)
+    inbox, on_read = subscription_sources(author)
+    return {
+        'index': post_with_filters(),
+        'category_posts': category_feed(category),
+        'profile': get_list_posts(author),
+        'comments': Comment.objects.filter(post=post),
+        'feed_inbox': inbox[0],
+        'feed_on_read': on_read[0],
+    }
+
+
+def page_queries(name, queryset):
+    """Первая страница ленты и страница после курсора."""
+    key = CURSOR_KEYS.get(queryset.model)
+    if key is None:
+        return {name: queryset}
+    return {
+        name: cursor_queryset(queryset, key=key),
+        f'{name} (after)': cursor_queryset(
+            queryset, (timezone.now(), 0), key=key
+        ),
+    }
+
+
+def full_scans(plan, tables):
+    return [
+        table for table in tables
+        if any(
+            re.search(pattern.format(table=table), plan)
+            for pattern in FULL_SCAN_PATTERNS
+        )
+    ]
+
+
+class Command(BaseCommand):
+    help = ('Выполняет EXPLAIN для запросов лент и завершается с ошибкой, '
+            'если какой-то из них читает таблицу целиком.')
+
+    def handle(self, *args, **options):
+        tables = (
+            Post._meta.db_table,
+            Comment._meta.db_table,
+            CategoryFeedEntry._meta.db_table,
+            FeedInboxEntry._meta.db_table,
+        )
+        queries = {}
+        for name, queryset in feed_queries().items():
+            queries.update(page_queries(name, queryset))
+        failed = []
+        for name, queryset in queries.items():
+            plan = queryset[:COUNT_FOR_PAGINATOR + 1].explain()
+            scanned = full_scans(plan, tables)
+            if scanned:
+                failed.append(name)
+                self.stderr.write(f'{name}: full scan of {", ".join(scanned)}')
+            else:
+                self.stdout.write(f'{name}: ok')
+            if options['verbosity'] > 1:
+                self.stdout.write(plan)
+        if failed:
+            raise CommandError(
+                f'Запросы без подходящего индекса: {", ".join(failed)}'
+            )
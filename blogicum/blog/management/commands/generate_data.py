@@ -0,0 +1,71 @@
+from django.core import serializers
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from blog.bulk_load import (
+    BATCH_SIZE,
+    bulk_load,
+    open_fixture,
+)
+from blog.synthetic import SyntheticData
+
+
+class Command(BaseCommand):
+    help = ('Создаёт синтетических пользователей, посты и комментарии '
+            'для нагрузочного тестирования, хоть миллионы.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--posts', type=int, default=10_000)
+        parser.add_argument('--comments', type=int, default=30_000)
+        parser.add_argument('--categories', type=int, default=50)
+        parser.add_argument('--locations', type=int, default=200)
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='За сколько последних дней распределены посты.'
+        )
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument(
+            '--password', default='password',
+            help='Пароль всех созданных пользователей.'
+        )
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument(
+            '--output',
+            help='Записать фикстуру в файл (.json или .json.gz) '
+                 'для bulk_loaddata вместо загрузки в базу.'
+        )
+
+    def handle(self, *args, users, posts, comments, categories, locations,
+               days, seed, password, batch_size, database, output,
+               **options):
+        try:
+            data = SyntheticData(
+                users,
+                posts,
+                comments,
+                categories=categories,
+                locations=locations,
+                days=days,
+                seed=seed,
+                password=password,
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        if output:
+            self.write_fixture(data, output, options['verbosity'])
+            return
+        counts = bulk_load(data, database, batch_size, rebuild=True)
+        if options['verbosity']:
+            for label, count in sorted(counts.items()):
+                self.stdout.write(f'{label}: {count}')
+
+    def write_fixture(self, data, output, verbosity):
+        if output == '-':
+            serializers.serialize('json', data, stream=self.stdout)
+            return
+        with open_fixture(output, 'w') as stream:
+            serializers.serialize('json', data, stream=stream)
+        if verbosity:
+            self.stdout.write(f'Фикстура записана в {output}')
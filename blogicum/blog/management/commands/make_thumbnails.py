@@ -0,0 +1,40 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db.models import F
+
+from blog.models import Post
+from blog.thumbnails import available_formats, make_renditions
+
+
+class Command(BaseCommand):
+    help = ('Строит превью для картинок постов, у которых их ещё нет '
+            'или не хватает форматов, доступных Pillow.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4)
+
+    def handle(self, *args, workers, **options):
+        images = list(
+            Post.objects.exclude(image='').exclude(
+                renditions_for=F('image'),
+                renditions__formats=available_formats()
+            ).values_list('image', flat=True).distinct()
+        )
+        built = 0
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for image_name, error in zip(
+                images, executor.map(self.build, images)
+            ):
+                if error:
+                    self.stderr.write(f'{image_name}: {error}')
+                else:
+                    built += 1
+        self.stdout.write(f'Превью построены для {built} из {len(images)}')
+
+    def build(self, image_name):
+        try:
+            make_renditions(image_name)
+        except Exception as error:
+            return error
+        return None
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.publishing import publish_due_posts
+
+
+class Command(BaseCommand):
+    help = ('Делает видимыми отложенные публикации, дата которых наступила. '
+            'С --interval работает как фоновый планировщик.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help='Повторять проверку каждые N секунд.')
+
+    def handle(self, *args, interval, **options):
+        while True:
+            published, withdrawn = publish_due_posts()
+            if published or withdrawn or options['verbosity'] > 1:
+                self.stdout.write(
+                    f'Опубликовано: {published}, снято: {withdrawn}'
+                )
+            if not interval:
+                break
+            time.sleep(interval)
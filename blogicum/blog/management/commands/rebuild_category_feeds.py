@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from blog.category_feed import rebuild_feeds
+from blog.models import CategoryFeedEntry
+
+
+class Command(BaseCommand):
+    help = ('Заново строит материализованные ленты категорий, например '
+            'после bulk_create, который не вызывает сигналы.')
+
+    def handle(self, *args, **options):
+        rebuild_feeds()
+        self.stdout.write(
+            f'В лентах категорий {CategoryFeedEntry.objects.count()} постов'
+        )
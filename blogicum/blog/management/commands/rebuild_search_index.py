@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from blog.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = ('Заново строит поисковый индекс по всем постам, например '
+            'после bulk_create, который не вызывает сигналы.')
+
+    def handle(self, *args, **options):
+        rebuild_index()
+        self.stdout.write('Поисковый индекс перестроен')
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+
+from blog.get_objects import count_comments_subquery
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает Post.comment_count, разошедшиеся с комментариями.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, batch_size, **options):
+        drifted = list(
+            Post.objects.annotate(
+                actual=count_comments_subquery()
+            ).exclude(
+                comment_count=F('actual')
+            ).values_list('pk', flat=True)
+        )
+        with transaction.atomic():
+            for start in range(0, len(drifted), batch_size):
+                Post.objects.filter(
+                    pk__in=drifted[start:start + batch_size]
+                ).update(comment_count=count_comments_subquery())
+        self.stdout.write(f'Исправлено счётчиков: {len(drifted)}')
@@ -0,0 +1,32 @@
+import sqlite3
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from blog.routers import get_replicas
+
+
+class Command(BaseCommand):
+    help = ('Копирует основную SQLite-базу в файлы реплик из '
+            'DATABASE_REPLICAS, чтобы проверять маршрутизацию локально.')
+
+    def handle(self, *args, **options):
+        primary = connections['default'].settings_dict
+        if primary['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError('Команда работает только с SQLite.')
+        replicas = get_replicas()
+        if not replicas:
+            raise CommandError('В DATABASE_REPLICAS нет ни одной реплики.')
+        source = sqlite3.connect(primary['NAME'])
+        try:
+            for alias in replicas:
+                connections[alias].close()
+                name = connections[alias].settings_dict['NAME']
+                target = sqlite3.connect(name)
+                try:
+                    source.backup(target)
+                finally:
+                    target.close()
+                self.stdout.write(f'{alias}: ok')
+        finally:
+            source.close()
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-18 19:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_post_is_visible'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='renditions_for',
+            field=models.CharField(blank=True, editable=False, max_length=100, verbose_name='Превью построены для'),
+        ),
+    ]
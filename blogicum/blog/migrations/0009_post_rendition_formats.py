@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-18 19:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_post_renditions_for'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='rendition_formats',
+            field=models.JSONField(blank=True, default=list, editable=False, verbose_name='Дополнительные форматы превью'),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 3.2.16 on 2026-10-18 19:54
+
+from django.db import OperationalError, migrations
+
+from blog.stemming import tokenize
+
+SEARCH_TABLE = 'blog_post_search'
+FILL_CHUNK_SIZE = 2000
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    Post = apps.get_model('blog', 'Post')
+    rows = Post.objects.using(connection.alias).order_by('pk').values_list(
+        'pk', 'title', 'text'
+    )
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} '
+                "USING fts5(title, text, tokenize='unicode61 "
+                "remove_diacritics 0')"
+            )
+        except OperationalError:
+            # SQLite без FTS5: поиск работает по индексу в памяти.
+            return
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        last = 0
+        while True:
+            batch = list(rows.filter(pk__gt=last)[:FILL_CHUNK_SIZE])
+            if not batch:
+                return
+            cursor.executemany(
+                f'INSERT INTO {SEARCH_TABLE}(rowid, title, text) '
+                'VALUES (%s, %s, %s)',
+                [
+                    (pk, ' '.join(tokenize(title)), ' '.join(tokenize(text)))
+                    for pk, title, text in batch
+                ]
+            )
+            last = batch[-1][0]
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_post_image_storage'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
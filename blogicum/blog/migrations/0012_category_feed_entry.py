@@ -0,0 +1,51 @@
+# Generated by Django 3.2.16 on 2026-10-18 19:58
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_category_feeds(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    CategoryFeedEntry = apps.get_model('blog', 'CategoryFeedEntry')
+    posts = Post.objects.filter(
+        is_published=True,
+        category__is_published=True,
+    ).values_list('pk', 'category_id', 'pub_date')
+    CategoryFeedEntry.objects.bulk_create(
+        (
+            CategoryFeedEntry(
+                post_id=pk,
+                category_id=category_id,
+                pub_date=pub_date,
+            )
+            for pk, category_id, pub_date in posts.iterator()
+        ),
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_post_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryFeedEntry',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to='blog.post', verbose_name='Публикация')),
+                ('pub_date', models.DateTimeField(verbose_name='Дата и время публикации')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='blog.category', verbose_name='Категория')),
+            ],
+            options={
+                'verbose_name': 'строка ленты категории',
+                'verbose_name_plural': 'Ленты категорий',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='categoryfeedentry',
+            index=models.Index(fields=['category', '-pub_date', '-post'], name='category_feed_idx'),
+        ),
+        migrations.RunPython(fill_category_feeds, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 3.2.16 on 2026-10-18 21:21
+
+from django.db import migrations, models
+
+
+def forget_renditions(apps, schema_editor):
+    # Ширина старых превью неизвестна: они перестроятся при показе или
+    # командой make_thumbnails.
+    Post = apps.get_model('blog', 'Post')
+    Post.objects.exclude(renditions_for='').update(renditions_for='')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_follow'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='post',
+            name='rendition_formats',
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Построенные превью'),
+        ),
+        migrations.RunPython(forget_renditions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 3.2.16 on 2026-10-18 21:25
+
+from django.db import migrations, models
+
+
+def fill_is_visible(apps, schema_editor):
+    CategoryFeedEntry = apps.get_model('blog', 'CategoryFeedEntry')
+    CategoryFeedEntry.objects.filter(post__is_visible=True).update(
+        is_visible=True
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0014_post_renditions'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='categoryfeedentry',
+            name='category_feed_idx',
+        ),
+        migrations.AddField(
+            model_name='categoryfeedentry',
+            name='is_visible',
+            field=models.BooleanField(default=False, verbose_name='Дата публикации наступила'),
+        ),
+        migrations.RunPython(fill_is_visible, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='categoryfeedentry',
+            index=models.Index(condition=models.Q(('is_visible', True)), fields=['category', '-pub_date', '-post'], name='category_feed_visible_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 3.2.16 on 2026-10-18 21:26
+
+from django.db import migrations
+from django.db.models import Q
+
+
+def drop_hidden_posts(apps, schema_editor):
+    # Входящие теперь хранят только видимые посты; отложенные придут
+    # туда при публикации.
+    FeedInboxEntry = apps.get_model('blog', 'FeedInboxEntry')
+    FeedInboxEntry.objects.exclude(Q(
+        post__is_published=True,
+        post__is_visible=True,
+        post__category__is_published=True,
+    )).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0015_category_feed_visibility'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_hidden_posts, migrations.RunPython.noop),
+    ]
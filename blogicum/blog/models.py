@@ -1,6 +1,7 @@
 from django.db import models
 from django.contrib.auth import get_user_model
 from blog.abstracts import BaseModelSpecific, BaseModel
+from blog.storage import ContentAddressedStorage
 
 
 User = get_user_model()
@@ -58,16 +59,88 @@ class Post(BaseModelSpecific, BaseModel):
         null=True,
         verbose_name='Категория',
         related_name='category')
-    image = models.ImageField('Фото', upload_to='posts_images', blank=True)
+    image = models.ImageField(
+        'Фото',
+        upload_to='posts_images',
+        storage=ContentAddressedStorage(),
+        blank=True)
+    renditions_for = models.CharField(
+        'Превью построены для',
+        max_length=100,
+        blank=True,
+        editable=False)
+    renditions = models.JSONField(
+        'Построенные превью',
+        default=dict,
+        blank=True,
+        editable=False)
+    updated_at = models.DateTimeField('Изменено', auto_now=True)
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False)
+    is_visible = models.BooleanField(
+        'Дата публикации наступила',
+        default=False,
+        editable=False)
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
+        indexes = (
+            models.Index(
+                fields=('is_published', '-pub_date'),
+                name='post_published_feed_idx'),
+            models.Index(
+                fields=('category', 'is_published', '-pub_date'),
+                name='post_category_feed_idx'),
+            models.Index(
+                fields=('author', '-pub_date'),
+                name='post_author_feed_idx'),
+            models.Index(
+                fields=('-pub_date', '-id'),
+                condition=models.Q(is_published=True, is_visible=True),
+                name='post_visible_partial_idx'),
+            models.Index(
+                fields=('pub_date',),
+                condition=models.Q(is_visible=False),
+                name='post_scheduled_idx'),
+        )
 
     def __str__(self):
         return self.title
 
 
+class CategoryFeedEntry(models.Model):
+    """Строка ленты опубликованной категории; ведёт её blog.category_feed."""
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='+',
+        verbose_name='Публикация')
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Категория')
+    pub_date = models.DateTimeField('Дата и время публикации')
+    is_visible = models.BooleanField(
+        'Дата публикации наступила',
+        default=False)
+
+    class Meta:
+        verbose_name = 'строка ленты категории'
+        verbose_name_plural = 'Ленты категорий'
+        indexes = (
+            models.Index(
+                fields=('category', '-pub_date', '-post'),
+                condition=models.Q(is_visible=True),
+                name='category_feed_visible_idx'),
+        )
+
+
 class Comment(models.Model):
     text = models.TextField('Текст комментария')
     post = models.ForeignKey(
@@ -80,3 +153,84 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ('created_at',)
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at'),
+                name='comment_post_created_idx'),
+        )
+
+
+class Follow(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='following',
+        verbose_name='Подписчик')
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='followers',
+        verbose_name='Автор')
+    fanout = models.BooleanField(
+        'Посты приходят во входящие',
+        default=True,
+        editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'подписка'
+        verbose_name_plural = 'Подписки'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'author'),
+                name='unique_follow'),
+            models.CheckConstraint(
+                check=~models.Q(user=models.F('author')),
+                name='follow_not_self'),
+        )
+        indexes = (
+            models.Index(
+                fields=('author', 'fanout'),
+                name='follow_author_fanout_idx'),
+        )
+
+    def __str__(self):
+        return f'{self.user} -> {self.author}'
+
+
+class FeedInboxEntry(models.Model):
+    """Пост автора во входящих подписчика; ведёт их blog.following."""
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Подписчик')
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Публикация')
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Автор')
+    pub_date = models.DateTimeField('Дата и время публикации')
+
+    class Meta:
+        verbose_name = 'входящий пост'
+        verbose_name_plural = 'Входящие ленты подписок'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'post'),
+                name='unique_inbox_post'),
+        )
+        indexes = (
+            models.Index(
+                fields=('user', '-pub_date', '-post'),
+                name='inbox_feed_idx'),
+            models.Index(
+                fields=('user', 'author'),
+                name='inbox_author_idx'),
+        )
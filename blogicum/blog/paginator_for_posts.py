@@ -1,8 +1,291 @@
+import base64
+import binascii
+import heapq
+from collections import namedtuple
+from datetime import datetime
+from itertools import islice
+
 from django.core.paginator import Paginator
+from django.utils.functional import cached_property
 
 COUNT_FOR_PAGINATOR = 10
+COUNT_FOR_COMMENTS = 50
+STREAM_CHUNK_SIZE = 100
+CURSOR_ORDERING = ('-pub_date', '-pk')
+COMMENTS_ORDERING = ('created_at', 'id')
+
+FeedRow = namedtuple('FeedRow', ('pub_date', 'pk'))
+
+
+def encode_cursor(obj, field='pub_date'):
+    raw = f'{getattr(obj, field).isoformat()}|{obj.pk}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        pub_date, pk = raw.decode().split('|')
+        return datetime.fromisoformat(pub_date), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator, берущий общее число записей из внешнего счётчика."""
+
+    def __init__(self, object_list, per_page, count_func):
+        super().__init__(object_list, per_page)
+        self.count_func = count_func
+
+    @cached_property
+    def count(self):
+        return self.count_func()
+
+
+class CursorPage:
+    """Страница, выбранная по ключу (дата, id) без COUNT и OFFSET."""
+
+    paginator = None
+    per_page = None
+
+    def __init__(self, object_list, has_next, has_previous,
+                 cursor_field='pub_date'):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.cursor_field = cursor_field
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    @property
+    def first_row(self):
+        return self.object_list[0] if self.object_list else None
+
+    @property
+    def last_row(self):
+        return self.object_list[-1] if self.object_list else None
+
+    @property
+    def next_cursor(self):
+        if self.has_next and self.last_row:
+            return encode_cursor(self.last_row, self.cursor_field)
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self.has_previous and self.first_row:
+            return encode_cursor(self.first_row, self.cursor_field)
+        return None
+
+
+class StreamingCursorPage(CursorPage):
+    """Страница, строки которой читаются через iterator() по мере вывода.
+
+    has_next и курсоры становятся известны только после обхода страницы.
+    Если задан fetch, строки по STREAM_CHUNK_SIZE заменяются тем, что он
+    вернёт, например постами по id из материализованной ленты.
+    """
+
+    first_row = None
+    last_row = None
+
+    def __init__(self, queryset, per_page, has_previous, fetch=None):
+        super().__init__([], has_next=False, has_previous=has_previous)
+        self.queryset = queryset
+        self.per_page = per_page
+        self.fetch = fetch
+
+    def __iter__(self):
+        rows = self.rows()
+        if self.fetch is None:
+            yield from rows
+            return
+        chunk = list(islice(rows, STREAM_CHUNK_SIZE))
+        while chunk:
+            yield from self.fetch(chunk)
+            chunk = list(islice(rows, STREAM_CHUNK_SIZE))
+
+    def rows(self):
+        rows = self.queryset[:self.per_page + 1].iterator(
+            chunk_size=STREAM_CHUNK_SIZE
+        )
+        for number, row in enumerate(rows):
+            if number == self.per_page:
+                self.has_next = True
+                break
+            if self.first_row is None:
+                self.first_row = row
+            self.last_row = row
+            yield row
+
+
+def cursor_queryset(post_list, after=None, before=None, key='pk'):
+    """Строки после или до курсора; key — поле с id поста.
+
+    Условие записано как диапазон по pub_date без строк той же даты по
+    другую сторону от id: с OR SQLite не использует индекс по дате
+    вместе с другими условиями и читает таблицу целиком.
+    """
+    if before:
+        pub_date, pk = before
+        return post_list.filter(pub_date__gte=pub_date).exclude(
+            pub_date=pub_date, **{f'{key}__lte': pk}
+        ).order_by('pub_date', key)
+    if after:
+        pub_date, pk = after
+        post_list = post_list.filter(pub_date__lte=pub_date).exclude(
+            pub_date=pub_date, **{f'{key}__gte': pk}
+        )
+    return post_list.order_by('-pub_date', f'-{key}')
+
+
+def page_from_rows(rows, after=None, before=None,
+                   per_page=COUNT_FOR_PAGINATOR):
+    """CursorPage из страницы + 1 строк в порядке выборки по курсору."""
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if before:
+        return CursorPage(rows[::-1], has_next=True, has_previous=has_more)
+    return CursorPage(
+        rows,
+        has_next=has_more,
+        has_previous=after is not None
+    )
+
+
+def cursor_page(post_list, after=None, before=None,
+                per_page=COUNT_FOR_PAGINATOR):
+    after, before = decode_cursor(after), decode_cursor(before)
+    rows = list(cursor_queryset(post_list, after, before)[:per_page + 1])
+    return page_from_rows(rows, after, before, per_page)
+
+
+def merged_page(sources, params, fetch):
+    """Страница ленты, слитой из нескольких источников по (дата, id).
+
+    sources — пары (queryset, поле с id поста). Из каждого источника
+    читается не больше страницы + 1 строк по курсору, так что цена
+    слияния не зависит от длины источников.
+    """
+    after = decode_cursor(params.get('after'))
+    before = decode_cursor(params.get('before'))
+    limit = COUNT_FOR_PAGINATOR + 1
+    streams = [
+        [
+            FeedRow(*row)
+            for row in cursor_queryset(rows, after, before, key).values_list(
+                'pub_date', key
+            )[:limit]
+        ]
+        for rows, key in sources
+    ]
+    rows = list(islice(heapq.merge(*streams, reverse=not before), limit))
+    page = page_from_rows(rows, after, before)
+    page.object_list = fetch(page.object_list)
+    return page
+
+
+def page_number(params):
+    try:
+        return max(int(params['page']), 1)
+    except ValueError:
+        return 1
+
+
+def page_rows(post_list, params):
+    if 'page' in params:
+        bottom = (page_number(params) - 1) * COUNT_FOR_PAGINATOR
+        return post_list.order_by(*CURSOR_ORDERING)[
+            bottom:bottom + COUNT_FOR_PAGINATOR
+        ]
+    return cursor_queryset(
+        post_list,
+        decode_cursor(params.get('after')),
+        decode_cursor(params.get('before'))
+    )[:COUNT_FOR_PAGINATOR + 1]
+
+
+def ranked_page(ids, rows, params):
+    """Страница постов в порядке ids, например по релевантности."""
+    page = Paginator(ids, COUNT_FOR_PAGINATOR).get_page(params.get('page'))
+    found = rows.in_bulk(page.object_list)
+    page.object_list = [found[pk] for pk in page.object_list if pk in found]
+    return page
+
+
+def comments_page(comments, after=None):
+    """Комментарии после курсора по возрастанию (дата, id).
+
+    Условие — диапазон по created_at, как в cursor_queryset, чтобы
+    работал индекс (post, created_at).
+    """
+    after = decode_cursor(after)
+    if after:
+        created_at, pk = after
+        comments = comments.filter(created_at__gte=created_at).exclude(
+            created_at=created_at, pk__lte=pk
+        )
+    rows = list(
+        comments.order_by(*COMMENTS_ORDERING)[:COUNT_FOR_COMMENTS + 1]
+    )
+    return CursorPage(
+        rows[:COUNT_FOR_COMMENTS],
+        has_next=len(rows) > COUNT_FOR_COMMENTS,
+        has_previous=after is not None,
+        cursor_field='created_at'
+    )
+
 
+def paginator_for_posts(post_list, params, count=None, per_page=None,
+                        fetch=None):
+    """Страница ленты; fetch превращает строки post_list в посты.
 
-def paginator_for_posts(post_list, page_number):
-    paginator = Paginator(post_list.order_by('-pub_date'), COUNT_FOR_PAGINATOR)
-    return paginator.get_page(page_number)
+    С ?page= страница выбирается по номеру обычного размера, даже если
+    задан per_page: номера страниц в ссылках считаются по нему.
+    """
+    if per_page and 'page' in params:
+        per_page = None
+    if per_page and 'before' not in params:
+        after = decode_cursor(params.get('after'))
+        return StreamingCursorPage(
+            cursor_queryset(post_list, after),
+            per_page,
+            has_previous=after is not None,
+            fetch=fetch
+        )
+    if 'page' in params:
+        post_list = post_list.order_by(*CURSOR_ORDERING)
+        if count:
+            paginator = CachedCountPaginator(
+                post_list, COUNT_FOR_PAGINATOR, count
+            )
+        else:
+            paginator = Paginator(post_list, COUNT_FOR_PAGINATOR)
+        page = paginator.get_page(params.get('page'))
+    else:
+        # С per_page сюда попадает только страница «назад»: её строки
+        # выбираются по возрастанию и разворачиваются, поэтому читаются
+        # целиком, а не потоком.
+        page = cursor_page(
+            post_list,
+            params.get('after'),
+            params.get('before'),
+            per_page or COUNT_FOR_PAGINATOR
+        )
+        page.per_page = per_page
+    if fetch:
+        page.object_list = fetch(list(page.object_list))
+    return page
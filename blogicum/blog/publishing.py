@@ -0,0 +1,109 @@
+import asyncio
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import F, Min
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .db_threads import in_thread
+from .cache import (
+    PAGES_VERSION_KEY,
+    POSTS_VERSION_KEY,
+    bump_version,
+    get_version,
+)
+from .models import Post
+
+NO_SCHEDULED_POSTS = 'none'
+
+
+# Посылается в транзакции публикации со списками id постов, которые
+# стали видимыми (published) и скрытыми (withdrawn). update() не вызывает
+# post_save, поэтому производные таблицы обновляются по этому сигналу.
+visibility_changed = Signal()
+
+
+def due_posts(now):
+    """Посты, видимость которых пора поменять, по целевому is_visible.
+
+    Расписание читается только с основной базы: реплика может отставать,
+    и по её устаревшим строкам посты «публиковались» бы на каждом запросе.
+    """
+    posts = Post.objects.using(DEFAULT_DB_ALIAS)
+    return {
+        True: posts.filter(is_visible=False, pub_date__lte=now),
+        False: posts.filter(is_visible=True, pub_date__gt=now),
+    }
+
+
+def publish_due_posts(now=None):
+    now = now or timezone.now()
+    due = due_posts(now)
+    if not any(posts.exists() for posts in due.values()):
+        return 0, 0
+    with transaction.atomic(using=DEFAULT_DB_ALIAS):
+        # Пустая запись берёт блокировку записи SQLite: до коммита другие
+        # процессы эти посты не изменят, так что прочитанные ниже id —
+        # ровно те строки, которые изменит update().
+        for posts in due.values():
+            posts.update(is_visible=F('is_visible'))
+        ids = {
+            is_visible: list(
+                posts.select_for_update().values_list('pk', flat=True)
+            )
+            for is_visible, posts in due.items()
+        }
+        if not (ids[True] or ids[False]):
+            # Посты уже обработал другой процесс.
+            return 0, 0
+        for is_visible, posts in due.items():
+            posts.filter(pk__in=ids[is_visible]).update(
+                is_visible=is_visible, updated_at=now
+            )
+        visibility_changed.send(
+            sender=Post, published=ids[True], withdrawn=ids[False]
+        )
+    bump_version(POSTS_VERSION_KEY)
+    bump_version(PAGES_VERSION_KEY)
+    return len(ids[True]), len(ids[False])
+
+
+def next_due_key():
+    return f'blog:next_due:{get_version(POSTS_VERSION_KEY)}'
+
+
+def publish_if_due():
+    key = next_due_key()
+    due = cache.get(key)
+    if due is None:
+        due = Post.objects.using(DEFAULT_DB_ALIAS).filter(
+            is_visible=False
+        ).aggregate(due=Min('pub_date'))['due'] or NO_SCHEDULED_POSTS
+        cache.set(key, due, None)
+    if due != NO_SCHEDULED_POSTS and due <= timezone.now():
+        publish_due_posts()
+
+
+class PublishScheduledMiddleware:
+    """Публикует отложенные посты, как только подошло их время."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        if request.method == 'GET':
+            publish_if_due()
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        if request.method == 'GET':
+            await in_thread(publish_if_due)
+        return await self.get_response(request)
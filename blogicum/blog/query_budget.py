@@ -0,0 +1,77 @@
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.urls import Resolver404, resolve
+
+# Худший случай: вошедший пользователь, страница page>1 и пустой кэш
+# числа постов. Общие запросы — сессия, пользователь, строки для ETag,
+# подсчёт постов и сама страница.
+FEED_QUERY_BUDGETS = {
+    'blog:index': 5,
+    # Плюс категория; страница ленты категории — строки ленты и посты.
+    'blog:category_posts': 7,
+    # Плюс автор профиля и проверка подписки на него.
+    'blog:profile': 7,
+}
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryCounter:
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append(sql)
+        return execute(sql, params, many, context)
+
+    def __len__(self):
+        return len(self.queries)
+
+
+@contextmanager
+def query_budget(limit, label='block'):
+    counter = QueryCounter()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(counter))
+        yield counter
+    if len(counter) > limit:
+        raise QueryBudgetExceeded(
+            f'{label}: {len(counter)} SQL queries, budget is {limit}.\n'
+            + '\n'.join(counter.queries)
+        )
+
+
+class QueryBudgetMiddleware:
+    """В режиме DEBUG падает, если лента превысила бюджет запросов.
+
+    Считаются только запросы из потока запроса, пока ответ не вернулся из
+    view. Не попадают в счёт запросы при отдаче тела StreamingHttpResponse
+    (потоковые страницы с per_page) и запросы async-представлений, которые
+    in_thread выполняет в других потоках: у каждого потока свои
+    соединения, и их запросы этот счётчик не видит.
+    """
+
+    def __init__(self, get_response):
+        if not settings.DEBUG:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.budgets = getattr(
+            settings, 'FEED_QUERY_BUDGETS', FEED_QUERY_BUDGETS
+        )
+
+    def __call__(self, request):
+        try:
+            view_name = resolve(request.path_info).view_name
+        except Resolver404:
+            view_name = None
+        if view_name not in self.budgets:
+            return self.get_response(request)
+        with query_budget(self.budgets[view_name], view_name):
+            return self.get_response(request)
@@ -0,0 +1,104 @@
+import asyncio
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.urls import Resolver404, resolve
+
+READ_ONLY_VIEWS = (
+    'blog:index',
+    'blog:category_posts',
+    'blog:profile',
+    'blog:post_detail',
+    'blog:post_comments',
+    'blog:search',
+    'blog:feed',
+)
+PRIMARY_ONLY_APPS = ('sessions',)
+STICKY_COOKIE = 'use_primary'
+
+replica_allowed = ContextVar('replica_allowed', default=False)
+
+
+def get_replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', ())
+
+
+class PrimaryReplicaRouter:
+    """Читает в режиме «только чтение» с реплик, всё остальное — с default."""
+
+    def db_for_read(self, model, **hints):
+        replicas = get_replicas()
+        if (
+            replicas
+            and replica_allowed.get()
+            and model._meta.app_label not in PRIMARY_ONLY_APPS
+        ):
+            return random.choice(replicas)
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in get_replicas()
+
+
+class ReplicaRoutingMiddleware:
+    """Отправляет чтение лент на реплики, а автора — на default после записи.
+
+    После любого небезопасного запроса клиент получает куку, и следующие
+    REPLICA_STICKY_SECONDS секунд его запросы читают с основной базы.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sticky_seconds = getattr(settings, 'REPLICA_STICKY_SECONDS', 10)
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        token = replica_allowed.set(self.can_use_replica(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            replica_allowed.reset(token)
+        return self.process_response(request, response)
+
+    async def __acall__(self, request):
+        token = replica_allowed.set(self.can_use_replica(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            replica_allowed.reset(token)
+        return self.process_response(request, response)
+
+    def process_response(self, request, response):
+        if request.method not in ('GET', 'HEAD', 'OPTIONS') and get_replicas():
+            response.set_cookie(
+                STICKY_COOKIE,
+                '1',
+                max_age=self.sticky_seconds,
+                httponly=True,
+                samesite='Lax'
+            )
+        return response
+
+    def can_use_replica(self, request):
+        if request.method not in ('GET', 'HEAD'):
+            return False
+        if STICKY_COOKIE in request.COOKIES:
+            return False
+        try:
+            view_name = resolve(request.path_info).view_name
+        except Resolver404:
+            return False
+        return view_name in READ_ONLY_VIEWS
@@ -0,0 +1,274 @@
+"""Полнотекстовый поиск по заголовкам и текстам постов.
+
+В SQLite с FTS5 индекс — виртуальная таблица blog_post_search: в неё
+пишутся основы слов из stemming.tokenize, а ранжирует сама SQLite
+функцией bm25(). На других базах и в SQLite без FTS5 работает
+инвертированный индекс в памяти процесса, который считает BM25 по той же
+формуле, что и FTS5. Оба индекса обновляются сигналами при сохранении и
+удалении поста; целиком их перестраивает команда rebuild_search_index.
+"""
+import heapq
+import math
+import threading
+from collections import Counter, defaultdict
+
+from django.db import OperationalError, connections, router
+
+from .cache import bump_version, get_version
+from .get_objects import filter_for_post
+from .models import Category, Post
+from .stemming import tokenize
+
+SEARCH_TABLE = 'blog_post_search'
+SEARCH_LIMIT = 1000
+SEARCH_VERSION_KEY = 'blog:search_version'
+TITLE_WEIGHT = 2.0
+BM25_K1 = 1.2
+BM25_B = 0.75
+FILL_CHUNK_SIZE = 2000
+VISIBLE_CHUNK_SIZE = 500
+
+_search_tables = {}
+_lock = threading.Lock()
+
+
+def query_terms(query):
+    return list(dict.fromkeys(tokenize(query)))
+
+
+def has_search_table(connection):
+    key = connection.alias, connection.settings_dict['NAME']
+    if key not in _search_tables:
+        _search_tables[key] = (
+            connection.vendor == 'sqlite'
+            and SEARCH_TABLE in connection.introspection.table_names()
+        )
+    return _search_tables[key]
+
+
+def create_search_table(connection):
+    """Создаёт таблицу FTS5; False, если база её не поддерживает."""
+    _search_tables.clear()
+    if connection.vendor != 'sqlite':
+        return False
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} '
+                "USING fts5(title, text, tokenize='unicode61 "
+                "remove_diacritics 0')"
+            )
+    except OperationalError:
+        return False
+    return True
+
+
+def drop_search_table(connection):
+    _search_tables.clear()
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+
+def search_row(pk, title, text):
+    return pk, ' '.join(tokenize(title)), ' '.join(tokenize(text))
+
+
+def insert_rows(cursor, rows):
+    cursor.executemany(
+        f'INSERT INTO {SEARCH_TABLE}(rowid, title, text) VALUES (%s, %s, %s)',
+        rows
+    )
+
+
+def fill_search_table(connection, posts):
+    # Пачки читаются по pk целиком, до вставки: открытый курсор чтения
+    # держал бы все вставки в одной транзакции, и WAL рос бы без
+    # контрольных точек.
+    rows = posts.order_by('pk').values_list('pk', 'title', 'text')
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        last = 0
+        while True:
+            batch = list(rows.filter(pk__gt=last)[:FILL_CHUNK_SIZE])
+            if not batch:
+                return
+            insert_rows(cursor, [search_row(*row) for row in batch])
+            last = batch[-1][0]
+
+
+def fts_search(connection, terms, limit):
+    """Лучшие по bm25() видимые посты; видимость проверяется в том же
+    запросе, поэтому скрытые посты не занимают места в limit."""
+    if not terms:
+        return []
+    match = ' '.join(f'"{term}"' for term in terms)
+    posts = Post._meta.db_table
+    categories = Category._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT {SEARCH_TABLE}.rowid FROM {SEARCH_TABLE} '
+            f'JOIN {posts} ON {posts}.id = {SEARCH_TABLE}.rowid '
+            f'JOIN {categories} ON {categories}.id = {posts}.category_id '
+            f'WHERE {SEARCH_TABLE} MATCH %s '
+            f'AND {posts}.is_published AND {posts}.is_visible '
+            f'AND {categories}.is_published '
+            f'ORDER BY bm25({SEARCH_TABLE}, {TITLE_WEIGHT}, 1.0) '
+            'LIMIT %s',
+            [match, limit]
+        )
+        return [pk for pk, in cursor.fetchall()]
+
+
+def visible_ids(ids, limit):
+    """Первые limit видимых постов из ids, с сохранением порядка."""
+    found = []
+    for start in range(0, len(ids), VISIBLE_CHUNK_SIZE):
+        chunk = ids[start:start + VISIBLE_CHUNK_SIZE]
+        visible = set(
+            filter_for_post(Post.objects.filter(pk__in=chunk)).values_list(
+                'pk', flat=True
+            )
+        )
+        found.extend(pk for pk in chunk if pk in visible)
+        if len(found) >= limit:
+            return found[:limit]
+    return found
+
+
+class MemoryIndex:
+    """Инвертированный индекс в памяти: основа -> {id поста: вес}.
+
+    Вес — число вхождений, в заголовке умноженное на TITLE_WEIGHT, как у
+    bm25() в FTS5; длина документа — число слов в обоих полях.
+    """
+
+    def __init__(self):
+        self.postings = defaultdict(dict)
+        self.lengths = {}
+        self.terms = {}
+        self.total_length = 0
+        self.version = None
+
+    def add(self, pk, title, text):
+        self.remove(pk)
+        title, text = tokenize(title), tokenize(text)
+        weights = Counter(text)
+        for term in title:
+            weights[term] += TITLE_WEIGHT
+        for term, weight in weights.items():
+            self.postings[term][pk] = weight
+        self.terms[pk] = tuple(weights)
+        self.lengths[pk] = len(title) + len(text)
+        self.total_length += self.lengths[pk]
+
+    def remove(self, pk):
+        for term in self.terms.pop(pk, ()):
+            postings = self.postings[term]
+            del postings[pk]
+            if not postings:
+                del self.postings[term]
+        self.total_length -= self.lengths.pop(pk, 0)
+
+    def fill(self, posts):
+        self.__init__()
+        rows = posts.values_list('pk', 'title', 'text').iterator(
+            chunk_size=FILL_CHUNK_SIZE
+        )
+        for row in rows:
+            self.add(*row)
+
+    def search(self, terms, limit):
+        postings = [self.postings.get(term, {}) for term in terms]
+        if not postings or not all(postings):
+            return []
+        postings.sort(key=len)
+        found = set(postings[0]).intersection(*postings[1:])
+        documents = len(self.lengths)
+        average = self.total_length / documents
+        idfs = [
+            max(math.log((documents - len(term_postings) + 0.5)
+                         / (len(term_postings) + 0.5)), 1e-6)
+            for term_postings in postings
+        ]
+        scores = {}
+        for pk in found:
+            norm = BM25_K1 * (
+                1 - BM25_B + BM25_B * self.lengths[pk] / average
+            )
+            scores[pk] = sum(
+                idf * term_postings[pk] * (BM25_K1 + 1)
+                / (term_postings[pk] + norm)
+                for idf, term_postings in zip(idfs, postings)
+            )
+        if limit is None:
+            return sorted(scores, key=scores.get, reverse=True)
+        return heapq.nlargest(limit, scores, key=scores.get)
+
+
+_memory_index = MemoryIndex()
+
+
+def memory_index():
+    """Индекс в памяти, перестроенный, если посты менял другой процесс."""
+    with _lock:
+        version = get_version(SEARCH_VERSION_KEY)
+        if _memory_index.version != version:
+            _memory_index.fill(Post.objects.all())
+            _memory_index.version = version
+        return _memory_index
+
+
+def update_memory_index(change):
+    with _lock:
+        current = _memory_index.version == get_version(SEARCH_VERSION_KEY)
+        bump_version(SEARCH_VERSION_KEY)
+        if current:
+            change(_memory_index)
+            _memory_index.version = get_version(SEARCH_VERSION_KEY)
+
+
+def index_post(post):
+    connection = connections[router.db_for_write(Post)]
+    if not has_search_table(connection):
+        update_memory_index(
+            lambda index: index.add(post.pk, post.title, post.text)
+        )
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [post.pk]
+        )
+        insert_rows(cursor, [search_row(post.pk, post.title, post.text)])
+
+
+def unindex_post(pk):
+    connection = connections[router.db_for_write(Post)]
+    if not has_search_table(connection):
+        update_memory_index(lambda index: index.remove(pk))
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [pk])
+
+
+def rebuild_index():
+    connection = connections[router.db_for_write(Post)]
+    if has_search_table(connection):
+        fill_search_table(connection, Post.objects.using(connection.alias))
+    else:
+        update_memory_index(lambda index: index.fill(Post.objects.all()))
+
+
+def search_posts(query, limit=SEARCH_LIMIT):
+    """id видимых постов со всеми словами запроса, от лучшего к худшему.
+
+    Индекс в памяти не знает о видимости, поэтому ранжирует все
+    совпадения, а видимые выбираются пачками, пока не наберётся limit.
+    """
+    terms = query_terms(query)
+    if not terms:
+        return []
+    connection = connections[router.db_for_read(Post)]
+    if has_search_table(connection):
+        return fts_search(connection, terms, limit)
+    return visible_ids(memory_index().search(terms, None), limit)
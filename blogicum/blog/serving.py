@@ -0,0 +1,223 @@
+"""Раздача статики и медиа самим Django, без отдельного веб-сервера.
+
+Файлы отдаются через FileResponse: WSGI-сервер с wsgi.file_wrapper
+(gunicorn, uWSGI) пишет их в сокет через sendfile, не копируя в память
+процесса. Для статики выбирается сжатая копия .br или .gz, собранная
+collectstatic, для медиа работают запросы Range. Файлы с хэшем
+содержимого в имени браузер кэширует навсегда, остальные — проверяет
+по ETag и Last-Modified.
+"""
+import mimetypes
+import re
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.urls import re_path
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe
+
+from .storage import (
+    IMMUTABLE_CACHE_CONTROL,
+    PRECOMPRESSED,
+    is_content_addressed,
+)
+
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+HASHED_STATIC_NAME = re.compile(r'\.[0-9a-f]{12}\.\w+$')
+RANGE_HEADER = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeFile:
+    """Файл, из которого читаются только байты [start, start + length).
+
+    fileno() остаётся доступен, поэтому sendfile отправит ровно
+    Content-Length байт с текущей позиции.
+    """
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def find_file(root, path):
+    if not root:
+        return None
+    try:
+        fullpath = Path(safe_join(root, path))
+    except SuspiciousFileOperation:
+        return None
+    return fullpath if fullpath.is_file() else None
+
+
+def accepted_encodings(request):
+    encodings = set()
+    for item in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        coding, _, params = item.partition(';')
+        quality = params.strip().partition('q=')[2]
+        try:
+            if quality and float(quality) == 0:
+                continue
+        except ValueError:
+            continue
+        encodings.add(coding.strip().lower())
+    return encodings
+
+
+def choose_variant(request, fullpath):
+    """Сжатая копия файла, которую примет клиент.
+
+    Возвращает путь, кодировку (None — без сжатия) и признак того, что
+    у файла есть сжатые копии и ответ зависит от Accept-Encoding.
+    """
+    accepted = accepted_encodings(request)
+    negotiated = False
+    for encoding, suffix in PRECOMPRESSED.items():
+        variant = fullpath.with_name(fullpath.name + suffix)
+        if not variant.is_file():
+            continue
+        negotiated = True
+        if encoding in accepted:
+            return variant, encoding, negotiated
+    return fullpath, None, negotiated
+
+
+def parse_range(header, size):
+    """Первый и последний байт из Range: bytes=a-b, bytes=a- или bytes=-n.
+
+    Для нескольких диапазонов и непонятного заголовка возвращает None —
+    тогда отдаётся весь файл. Первый байт за концом файла означает
+    ответ 416.
+    """
+    match = RANGE_HEADER.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        suffix = int(last)
+        return (max(size - suffix, 0) if suffix else size), size - 1
+    first = int(first)
+    if last and int(last) < first:
+        return None
+    return first, min(int(last), size - 1) if last else size - 1
+
+
+def if_range_matches(request, etag, last_modified):
+    header = request.META.get('HTTP_IF_RANGE')
+    if not header:
+        return True
+    if header.startswith('"'):
+        return header == etag
+    return parse_http_date_safe(header) == last_modified
+
+
+def file_response(request, fullpath, size, etag, last_modified):
+    byte_range = None
+    if 'HTTP_RANGE' in request.META and if_range_matches(
+        request, etag, last_modified
+    ):
+        byte_range = parse_range(request.META['HTTP_RANGE'], size)
+    if byte_range is None:
+        return FileResponse(fullpath.open('rb'))
+    first, last = byte_range
+    if first >= size:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    length = last - first + 1
+    response = FileResponse(
+        RangeFile(fullpath.open('rb'), first, length), status=206
+    )
+    response['Content-Length'] = length
+    response['Content-Range'] = f'bytes {first}-{last}/{size}'
+    return response
+
+
+def serve_file(request, fullpath, cache_control):
+    served, encoding, negotiated = choose_variant(request, fullpath)
+    stat = served.stat()
+    last_modified = int(stat.st_mtime)
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is None:
+        if encoding:
+            response = FileResponse(
+                served.open('rb'), filename=fullpath.name
+            )
+            response['Content-Encoding'] = encoding
+        else:
+            response = file_response(
+                request, served, stat.st_size, etag, last_modified
+            )
+            response['Accept-Ranges'] = 'bytes'
+        content_type, _ = mimetypes.guess_type(fullpath.name)
+        response['Content-Type'] = content_type or 'application/octet-stream'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = cache_control
+    if negotiated:
+        patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+def serve_static(request, path):
+    """Статика из STATIC_ROOT, а при DEBUG до collectstatic — из исходников."""
+    fullpath = find_file(settings.STATIC_ROOT, path)
+    if fullpath is None and settings.DEBUG:
+        try:
+            found = finders.find(path)
+        except SuspiciousFileOperation:
+            found = None
+        fullpath = Path(found) if found else None
+    if fullpath is None:
+        raise Http404('Файл не найден.')
+    if HASHED_STATIC_NAME.search(path):
+        return serve_file(request, fullpath, IMMUTABLE_CACHE_CONTROL)
+    return serve_file(request, fullpath, REVALIDATE_CACHE_CONTROL)
+
+
+def serve_media(request, path):
+    fullpath = find_file(settings.MEDIA_ROOT, path)
+    if fullpath is None:
+        raise Http404('Файл не найден.')
+    if is_content_addressed(path):
+        return serve_file(request, fullpath, IMMUTABLE_CACHE_CONTROL)
+    return serve_file(request, fullpath, REVALIDATE_CACHE_CONTROL)
+
+
+def file_pattern(prefix, view):
+    if not prefix or urlsplit(prefix).netloc:
+        return []
+    return [re_path(
+        r'^%s(?P<path>.*)$' % re.escape(prefix.lstrip('/')), view
+    )]
+
+
+def file_urlpatterns():
+    """URL статики и медиа; префиксы на другом домене (CDN) пропускаются."""
+    return (
+        file_pattern(settings.STATIC_URL, serve_static)
+        + file_pattern(settings.MEDIA_URL, serve_media)
+    )
@@ -0,0 +1,141 @@
+from django.db.backends.signals import connection_created
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import PAGES_VERSION_KEY, POSTS_VERSION_KEY, bump_version
+from .category_feed import (
+    FEED_FIELDS,
+    refresh_category,
+    refresh_post,
+    refresh_visibility,
+)
+from .following import (
+    FANOUT_FIELDS,
+    backfill_inbox,
+    clear_inbox,
+    fan_out_post,
+    refresh_category_inboxes,
+    refresh_inbox_visibility,
+)
+from .models import Category, Comment, Follow, Location, Post, User
+from .publishing import visibility_changed
+from .search import index_post, unindex_post
+from .sqlite import tune_sqlite_connection
+from .thumbnails import schedule_renditions
+
+connection_created.connect(tune_sqlite_connection)
+
+
+@receiver(pre_save, sender=Post)
+def stamp_post(instance, **kwargs):
+    now = timezone.now()
+    instance.is_visible = instance.pub_date <= now
+    if instance.updated_at is None:
+        instance.updated_at = now
+
+
+@receiver(post_save, sender=Post)
+def queue_renditions(instance, raw, **kwargs):
+    if not raw and instance.image and (
+        instance.renditions_for != instance.image.name
+    ):
+        schedule_renditions(instance.image.name)
+
+
+@receiver(post_save, sender=Post)
+def update_category_feed(instance, update_fields=None, **kwargs):
+    if update_fields is None or FEED_FIELDS & update_fields:
+        refresh_post(instance)
+
+
+@receiver(post_save, sender=Category)
+def update_category_feeds(instance, **kwargs):
+    refresh_category(instance)
+
+
+@receiver(visibility_changed)
+def update_category_feed_visibility(published, withdrawn, **kwargs):
+    refresh_visibility(published, withdrawn)
+
+
+@receiver(post_save, sender=Post)
+def update_follower_inboxes(instance, update_fields=None, **kwargs):
+    if update_fields is None or FANOUT_FIELDS & update_fields:
+        fan_out_post(instance)
+
+
+@receiver(post_save, sender=Category)
+def update_category_inboxes(instance, **kwargs):
+    refresh_category_inboxes(instance)
+
+
+@receiver(visibility_changed)
+def update_inbox_visibility(published, withdrawn, **kwargs):
+    refresh_inbox_visibility(published, withdrawn)
+
+
+@receiver(post_save, sender=Follow)
+def fill_follower_inbox(instance, created, **kwargs):
+    if created and instance.fanout:
+        backfill_inbox(instance)
+
+
+@receiver(post_delete, sender=Follow)
+def clear_follower_inbox(instance, **kwargs):
+    clear_inbox(instance)
+
+
+@receiver(post_save, sender=Post)
+def update_search_index(instance, update_fields=None, **kwargs):
+    if update_fields is None or {'title', 'text'} & update_fields:
+        index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def remove_from_search_index(instance, **kwargs):
+    unindex_post(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Post)
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_posts_count(**kwargs):
+    bump_version(POSTS_VERSION_KEY)
+
+
+@receiver([post_save, post_delete], sender=Post)
+@receiver([post_save, post_delete], sender=Comment)
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=Location)
+@receiver([post_save, post_delete], sender=Follow)
+def invalidate_pages(**kwargs):
+    bump_version(PAGES_VERSION_KEY)
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_profile_pages(update_fields=None, **kwargs):
+    if update_fields != frozenset({'last_login'}):
+        bump_version(PAGES_VERSION_KEY)
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(instance, created, raw, **kwargs):
+    if raw:
+        return
+    posts = Post.objects.filter(pk=instance.post_id)
+    if created:
+        posts.update(
+            comment_count=F('comment_count') + 1,
+            updated_at=timezone.now()
+        )
+    else:
+        posts.update(updated_at=timezone.now())
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(instance, **kwargs):
+    Post.objects.filter(pk=instance.post_id, comment_count__gt=0).update(
+        comment_count=F('comment_count') - 1,
+        updated_at=timezone.now()
+    )
@@ -0,0 +1,135 @@
+"""Разбиение текста на слова и стемминг русских слов.
+
+Стеммер — алгоритм Snowball для русского языка
+(https://snowballstem.org/algorithms/russian/stemmer.html): окончания
+отрезаются только в области RV, словообразовательный суффикс -ость —
+в R2. Латиница и числа только приводятся к нижнему регистру.
+"""
+import re
+from functools import lru_cache
+
+STEM_CACHE_SIZE = 100_000
+VOWELS = 'аеиоуыэюя'
+WORD = re.compile(r'[^\W_]+')
+CYRILLIC = re.compile(r'[а-я]')
+
+PERFECTIVE_GERUND = (
+    (('в', 'вши', 'вшись'), True),
+    (('ив', 'ивши', 'ившись', 'ыв', 'ывши', 'ывшись'), False),
+)
+ADJECTIVE = ((
+    'ее', 'ие', 'ые', 'ое', 'ими', 'ыми', 'ей', 'ий', 'ый', 'ой', 'ем',
+    'им', 'ым', 'ом', 'его', 'ого', 'ему', 'ому', 'их', 'ых', 'ую', 'юю',
+    'ая', 'яя', 'ою', 'ею',
+), False),
+PARTICIPLE = (
+    (('ем', 'нн', 'вш', 'ющ', 'щ'), True),
+    (('ивш', 'ывш', 'ующ'), False),
+)
+REFLEXIVE = (('ся', 'сь'), False),
+VERB = (
+    ((
+        'ла', 'на', 'ете', 'йте', 'ли', 'й', 'л', 'ем', 'н', 'ло', 'но',
+        'ет', 'ют', 'ны', 'ть', 'ешь', 'нно',
+    ), True),
+    ((
+        'ила', 'ыла', 'ена', 'ейте', 'уйте', 'ите', 'или', 'ыли', 'ей',
+        'уй', 'ил', 'ыл', 'им', 'ым', 'ен', 'ило', 'ыло', 'ено', 'ят',
+        'ует', 'уют', 'ит', 'ыт', 'ены', 'ить', 'ыть', 'ишь', 'ую', 'ю',
+    ), False),
+)
+NOUN = ((
+    'а', 'ев', 'ов', 'ие', 'ье', 'е', 'иями', 'ями', 'ами', 'еи', 'ии',
+    'и', 'ией', 'ей', 'ой', 'ий', 'й', 'иям', 'ям', 'ием', 'ем', 'ам',
+    'ом', 'о', 'у', 'ах', 'иях', 'ях', 'ы', 'ь', 'ию', 'ью', 'ю', 'ия',
+    'ья', 'я',
+), False),
+SUPERLATIVE = (('ейше', 'ейш'), False),
+DERIVATIONAL = (('ость', 'ост'), False),
+
+STOP_WORDS = frozenset((
+    'а', 'без', 'бы', 'в', 'во', 'вот', 'да', 'для', 'до', 'же', 'за',
+    'и', 'из', 'или', 'к', 'ко', 'ли', 'на', 'над', 'не', 'ни', 'но',
+    'о', 'об', 'от', 'по', 'под', 'при', 'с', 'со', 'так', 'то', 'у',
+    'уж', 'что', 'это',
+))
+
+
+def regions(word):
+    """Начала областей RV и R2."""
+    rv = r1 = r2 = len(word)
+    for number, letter in enumerate(word):
+        if letter in VOWELS:
+            rv = number + 1
+            break
+    for number in range(1, len(word)):
+        if word[number] not in VOWELS and word[number - 1] in VOWELS:
+            r1 = number + 1
+            break
+    for number in range(r1 + 1, len(word)):
+        if word[number] not in VOWELS and word[number - 1] in VOWELS:
+            r2 = number + 1
+            break
+    return rv, r2
+
+
+def strip_ending(word, start, groups):
+    """Отрезает самое длинное окончание из groups, лежащее после start.
+
+    Окончания из группы с флагом должны идти после «а» или «я». Если
+    подходящего окончания нет, возвращает None.
+    """
+    found = None
+    for endings, after_a in groups:
+        for ending in endings:
+            if (
+                word.endswith(ending)
+                and len(word) - len(ending) >= start
+                and (found is None or len(ending) > len(found[0]))
+            ):
+                found = ending, after_a
+    if found is None:
+        return None
+    ending, after_a = found
+    end = len(word) - len(ending)
+    if after_a and (end - 1 < start or word[end - 1] not in 'ая'):
+        return None
+    return word[:end]
+
+
+@lru_cache(maxsize=STEM_CACHE_SIZE)
+def stem(word):
+    word = word.lower().replace('ё', 'е')
+    rv, r2 = regions(word)
+    stemmed = strip_ending(word, rv, PERFECTIVE_GERUND)
+    if stemmed is None:
+        word = strip_ending(word, rv, REFLEXIVE) or word
+        stemmed = strip_ending(word, rv, ADJECTIVE)
+        if stemmed is not None:
+            stemmed = strip_ending(stemmed, rv, PARTICIPLE) or stemmed
+        else:
+            stemmed = strip_ending(word, rv, VERB)
+        if stemmed is None:
+            stemmed = strip_ending(word, rv, NOUN)
+    word = word if stemmed is None else stemmed
+    if word.endswith('и') and len(word) - 1 >= rv:
+        word = word[:-1]
+    word = strip_ending(word, r2, DERIVATIONAL) or word
+    superlative = strip_ending(word, rv, SUPERLATIVE)
+    if superlative is not None:
+        word = superlative
+    if word.endswith('нн') and len(word) - 2 >= rv:
+        return word[:-1]
+    if superlative is None and word.endswith('ь') and len(word) - 1 >= rv:
+        return word[:-1]
+    return word
+
+
+def tokenize(text):
+    """Основы значимых слов текста в порядке следования."""
+    terms = []
+    for word in WORD.findall(text.lower()):
+        if word in STOP_WORDS:
+            continue
+        terms.append(stem(word) if CYRILLIC.search(word) else word)
+    return terms
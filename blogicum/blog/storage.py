@@ -0,0 +1,124 @@
+import gzip
+import hashlib
+import mimetypes
+import posixpath
+import re
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+CONTENT_ADDRESSED_NAME = re.compile(r'^[\w-]+/[0-9a-f]{2}/[0-9a-f]{64}\.\w+$')
+# Кодировки сжатых копий статики в порядке предпочтения.
+PRECOMPRESSED = {'br': '.br', 'gzip': '.gz'}
+COMPRESSIBLE_TYPES = (
+    'application/javascript',
+    'application/json',
+    'application/manifest+json',
+    'application/xml',
+    'image/svg+xml',
+    'image/vnd.microsoft.icon',
+)
+# Копия, сжатая хуже, чем до 90% исходного размера, не сохраняется.
+MIN_COMPRESSION_RATIO = 0.9
+
+
+def file_digest(content):
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Хранит файл под SHA-256 его содержимого.
+
+    Одинаковые загрузки попадают в один файл, а имя меняется только
+    вместе с содержимым, поэтому URL можно кэшировать навсегда. Файлы
+    не удаляются вместе с постами: их может делить несколько постов,
+    неиспользуемые убирает команда collect_media.
+    """
+
+    def save(self, name, content, max_length=None):
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        digest = file_digest(content)
+        directory, filename = posixpath.split(name.replace('\\', '/'))
+        extension = posixpath.splitext(filename)[1].lower()
+        name = posixpath.join(directory, digest[:2], digest + extension)
+        if self.exists(name):
+            return name
+        return self._save(name, content)
+
+
+def is_content_addressed(name):
+    return bool(CONTENT_ADDRESSED_NAME.match(name))
+
+
+def get_compressors():
+    compressors = {}
+    if brotli is not None:
+        compressors['br'] = lambda data: brotli.compress(data, quality=11)
+    compressors['gzip'] = lambda data: gzip.compress(data, 9, mtime=0)
+    return compressors
+
+
+def is_compressible(name):
+    content_type, encoding = mimetypes.guess_type(name)
+    if encoding or not content_type:
+        return False
+    return (
+        content_type.startswith('text/')
+        or content_type in COMPRESSIBLE_TYPES
+    )
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Статика с хэшем в имени и заранее сжатыми копиями .br и .gz.
+
+    Сжатие выполняется один раз при collectstatic, с максимальной
+    степенью, а при запросе serve_static только выбирает подходящую
+    копию. Brotli используется, если установлен пакет brotli.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        names = set(paths) | set(self.hashed_files.values())
+        compressors = get_compressors()
+        for name in sorted(names):
+            if not is_compressible(name):
+                continue
+            for compressed in self.compress(name, compressors):
+                yield name, compressed, True
+
+    def compress(self, name, compressors):
+        with self.open(name) as file:
+            data = file.read()
+        for encoding, compress in compressors.items():
+            content = compress(data)
+            if len(content) > len(data) * MIN_COMPRESSION_RATIO:
+                continue
+            compressed = name + PRECOMPRESSED[encoding]
+            if self.exists(compressed):
+                self.delete(compressed)
+            yield self.save(compressed, ContentFile(content))
+
+    def stored_name(self, name):
+        # До первого collectstatic манифеста нет: отдаём исходное имя,
+        # его найдёт serve_static.
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
@@ -0,0 +1,97 @@
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.shortcuts import render
+from django.template.context import make_context
+from django.template.loader import get_template, render_to_string
+from django.utils.safestring import mark_safe
+
+from .paginator_for_posts import (
+    COUNT_FOR_PAGINATOR,
+    STREAM_CHUNK_SIZE,
+    StreamingCursorPage,
+)
+
+STREAM_MARKER = '<!--stream-rows-->'
+PAGINATOR_MARKER = '<!--stream-paginator-->'
+MAX_STREAM_PAGE_SIZE = 1000
+
+
+def stream_page_size(request):
+    if not request.user.is_staff:
+        return None
+    try:
+        per_page = int(request.GET['per_page'])
+    except (KeyError, ValueError):
+        return None
+    if per_page <= COUNT_FOR_PAGINATOR:
+        return None
+    return min(per_page, MAX_STREAM_PAGE_SIZE)
+
+
+def stream_all_comments(request):
+    """Все комментарии одной страницей — только для персонала."""
+    return request.user.is_staff and request.GET.get('comments') == 'all'
+
+
+def render_parts(request, template_name, context):
+    context = dict(
+        context,
+        stream_marker=mark_safe(STREAM_MARKER),
+        paginator_marker=mark_safe(PAGINATOR_MARKER),
+    )
+    return render_to_string(template_name, context, request).split(
+        STREAM_MARKER, 1
+    )
+
+
+def render_paginator(request, context, tail):
+    """Пагинатор зависит от has_next, который известен после строк."""
+    if PAGINATOR_MARKER not in tail:
+        return tail
+    paginator = get_template('includes/paginator.html').render(
+        context, request
+    )
+    return tail.replace(PAGINATOR_MARKER, paginator)
+
+
+def stream_rows(request, context, rows, row_template, row_name):
+    template = get_template(row_template).template
+    row_context = make_context(context, request)
+    buffer = []
+    with row_context.bind_template(template):
+        for row in rows:
+            with row_context.push({row_name: row}):
+                buffer.append(template.render(row_context))
+            if len(buffer) == STREAM_CHUNK_SIZE:
+                yield ''.join(buffer)
+                buffer = []
+    yield ''.join(buffer)
+
+
+def stream_render(request, template_name, context, rows, row_template,
+                  row_name):
+    head, tail = render_parts(request, template_name, context)
+
+    def chunks():
+        yield head
+        yield from stream_rows(request, context, rows, row_template, row_name)
+        yield render_paginator(request, context, tail)
+
+    return StreamingHttpResponse(
+        chunks(),
+        content_type=f'text/html; charset={settings.DEFAULT_CHARSET}'
+    )
+
+
+def render_feed(request, template_name, context):
+    page_obj = context['page_obj']
+    if isinstance(page_obj, StreamingCursorPage):
+        return stream_render(
+            request,
+            template_name,
+            context,
+            page_obj,
+            'includes/post_row.html',
+            'post'
+        )
+    return render(request, template_name, context)
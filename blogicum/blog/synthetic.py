@@ -0,0 +1,181 @@
+"""Синтетические пользователи, посты и комментарии для нагрузочных тестов.
+
+Генераторы выдают несохранённые объекты с заранее выбранными pk, чтобы
+ссылаться на них без запросов к базе, и ничего не держат в памяти:
+миллионы объектов сохраняет bulk_load.bulk_load пачками. Распределения
+неравномерные, как у живого блога: несколько авторов пишут большую часть
+постов, у свежих постов больше комментариев, часть постов снята с
+публикации или отложена.
+"""
+import random
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import Category, Comment, Location, Post, User
+
+WORDS = (
+    'день', 'город', 'время', 'дорога', 'утро', 'вечер', 'друг', 'море',
+    'книга', 'кофе', 'работа', 'проект', 'история', 'идея', 'вопрос',
+    'ответ', 'погода', 'солнце', 'дождь', 'снег', 'лес', 'река', 'гора',
+    'поезд', 'самолёт', 'путешествие', 'музей', 'театр', 'кино', 'музыка',
+    'песня', 'концерт', 'выставка', 'парк', 'улица', 'дом', 'окно',
+    'кухня', 'ужин', 'завтрак', 'обед', 'рецепт', 'пирог', 'чай', 'сад',
+    'кот', 'собака', 'прогулка', 'спорт', 'бег', 'велосипед', 'здоровье',
+    'сон', 'отпуск', 'выходные', 'праздник', 'подарок', 'семья', 'детство',
+    'школа', 'учёба', 'экзамен', 'код', 'программа', 'ошибка', 'сервер',
+    'база', 'данные', 'запрос', 'страница', 'блог', 'пост', 'комментарий',
+    'новый', 'старый', 'большой', 'маленький', 'хороший', 'тёплый',
+    'холодный', 'быстрый', 'медленный', 'интересный', 'странный',
+    'красивый', 'долгий', 'короткий', 'первый', 'последний', 'главный',
+    'читать', 'писать', 'думать', 'гулять', 'ехать', 'смотреть',
+    'слушать', 'готовить', 'искать', 'находить', 'делать', 'начинать',
+    'заканчивать', 'вспоминать', 'рассказывать', 'сегодня', 'вчера',
+    'завтра', 'снова', 'наконец', 'почему', 'когда', 'очень', 'совсем',
+    'вместе', 'рядом', 'далеко', 'сначала', 'потом', 'вдруг', 'опять',
+)
+# Частоты по закону Ципфа, как у слов настоящих текстов.
+WORD_WEIGHTS = tuple(accumulate(1 / rank for rank in range(1, len(WORDS) + 1)))
+TITLE_WORDS = (2, 8)
+TEXT_WORDS = (20, 200)
+COMMENT_WORDS = (3, 40)
+UNPUBLISHED_SHARE = 0.05
+SCHEDULED_SHARE = 0.01
+SCHEDULE_DAYS = 30
+COMMENT_DELAY_DAYS = 7
+
+
+def sentence(rng, bounds):
+    words = rng.choices(
+        WORDS, cum_weights=WORD_WEIGHTS, k=rng.randint(*bounds)
+    )
+    return ' '.join(words).capitalize()
+
+
+def skewed(rng, first, count, power):
+    """pk из [first, first + count), чаще из начала диапазона."""
+    return first + int(count * rng.random() ** power)
+
+
+def next_pk(model):
+    return (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+
+class SyntheticData:
+    """Объекты для загрузки: пользователи, категории, места, посты и
+    комментарии, именно в таком порядке."""
+
+    def __init__(self, users, posts, comments, categories=50, locations=200,
+                 days=365, seed=1, password='password'):
+        if posts and not (users and categories):
+            raise ValueError('Для постов нужны пользователи и категории.')
+        if comments and not (posts and users):
+            raise ValueError('Для комментариев нужны посты и пользователи.')
+        self.rng = random.Random(seed)
+        self.counts = {
+            User: users,
+            Category: categories,
+            Location: locations,
+            Post: posts,
+            Comment: comments,
+        }
+        self.first = {model: next_pk(model) for model in self.counts}
+        self.days = days
+        self.now = timezone.now()
+        # Хешировать пароль для каждого пользователя слишком долго.
+        self.password = make_password(password)
+
+    def past(self, days):
+        return self.now - timezone.timedelta(
+            seconds=self.rng.uniform(0, days * 86400)
+        )
+
+    def pk_range(self, model):
+        first = self.first[model]
+        return range(first, first + self.counts[model])
+
+    def users(self):
+        for pk in self.pk_range(User):
+            yield User(
+                pk=pk,
+                username=f'user{pk}',
+                email=f'user{pk}@example.com',
+                password=self.password,
+                date_joined=self.past(self.days),
+            )
+
+    def categories(self):
+        for pk in self.pk_range(Category):
+            yield Category(
+                pk=pk,
+                title=sentence(self.rng, (1, 3)),
+                slug=f'category-{pk}',
+                description=sentence(self.rng, TITLE_WORDS),
+                created_at=self.past(self.days),
+            )
+
+    def locations(self):
+        for pk in self.pk_range(Location):
+            yield Location(
+                pk=pk,
+                name=sentence(self.rng, (1, 2)),
+                created_at=self.past(self.days),
+            )
+
+    def post_date(self, pk):
+        """Даты постов растут вместе с pk и покрывают последние days."""
+        share = (pk - self.first[Post] + 0.5) / self.counts[Post]
+        return self.now - timezone.timedelta(days=self.days * (1 - share))
+
+    def posts(self):
+        rng = self.rng
+        for pk in self.pk_range(Post):
+            pub_date = self.post_date(pk)
+            if rng.random() < SCHEDULED_SHARE:
+                pub_date = self.now + timezone.timedelta(
+                    seconds=rng.uniform(60, SCHEDULE_DAYS * 86400)
+                )
+            location = None
+            if rng.random() < 0.7:
+                location = skewed(
+                    rng, self.first[Location], self.counts[Location], 2
+                )
+            yield Post(
+                pk=pk,
+                title=sentence(rng, TITLE_WORDS),
+                text=sentence(rng, TEXT_WORDS) + '.',
+                pub_date=pub_date,
+                created_at=min(pub_date, self.now),
+                is_published=rng.random() >= UNPUBLISHED_SHARE,
+                author_id=skewed(rng, self.first[User], self.counts[User], 3),
+                category_id=skewed(
+                    rng, self.first[Category], self.counts[Category], 2
+                ),
+                location_id=location,
+            )
+
+    def comments(self):
+        rng = self.rng
+        # Свежие посты — в конце диапазона pk, у них больше комментариев.
+        last_post = self.first[Post] + self.counts[Post] - 1
+        for pk in self.pk_range(Comment):
+            post = last_post - int(self.counts[Post] * rng.random() ** 2)
+            delay = timezone.timedelta(
+                seconds=rng.uniform(0, COMMENT_DELAY_DAYS * 86400)
+            )
+            yield Comment(
+                pk=pk,
+                text=sentence(rng, COMMENT_WORDS),
+                post_id=post,
+                author_id=skewed(rng, self.first[User], self.counts[User], 2),
+                created_at=min(self.post_date(post) + delay, self.now),
+            )
+
+    def __iter__(self):
+        yield from self.users()
+        yield from self.categories()
+        yield from self.locations()
+        yield from self.posts()
+        yield from self.comments()
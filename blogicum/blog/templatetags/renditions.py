@@ -0,0 +1,10 @@
+from django import template
+
+from blog.thumbnails import picture
+
+register = template.Library()
+
+
+@register.inclusion_tag('includes/post_picture.html')
+def post_picture(post, rendition, lazy=False):
+    return dict(picture(post, rendition), lazy=lazy)
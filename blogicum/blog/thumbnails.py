@@ -0,0 +1,239 @@
+"""Уменьшенные копии картинок постов.
+
+Каждое превью сохраняется в формате оригинала и дополнительно в WebP и,
+если установлен pillow-avif-plugin, в AVIF; шаблоны отдают их через
+<picture> и srcset, и браузер сам выбирает формат и размер. Картинки
+не увеличиваются: в Post.renditions записаны форматы и настоящая ширина
+построенных превью, и srcset перечисляет только их.
+
+Превью строятся в пуле потоков после коммита транзакции, поэтому
+загрузка картинки не задерживает ответ. Пока превью нет, шаблоны
+показывают оригинал; когда они готовы, у поста меняется updated_at,
+и кэш карточек и страниц обновляется сам. С THUMBNAIL_WORKERS = 0
+превью строятся сразу после коммита в том же потоке, как в тестах.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .cache import PAGES_VERSION_KEY, bump_version
+from .models import Post
+
+try:
+    import pillow_avif  # noqa: F401
+except ImportError:
+    pillow_avif = None
+
+RENDITIONS = {
+    'thumb': (640, 1920),
+    'medium': (1280, 3840),
+}
+RENDITION_SIZES = '(max-width: 40rem) 100vw, 40rem'
+RENDITIONS_DIR = 'renditions'
+MODERN_FORMATS = {
+    'avif': ('AVIF', 'image/avif'),
+    'webp': ('WEBP', 'image/webp'),
+}
+SAVE_OPTIONS = {
+    'JPEG': {'quality': 85, 'optimize': True},
+    'PNG': {'optimize': True},
+    'WEBP': {'quality': 80, 'method': 6},
+    'AVIF': {'quality': 60},
+}
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_pending = set()
+_lock = threading.Lock()
+
+
+def available_formats():
+    Image.init()
+    return [
+        extension
+        for extension, (image_format, _) in MODERN_FORMATS.items()
+        if image_format in Image.SAVE
+    ]
+
+
+def rendition_name(image_name, rendition, extension=None):
+    name = f'{RENDITIONS_DIR}/{rendition}/{image_name}'
+    return f'{name}.{extension}' if extension else name
+
+
+def rendition_source(name):
+    """Имя картинки, из которой построено превью name."""
+    source = name.split('/', 2)[2]
+    stem, _, extension = source.rpartition('.')
+    if stem and extension in MODERN_FORMATS:
+        return stem
+    return source
+
+
+def rendition_srcset(post, extension=None):
+    image_name = post.image.name
+    return ', '.join(
+        f'{default_storage.url(rendition_name(image_name, name, extension))}'
+        f' {width}w'
+        for name, width in post.renditions['widths'].items()
+    )
+
+
+def picture(post, rendition):
+    """Данные для <picture>, а пока превью нет — только оригинал.
+
+    Для картинки без превью заодно ставит их построение в очередь.
+    Если картинка меньше превью rendition, берётся наибольшее из
+    построенных.
+    """
+    image_name = post.image.name
+    if post.renditions_for != image_name:
+        schedule_renditions(image_name)
+        return {'src': post.image.url}
+    widths = post.renditions['widths']
+    if rendition not in widths:
+        rendition = list(widths)[-1]
+    return {
+        'src': default_storage.url(rendition_name(image_name, rendition)),
+        'srcset': rendition_srcset(post),
+        'sizes': RENDITION_SIZES,
+        'sources': [
+            {
+                'type': MODERN_FORMATS[extension][1],
+                'srcset': rendition_srcset(post, extension),
+            }
+            for extension in post.renditions['formats']
+            if extension in MODERN_FORMATS
+        ],
+    }
+
+
+def resize(image, size):
+    image = image.copy()
+    image.thumbnail(size, Image.Resampling.LANCZOS)
+    return image
+
+
+def encode(image, image_format):
+    if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    elif image_format in ('WEBP', 'AVIF') and (
+        image.mode not in ('RGB', 'RGBA')
+    ):
+        image = image.convert(
+            'RGBA' if image.mode in ('LA', 'P', 'PA') else 'RGB'
+        )
+    buffer = BytesIO()
+    image.save(
+        buffer,
+        format=image_format,
+        **SAVE_OPTIONS.get(image_format, {})
+    )
+    return buffer.getvalue()
+
+
+def save_rendition(name, content):
+    if default_storage.exists(name):
+        default_storage.delete(name)
+    default_storage.save(name, ContentFile(content))
+
+
+def delete_rendition(name):
+    if default_storage.exists(name):
+        default_storage.delete(name)
+
+
+def make_renditions(image_name):
+    """Строит превью и записывает их настоящую ширину.
+
+    Картинки не увеличиваются: превью, которое вышло бы не шире
+    предыдущего, не строится, а его старые файлы удаляются.
+    """
+    storage = Post._meta.get_field('image').storage
+    with storage.open(image_name) as source:
+        image = Image.open(source)
+        image_format = image.format or 'JPEG'
+        image = ImageOps.exif_transpose(image)
+    extensions = available_formats()
+    widths = {}
+    for rendition, size in RENDITIONS.items():
+        names = [rendition_name(image_name, rendition)] + [
+            rendition_name(image_name, rendition, extension)
+            for extension in extensions
+        ]
+        resized = resize(image, size)
+        if widths and resized.width <= max(widths.values()):
+            for name in names:
+                delete_rendition(name)
+            continue
+        save_rendition(names[0], encode(resized, image_format))
+        for name, extension in zip(names[1:], extensions):
+            save_rendition(
+                name, encode(resized, MODERN_FORMATS[extension][0])
+            )
+        widths[rendition] = resized.width
+    updated = Post.objects.filter(image=image_name).update(
+        renditions_for=image_name,
+        renditions={'widths': widths, 'formats': extensions},
+        updated_at=timezone.now()
+    )
+    if updated:
+        bump_version(PAGES_VERSION_KEY)
+    return updated
+
+
+def build_renditions(image_name):
+    try:
+        make_renditions(image_name)
+    except Exception:
+        logger.exception('Не удалось построить превью для %s', image_name)
+    finally:
+        with _lock:
+            _pending.discard(image_name)
+
+
+def build_in_background(image_name):
+    try:
+        build_renditions(image_name)
+    finally:
+        close_old_connections()
+
+
+def get_workers():
+    return getattr(settings, 'THUMBNAIL_WORKERS', 2)
+
+
+def get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=get_workers(),
+                thread_name_prefix='thumbnails'
+            )
+    return _executor
+
+
+def submit_renditions(image_name):
+    with _lock:
+        if image_name in _pending:
+            return
+        _pending.add(image_name)
+    if get_workers():
+        get_executor().submit(build_in_background, image_name)
+    else:
+        build_renditions(image_name)
+
+
+def schedule_renditions(image_name):
+    transaction.on_commit(partial(submit_renditions, image_name))
@@ -0,0 +1,116 @@
+import warnings
+from functools import wraps
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.template.defaultfilters import filesizeformat
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from PIL import Image, UnidentifiedImageError
+
+MAX_IMAGE_BYTES = 10 * 1024 * 1024
+MAX_IMAGE_PIXELS = 40_000_000
+MAX_IMAGE_SIDE = 10_000
+HEADER_LIMIT = 256 * 1024
+
+
+def get_limits():
+    return (
+        getattr(settings, 'POST_IMAGE_MAX_BYTES', MAX_IMAGE_BYTES),
+        getattr(settings, 'POST_IMAGE_MAX_PIXELS', MAX_IMAGE_PIXELS),
+        getattr(settings, 'POST_IMAGE_MAX_SIDE', MAX_IMAGE_SIDE),
+    )
+
+
+def read_header(header):
+    """Формат и размер картинки по началу файла, без декодирования.
+
+    Возвращает None, пока заголовок пришёл не целиком или если это не
+    картинка.
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', Image.DecompressionBombWarning)
+        try:
+            with Image.open(BytesIO(header)) as image:
+                return image.format, image.size
+        except (UnidentifiedImageError, OSError):
+            return None
+
+
+def dimensions_error():
+    _, max_pixels, max_side = get_limits()
+    return (
+        'Картинка слишком большая: не больше '
+        f'{max_side} точек по стороне и {max_pixels // 10**6} Мп.'
+    )
+
+
+def check_dimensions(width, height):
+    _, max_pixels, max_side = get_limits()
+    if width * height > max_pixels or max(width, height) > max_side:
+        return dimensions_error()
+    return None
+
+
+class BoundedImageUploadHandler(TemporaryFileUploadHandler):
+    """Пишет загрузку на диск по частям и отсекает слишком большие картинки.
+
+    Объём проверяется на лету, а ширина и высота — по заголовку, как
+    только он пришёл, до декодирования пикселей. После ошибки остаток
+    файла читается из запроса, но не сохраняется, а саму ошибку
+    показывает форма (см. BoundedImageField).
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+        self.header = b''
+        self.metadata = None
+        self.error = None
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.error:
+            return None
+        self.received += len(raw_data)
+        max_bytes, _, _ = get_limits()
+        if self.received > max_bytes:
+            self.error = f'Файл больше {filesizeformat(max_bytes)}.'
+        elif self.metadata is None and len(self.header) < HEADER_LIMIT:
+            self.header += raw_data[:HEADER_LIMIT - len(self.header)]
+            self.error = self.read_metadata()
+        if self.error:
+            self.file.truncate(0)
+            return None
+        self.file.write(raw_data)
+        return None
+
+    def read_metadata(self):
+        try:
+            self.metadata = read_header(self.header)
+        except Image.DecompressionBombError:
+            return dimensions_error()
+        if self.metadata:
+            return check_dimensions(*self.metadata[1])
+        return None
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        file.upload_error = self.error
+        file.image_format, file.image_size = self.metadata or (None, None)
+        return file
+
+
+def bounded_image_uploads(view):
+    """Включает BoundedImageUploadHandler для view с формой поста.
+
+    Обработчики нельзя заменить после чтения request.POST, а его читает
+    CsrfViewMiddleware, поэтому CSRF проверяется уже внутри.
+    """
+    protected = csrf_protect(view)
+
+    @csrf_exempt
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        request.upload_handlers = [BoundedImageUploadHandler(request)]
+        return protected(request, *args, **kwargs)
+    return wrapper
@@ -1,29 +1,49 @@
+from django.conf import settings
 from django.urls import path
 
-from . import views
+from . import async_views, views
 
 app_name = 'blog'
 
+feed_views = async_views if settings.BLOG_ASYNC_VIEWS else views
+
 urlpatterns = [
-    path('', views.index, name='index'),
-    path('posts/<int:id>/', views.post_detail, name='post_detail'),
+    path('', feed_views.index, name='index'),
+    path('posts/<int:id>/', feed_views.post_detail, name='post_detail'),
     path(
         'category/<slug:category_slug>/',
-        views.category_posts,
+        feed_views.category_posts,
         name='category_posts'
         ),
     path('posts/create/', views.posts_create, name='create_post'),
-    path('profile/<username>/', views.profile, name='profile'),
+    path('search/', views.search, name='search'),
+    path('feed/', views.my_feed, name='feed'),
+    path('profile/<username>/', feed_views.profile, name='profile'),
     path(
         'profile/<username>/edit/',
         views.edit_profile,
         name='edit_profile'
     ),
+    path(
+        'profile/<username>/follow/',
+        views.follow_author,
+        name='follow'
+    ),
+    path(
+        'profile/<username>/unfollow/',
+        views.unfollow_author,
+        name='unfollow'
+    ),
     path(
         'posts/<int:id>/edit/',
         views.edit_post,
         name='edit_post'
     ),
+    path(
+        'posts/<int:id>/comments/',
+        views.post_comments,
+        name='post_comments'
+    ),
     path(
         'posts/<int:id>/comment/',
         views.add_comment,
@@ -1,46 +1,144 @@
+from functools import partial
+
 from django.shortcuts import redirect, render, get_object_or_404
 from django.contrib.auth.decorators import login_required
+from django.views.decorators.http import etag
 
-from blog.models import Comment
+from blog.models import Comment, Post
 from .forms import PostsForm, EditProfileForm, CommentsForm
 from .redirects import redirect_with_id, redirect_with_username
-from .paginator_for_posts import paginator_for_posts
-from .get_objects import get_user, post_without_filters, post_with_filters, get_list_posts, get_category, get_comment
+from .cache import cache_anonymous_page, posts_count
+from .following import follow, unfollow
+from .conditional import (
+    category_etag,
+    index_etag,
+    post_etag,
+    profile_etag,
+)
+from .paginator_for_posts import (
+    COMMENTS_ORDERING,
+    STREAM_CHUNK_SIZE,
+    comments_page,
+    merged_page,
+    paginator_for_posts,
+    ranked_page,
+)
+from .search import search_posts
+from .uploads import bounded_image_uploads
+from .streaming import (
+    render_feed,
+    stream_all_comments,
+    stream_page_size,
+    stream_render,
+)
+from .get_objects import (
+    category_feed,
+    get_user,
+    is_following,
+    post_without_filters,
+    post_with_filters,
+    post_for_viewer,
+    get_list_comments,
+    get_list_posts,
+    feed_rows,
+    posts_by_ids,
+    get_category,
+    get_comment,
+    subscription_sources,
+)
 
 
+@cache_anonymous_page
+@etag(index_etag)
 def index(request):
     list_posts = post_with_filters()
-    page_obj = paginator_for_posts(list_posts, request.GET.get('page'))
+    page_obj = paginator_for_posts(
+        list_posts,
+        request.GET,
+        count=partial(posts_count, 'index'),
+        per_page=stream_page_size(request)
+    )
     context = {'page_obj': page_obj}
     template = 'blog/index.html'
-    return render(request, template, context)
+    return render_feed(request, template, context)
 
 
+@etag(post_etag)
 def post_detail(request, id):
-    post = post_without_filters(id)
-    if (post.author != request.user):
-        post = post_with_filters(id=id)
-    comments = Comment.objects.select_related(
-        'author'
-    ).filter(
-        post=post,
-    )
+    post = post_for_viewer(id, request.user)
     form = CommentsForm()
-    context = {'post': post, 'form': form, 'comments': comments}
     template = 'blog/detail.html'
+    if stream_all_comments(request):
+        comments = get_list_comments(post).order_by(
+            *COMMENTS_ORDERING
+        ).iterator(chunk_size=STREAM_CHUNK_SIZE)
+        context = {'post': post, 'form': form}
+        return stream_render(
+            request,
+            template,
+            context,
+            comments,
+            'includes/comment.html',
+            'comment'
+        )
+    comments = comments_page(
+        get_list_comments(post),
+        request.GET.get('comments_after')
+    )
+    context = {'post': post, 'form': form, 'comments': comments}
     return render(request, template, context)
 
 
+def post_comments(request, id):
+    post = post_for_viewer(id, request.user)
+    comments = comments_page(
+        get_list_comments(post),
+        request.GET.get('after')
+    )
+    context = {'post': post, 'comments': comments}
+    template = 'includes/comment_list.html'
+    return render(request, template, context)
+
+
+@cache_anonymous_page
+@etag(category_etag)
 def category_posts(request, category_slug):
     template = 'blog/category.html'
     category = get_category(category_slug)
-    post_list = post_with_filters()
-    page_obj = paginator_for_posts(post_list, request.GET.get('page'))
+    page_obj = paginator_for_posts(
+        category_feed(category),
+        request.GET,
+        count=partial(posts_count, 'category', category=category),
+        per_page=stream_page_size(request),
+        fetch=posts_by_ids
+    )
     context = {'category': category, 'page_obj': page_obj}
+    return render_feed(request, template, context)
+
+
+def search(request):
+    query = request.GET.get('q', '').strip()
+    found = search_posts(query) if query else []
+    page_obj = ranked_page(found, feed_rows(Post.objects), request.GET)
+    context = {'query': query, 'page_obj': page_obj}
+    template = 'blog/search.html'
     return render(request, template, context)
 
 
 @login_required
+def my_feed(request):
+    page_obj = merged_page(
+        subscription_sources(request.user),
+        request.GET,
+        fetch=posts_by_ids
+    )
+    context = {'page_obj': page_obj}
+    template = 'blog/feed.html'
+    return render(request, template, context)
+
+
+@login_required
+@bounded_image_uploads
 def posts_create(request):
     form = PostsForm(request.POST or None, files=request.FILES or None)
     context = {'form': form}
@@ -52,13 +150,40 @@ def posts_create(request):
     return render(request, 'blog/create.html', context)
 
 
+@cache_anonymous_page
+@etag(profile_etag)
 def profile(request, username):
     profile = get_user(username)
     post_list = get_list_posts(profile)
-    page_obj = paginator_for_posts(post_list, request.GET.get('page'))
-    context = {'profile': profile, 'page_obj': page_obj}
+    page_obj = paginator_for_posts(
+        post_list,
+        request.GET,
+        count=partial(posts_count, 'profile', author=profile),
+        per_page=stream_page_size(request)
+    )
+    context = {
+        'profile': profile,
+        'page_obj': page_obj,
+        'is_following': is_following(request.user, profile),
+    }
     template_name = 'blog/profile.html'
-    return render(request, template_name, context)
+    return render_feed(request, template_name, context)
+
+
+@login_required
+def follow_author(request, username):
+    author = get_user(username)
+    if request.method == 'POST' and author != request.user:
+        follow(request.user, author)
+    return redirect_with_username(username)
+
+
+@login_required
+def unfollow_author(request, username):
+    author = get_user(username)
+    if request.method == 'POST':
+        unfollow(request.user, author)
+    return redirect_with_username(username)
 
 
 @login_required
@@ -73,6 +198,7 @@ def edit_profile(request, username):
 
 
 @login_required
+@bounded_image_uploads
 def edit_post(request, id):
     instance = post_without_filters(id)
     if (instance.author != request.user):
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -59,6 +60,11 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Публикация отложенных постов читает и пишет только основную базу,
+    # поэтому стоит до маршрутизации чтения на реплики.
+    'blog.publishing.PublishScheduledMiddleware',
+    'blog.routers.ReplicaRoutingMiddleware',
+    'blog.query_budget.QueryBudgetMiddleware',
 ]
 
 ROOT_URLCONF = 'blogicum.urls'
@@ -91,6 +97,45 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 600,
+    }
+}
+
+# PRAGMA для новых SQLite-соединений задаёт blog.sqlite; их можно
+# переопределить словарём SQLITE_PRAGMAS.
+
+# Реплики только для чтения перечисляются через запятую, например
+# BLOGICUM_DB_REPLICAS=db_replica1.sqlite3,db_replica2.sqlite3;
+# локальные файлы заполняет команда sync_replicas.
+DATABASE_REPLICAS = []
+
+for number, name in enumerate(
+    filter(None, os.getenv('BLOGICUM_DB_REPLICAS', '').split(',')), start=1
+):
+    DATABASES[f'replica{number}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / name.strip(),
+        'CONN_MAX_AGE': 600,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{number}')
+
+DATABASE_ROUTERS = ['blog.routers.PrimaryReplicaRouter']
+
+REPLICA_STICKY_SECONDS = 10
+
+# Ленты и страница поста в async-варианте (blog.async_views). Включается
+# в blogicum/asgi.py; под WSGI остаются синхронные представления.
+BLOG_ASYNC_VIEWS = os.getenv('BLOGICUM_ASYNC_VIEWS') == '1'
+
+
+# Кэш лент и фрагментов. Для нескольких процессов без внешних сервисов
+# подойдёт 'django.core.cache.backends.filebased.FileBasedCache'
+# с LOCATION = BASE_DIR / 'cache'.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
 
@@ -136,6 +181,10 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/3.2/howto/static-files/
 
 STATIC_URL = '/static/'
+STATIC_ROOT = BASE_DIR / 'static'
+# collectstatic добавляет к именам хэш и сжимает файлы в .gz и .br;
+# отдаёт их blog.serving, без отдельного веб-сервера.
+STATICFILES_STORAGE = 'blog.storage.CompressedManifestStaticFilesStorage'
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
@@ -149,6 +198,21 @@ EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 CSRF_FAILURE_VIEW = 'pages.views.csrf_failure'
 
 MEDIA_ROOT = BASE_DIR / 'media'
+MEDIA_URL = '/media/'
+
+# Картинки постов пишутся на диск по частям; слишком большие отсекаются
+# по объёму и по заголовку, до декодирования (blog.uploads).
+POST_IMAGE_MAX_BYTES = 10 * 1024 * 1024
+POST_IMAGE_MAX_PIXELS = 40_000_000
+POST_IMAGE_MAX_SIDE = 10_000
+
+# Потоки, в которых blog.thumbnails строит превью загруженных картинок;
+# 0 — строить сразу после коммита, в потоке запроса.
+THUMBNAIL_WORKERS = 2
+
+# Сколько первых подписчиков автора получают его посты во входящие при
+# публикации; для остальных лента выбирает их при чтении.
+FEED_FANOUT_LIMIT = 1000
 
 LOGIN_REDIRECT_URL = 'blog:index'
 
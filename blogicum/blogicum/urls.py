@@ -1,10 +1,10 @@
 from django.contrib import admin
 from django.urls import path, include, reverse_lazy
-from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib.auth.forms import UserCreationForm
 from django.views.generic.edit import CreateView
 
+from blog.serving import file_urlpatterns
+
 handler404 = 'pages.views.page_not_found'
 handler500 = 'pages.views.server_error'
 
@@ -22,4 +22,4 @@ urlpatterns = [
         ),
         name='registration',
     ),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+] + file_urlpatterns()
@@ -41,6 +41,16 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(scope="session", autouse=True)
+def isolated_media(tmp_path_factory):
+    """Загрузки и превью пишутся во временный каталог, превью строятся
+    синхронно, без фоновых потоков."""
+    with override_settings(
+        MEDIA_ROOT=tmp_path_factory.mktemp("media"), THUMBNAIL_WORKERS=0
+    ):
+        yield
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -92,6 +102,7 @@ pytest_plugins = [
     "fixtures.locations",
     "fixtures.categories",
     "fixtures.comments",
+    "fixtures.images",
     "adapters.comment",
 ]
 
@@ -133,6 +144,13 @@ def another_user_client(another_user):
     return client
 
 
+@pytest.fixture
+def staff_client(mixer):
+    client = Client()
+    client.force_login(mixer.blend("auth.User", is_staff=True))
+    return client
+
+
 def get_post_list_context_key(
         user_client, page_url, page_load_err_msg, key_missing_msg
 ):
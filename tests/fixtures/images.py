@@ -0,0 +1,31 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+
+
+def image_upload(size, name="photo.png", color="teal"):
+    buffer = BytesIO()
+    Image.new("RGB", size, color).save(buffer, format="PNG")
+    return SimpleUploadedFile(
+        name, buffer.getvalue(), content_type="image/png"
+    )
+
+
+@pytest.fixture
+def post_with_image(
+    mixer, user, published_category, django_capture_on_commit_callbacks
+):
+    def create(size, color="teal"):
+        with django_capture_on_commit_callbacks(execute=True):
+            post = mixer.blend(
+                "blog.Post",
+                author=user,
+                category=published_category,
+                image=image_upload(size, color=color),
+            )
+        post.refresh_from_db()
+        return post
+
+    return create
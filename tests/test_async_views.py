@@ -0,0 +1,100 @@
+from datetime import timedelta
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.http import Http404
+from django.test import AsyncRequestFactory
+from django.utils import timezone
+
+from blog import async_views
+from blog.get_objects import comments_for_viewer
+
+
+def async_get(view, path, user=None, **kwargs):
+    request = AsyncRequestFactory().get(path, **kwargs)
+    request.user = user or AnonymousUser()
+    return request, async_to_sync(view)
+
+
+@pytest.fixture
+def hidden_post(mixer, user, published_category):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=False, pub_date=timezone.now() - timedelta(days=1),
+    )
+    mixer.blend("blog.Comment", post=post, author=user, text="Секрет")
+    return post
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_post_detail_hides_unpublished(hidden_post, another_user):
+    for viewer in (None, another_user):
+        request, view = async_get(
+            async_views.post_detail, f"/posts/{hidden_post.pk}/", viewer
+        )
+        with pytest.raises(Http404):
+            view(request, id=hidden_post.pk)
+        assert not comments_for_viewer(
+            hidden_post.pk, request.user
+        ).exists(), (
+            "Убедитесь, что комментарии скрытого поста не читаются для "
+            "того, кому не виден сам пост."
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_post_detail_shows_own_hidden_post(hidden_post, user):
+    request, view = async_get(
+        async_views.post_detail, f"/posts/{hidden_post.pk}/", user
+    )
+    response = view(request, id=hidden_post.pk)
+    assert response.status_code == 200
+    assert "Секрет" in response.content.decode()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_index_served_from_page_cache(
+    mixer, user, published_category, monkeypatch
+):
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(days=1),
+    )
+    request, view = async_get(async_views.index, "/")
+    response = view(request)
+    assert response.status_code == 200
+
+    async def fail(*args, **kwargs):
+        raise AssertionError(
+            "Убедитесь, что под ASGI страница для анонимов берётся из кэша."
+        )
+
+    monkeypatch.setattr(async_views, "feed_page", fail)
+    request, view = async_get(async_views.index, "/")
+    assert view(request).content == response.content
+    request, view = async_get(
+        async_views.index, "/", **{"if-none-match": response["ETag"]}
+    )
+    assert view(request).status_code == 304
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_page_number_wins_over_per_page(mixer, user,
+                                              published_category):
+    staff = mixer.blend("auth.User", is_staff=True)
+    posts = mixer.cycle(15).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, title=(f"Пост {number}" for number in range(15)),
+        pub_date=(
+            timezone.now() - timedelta(hours=number) for number in range(15)
+        ),
+    )
+    request, view = async_get(
+        async_views.index, "/?per_page=50&page=2", staff
+    )
+    content = view(request).content.decode()
+    assert posts[10].title in content and posts[0].title not in content, (
+        "Убедитесь, что ?page= вместе с per_page открывает страницу с этим "
+        "номером, а не первую."
+    )
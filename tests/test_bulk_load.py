@@ -0,0 +1,48 @@
+from pathlib import Path
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+from blog.models import Category, CategoryFeedEntry, Location, Post
+from blog.search import search_posts
+
+FIXTURE = Path(__file__).resolve().parent.parent / "db.json"
+MODELS = (get_user_model(), Category, Location, Post)
+
+
+def snapshot():
+    """Содержимое загружаемых таблиц и производных данных."""
+    tables = {
+        model._meta.label: [
+            {
+                name: value for name, value in row.items()
+                # Фикстура его не задаёт: при загрузке ставится текущее время.
+                if name != "updated_at"
+            }
+            for row in model.objects.order_by("pk").values()
+        ]
+        for model in MODELS
+    }
+    tables["feed"] = list(
+        CategoryFeedEntry.objects.order_by("post_id").values_list(
+            "post_id", "category_id", "pub_date", "is_visible"
+        )
+    )
+    tables["search"] = search_posts("обед")
+    return tables
+
+
+@pytest.mark.django_db
+def test_bulk_loaddata_matches_loaddata():
+    call_command("loaddata", FIXTURE, verbosity=0)
+    expected = snapshot()
+    assert expected[Post._meta.label] and expected["search"]
+    for model in reversed(MODELS):
+        model.objects.all().delete()
+
+    call_command("bulk_loaddata", FIXTURE, verbosity=0)
+    assert snapshot() == expected, (
+        "Убедитесь, что bulk_loaddata загружает фикстуру так же, как "
+        "loaddata, вместе с лентами категорий и поисковым индексом."
+    )
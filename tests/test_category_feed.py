@@ -0,0 +1,69 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.category_feed import refresh_post
+from blog.get_objects import category_feed
+from blog.models import CategoryFeedEntry
+from blog.publishing import publish_due_posts
+
+
+@pytest.fixture
+def scheduled_post(mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() + timedelta(hours=1),
+    )
+
+
+def feed_ids(category):
+    return list(category_feed(category).values_list("pk", flat=True))
+
+
+@pytest.mark.django_db
+def test_scheduled_post_shown_after_publishing(scheduled_post,
+                                               published_category):
+    entry = CategoryFeedEntry.objects.get(post=scheduled_post)
+    assert not entry.is_visible
+    assert feed_ids(published_category) == []
+
+    publish_due_posts(timezone.now() + timedelta(hours=2))
+    assert feed_ids(published_category) == [scheduled_post.pk], (
+        "Убедитесь, что publish_due_posts открывает отложенный пост и в "
+        "ленте категории."
+    )
+
+    publish_due_posts()
+    assert feed_ids(published_category) == []
+
+
+@pytest.mark.django_db
+def test_category_toggle_keeps_visibility(scheduled_post, mixer, user,
+                                          published_category):
+    visible = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(days=1),
+    )
+    published_category.is_published = False
+    published_category.save()
+    assert not CategoryFeedEntry.objects.exists()
+
+    published_category.is_published = True
+    published_category.save()
+    assert dict(
+        CategoryFeedEntry.objects.values_list("post_id", "is_visible")
+    ) == {visible.pk: True, scheduled_post.pk: False}
+
+
+@pytest.mark.django_db
+def test_refresh_post_reuses_loaded_category(scheduled_post):
+    scheduled_post.category.title
+    with CaptureQueriesContext(connection) as queries:
+        refresh_post(scheduled_post)
+    assert not any(
+        'FROM "blog_category"' in query["sql"]
+        for query in queries.captured_queries
+    ), "Убедитесь, что refresh_post не запрашивает уже загруженную категорию."
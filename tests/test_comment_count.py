@@ -0,0 +1,56 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.models import Post
+
+
+@pytest.fixture
+def post(mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(days=1),
+    )
+
+
+def stored_count(post):
+    return Post.objects.values_list("comment_count", flat=True).get(
+        pk=post.pk
+    )
+
+
+@pytest.mark.django_db
+def test_comment_count_follows_comments(mixer, post, user):
+    comments = mixer.cycle(3).blend("blog.Comment", post=post, author=user)
+    assert stored_count(post) == 3, (
+        "Убедитесь, что создание комментария увеличивает comment_count."
+    )
+    comments[0].text = "Исправленный текст"
+    comments[0].save()
+    assert stored_count(post) == 3, (
+        "Убедитесь, что редактирование комментария не меняет comment_count."
+    )
+    comments[1].delete()
+    assert stored_count(post) == 2, (
+        "Убедитесь, что удаление комментария уменьшает comment_count."
+    )
+
+
+@pytest.mark.django_db
+def test_comment_count_shown_in_feed(mixer, post, user, user_client):
+    mixer.cycle(2).blend("blog.Comment", post=post, author=user)
+    response = user_client.get("/")
+    assert "Комментарии (2)" in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_recount_comments_fixes_drift(mixer, post, user):
+    other = mixer.blend("blog.Post", author=user)
+    mixer.cycle(2).blend("blog.Comment", post=post, author=user)
+    Post.objects.filter(pk=post.pk).update(comment_count=7)
+    Post.objects.filter(pk=other.pk).update(comment_count=1)
+    call_command("recount_comments", verbosity=0)
+    assert stored_count(post) == 2
+    assert stored_count(other) == 0
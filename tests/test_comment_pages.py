@@ -0,0 +1,111 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from blog.models import Comment
+from blog.paginator_for_posts import COUNT_FOR_COMMENTS
+
+N_COMMENTS = COUNT_FOR_COMMENTS * 2 + 5
+
+
+@pytest.fixture
+def post(mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(days=1),
+    )
+
+
+@pytest.fixture
+def comment_ids(mixer, user, post):
+    comments = mixer.cycle(N_COMMENTS).blend(
+        "blog.Comment", post=post, author=user
+    )
+    # По три комментария с одной датой: курсор различает их по id.
+    start = timezone.now() - timedelta(hours=1)
+    for number, comment in enumerate(comments):
+        Comment.objects.filter(pk=comment.pk).update(
+            created_at=start + timedelta(seconds=number // 3)
+        )
+    return list(
+        Comment.objects.order_by("created_at", "pk").values_list(
+            "pk", flat=True
+        )
+    )
+
+
+def comments_url(post):
+    return f"/posts/{post.pk}/comments/"
+
+
+def page_ids(response):
+    assert response.status_code == 200
+    return [comment.pk for comment in response.context["comments"]]
+
+
+@pytest.mark.django_db
+def test_load_more_walks_all_comments(client, post, comment_ids):
+    response = client.get(comments_url(post))
+    pages = [page_ids(response)]
+    while response.context["comments"].has_next:
+        response = client.get(
+            comments_url(post),
+            {"after": response.context["comments"].next_cursor},
+        )
+        pages.append(page_ids(response))
+    assert [pk for page in pages for pk in page] == comment_ids, (
+        "Убедитесь, что «Показать ещё комментарии» проходит все "
+        "комментарии по порядку, без пропусков и повторов, в том числе "
+        "комментарии с одинаковой датой."
+    )
+    assert [len(page) for page in pages] == [
+        COUNT_FOR_COMMENTS, COUNT_FOR_COMMENTS, 5
+    ]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("after", ["not-a-cursor", "", "%%%"])
+def test_bad_cursor_gives_first_page(client, post, comment_ids, after):
+    assert page_ids(client.get(comments_url(post), {"after": after})) == (
+        comment_ids[:COUNT_FOR_COMMENTS]
+    ), "Убедитесь, что неверный курсор after даёт первую страницу."
+
+
+@pytest.mark.django_db
+def test_detail_page_continues_from_cursor(client, post, comment_ids):
+    first = client.get(comments_url(post)).context["comments"]
+    response = client.get(
+        f"/posts/{post.pk}/", {"comments_after": first.next_cursor}
+    )
+    assert page_ids(response) == comment_ids[
+        COUNT_FOR_COMMENTS:COUNT_FOR_COMMENTS * 2
+    ]
+
+
+def hide(post, how):
+    if how == "category":
+        post.category.is_published = False
+        post.category.save()
+        return
+    if how == "unpublished":
+        post.is_published = False
+    else:
+        post.pub_date = timezone.now() + timedelta(days=1)
+    post.save()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("how", ["unpublished", "scheduled", "category"])
+def test_hidden_post_comments_not_found(
+    client, another_user_client, user_client, post, comment_ids, how,
+):
+    hide(post, how)
+    for viewer in (client, another_user_client):
+        assert viewer.get(comments_url(post)).status_code == 404, (
+            "Убедитесь, что комментарии скрытого поста видны только его "
+            "автору."
+        )
+    assert page_ids(user_client.get(comments_url(post))) == comment_ids[
+        :COUNT_FOR_COMMENTS
+    ]
@@ -0,0 +1,83 @@
+import time
+from datetime import timedelta
+
+import pytest
+from django.conf import settings
+from django.middleware.csrf import _get_new_csrf_token
+from django.utils import timezone
+from django.utils.http import http_date
+
+
+@pytest.fixture
+def post(mixer, user, published_category, published_location):
+    return mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        location=published_location, is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+
+
+@pytest.mark.django_db
+def test_post_detail_not_modified(post, user_client):
+    url = f"/posts/{post.pk}/"
+    # Первый ответ выдаёт CSRF-cookie, ETag учитывает его со второго.
+    user_client.get(url)
+    etag = user_client.get(url)["ETag"]
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304, (
+        "Убедитесь, что при совпадающем If-None-Match страница поста "
+        "отдаётся ответом 304."
+    )
+    post.title = "Новый заголовок"
+    post.save()
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_post_etag_follows_csrf_token(post, user_client):
+    url = f"/posts/{post.pk}/"
+    user_client.cookies[settings.CSRF_COOKIE_NAME] = _get_new_csrf_token()
+    etag = user_client.get(url)["ETag"]
+    user_client.cookies[settings.CSRF_COOKIE_NAME] = _get_new_csrf_token()
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200 and response["ETag"] != etag, (
+        "Убедитесь, что после смены CSRF-токена (например, при новом входе) "
+        "страница с формой комментария не отдаётся из кэша браузера."
+    )
+
+
+@pytest.mark.django_db
+def test_post_detail_checked_by_etag_only(post, client):
+    url = f"/posts/{post.pk}/"
+    response = client.get(url)
+    assert not response.has_header("Last-Modified"), (
+        "Убедитесь, что страница поста не отдаёт Last-Modified: дата "
+        "изменения поста не учитывает правки места, автора и категории."
+    )
+    etag = response["ETag"]
+    post.location.name = "Новое место"
+    post.location.save()
+    response = client.get(
+        url,
+        HTTP_IF_NONE_MATCH=etag,
+        HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60),
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_cached_page_skips_etag_query(
+    post, client, django_assert_num_queries
+):
+    url = "/"
+    etag = client.get(url)["ETag"]
+    with django_assert_num_queries(0):
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304, (
+        "Убедитесь, что страница из кэша для анонимов проверяется по "
+        "сохранённому ETag, без запросов к базе."
+    )
+    with django_assert_num_queries(0):
+        response = client.get(url)
+    assert response.status_code == 200
@@ -0,0 +1,112 @@
+from datetime import timedelta
+
+import pytest
+from bs4 import BeautifulSoup
+from django.utils import timezone
+
+from blog.get_objects import post_with_filters
+from blog.paginator_for_posts import (
+    COUNT_FOR_PAGINATOR,
+    cursor_page,
+    decode_cursor,
+    encode_cursor,
+)
+
+N_POSTS = 25
+
+
+@pytest.fixture
+def feed_posts(mixer, user, published_category):
+    now = timezone.now()
+    # По три поста с одной датой: курсор различает их по id.
+    dates = (now - timedelta(hours=number // 3) for number in range(N_POSTS))
+    posts = mixer.cycle(N_POSTS).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=dates,
+    )
+    return sorted(posts, key=lambda post: (post.pub_date, post.pk),
+                  reverse=True)
+
+
+def page_ids(page):
+    return [post.pk for post in page]
+
+
+@pytest.mark.django_db
+def test_cursor_round_trip(feed_posts):
+    post = feed_posts[0]
+    assert decode_cursor(encode_cursor(post)) == (post.pub_date, post.pk)
+
+
+@pytest.mark.parametrize("token", [None, "", "не-курсор", "bm90LWEtZGF0ZXwx"])
+def test_broken_cursor_is_ignored(token):
+    assert decode_cursor(token) is None, (
+        "Убедитесь, что испорченный курсор не приводит к ошибке, а "
+        "открывает первую страницу ленты."
+    )
+
+
+@pytest.mark.django_db
+def test_walk_forward_and_back(feed_posts):
+    expected = [post.pk for post in feed_posts]
+    pages = [cursor_page(post_with_filters())]
+    while pages[-1].has_next:
+        pages.append(
+            cursor_page(post_with_filters(), after=pages[-1].next_cursor)
+        )
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert sum(map(page_ids, pages), []) == expected, (
+        "Убедитесь, что страницы по курсору after идут подряд, без "
+        "пропусков и повторов, даже у постов с одинаковой датой."
+    )
+    assert not pages[0].has_previous and pages[-1].has_previous
+
+    back = [pages[-1]]
+    while back[-1].has_previous:
+        back.append(
+            cursor_page(post_with_filters(), before=back[-1].previous_cursor)
+        )
+    assert [page_ids(page) for page in back[::-1]] == [
+        page_ids(page) for page in pages
+    ], (
+        "Убедитесь, что курсор before возвращает те же страницы в "
+        "обратном порядке."
+    )
+    assert all(page.has_next for page in back[1:])
+
+
+@pytest.mark.django_db
+def test_last_page_has_no_next(feed_posts):
+    last = feed_posts[COUNT_FOR_PAGINATOR * 2 - 1]
+    page = cursor_page(post_with_filters(), after=encode_cursor(last))
+    assert page_ids(page) == [post.pk for post in feed_posts[20:]]
+    assert not page.has_next and page.next_cursor is None
+
+
+def pager_links(content):
+    soup = BeautifulSoup(content, features="html.parser")
+    return [link["href"] for link in soup.select("a.page-link")]
+
+
+@pytest.mark.django_db
+def test_per_page_kept_in_both_links(feed_posts, staff_client):
+    cursor = encode_cursor(feed_posts[COUNT_FOR_PAGINATOR - 1])
+    response = staff_client.get(f"/?after={cursor}&per_page=11")
+    links = pager_links(b"".join(response.streaming_content))
+    assert all("per_page=11" in link for link in links) and any(
+        link.startswith("?before=") for link in links
+    ), "Убедитесь, что ссылки «назад» и «Первая» сохраняют per_page."
+
+    response = staff_client.get(f"/?before={cursor}&per_page=11")
+    assert len(response.context["page_obj"]) == COUNT_FOR_PAGINATOR - 1
+    links = pager_links(response.content)
+    assert any(
+        link.startswith("?after=") and link.endswith("&per_page=11")
+        for link in links
+    ), (
+        "Убедитесь, что ссылка «вперёд» со страницы «назад» сохраняет "
+        "per_page."
+    )
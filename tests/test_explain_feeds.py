@@ -0,0 +1,28 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+EXPECTED_INDEXES = {
+    "index": "post_visible_partial_idx",
+    "category_posts": "category_feed_visible_idx",
+    "profile": "post_author_feed_idx",
+    "comments": "comment_post_created_idx",
+    "feed_inbox": "inbox_feed_idx",
+}
+
+
+def explain_feeds():
+    out = StringIO()
+    call_command("explain_feeds", verbosity=2, stdout=out, stderr=StringIO())
+    return out.getvalue()
+
+
+@pytest.mark.django_db
+def test_feed_plans_use_indexes():
+    plans = explain_feeds()
+    for feed, index in EXPECTED_INDEXES.items():
+        assert f"{feed}: ok" in plans
+        assert index in plans, (
+            f"Убедитесь, что запрос ленты {feed} использует индекс {index}."
+        )
@@ -0,0 +1,136 @@
+from datetime import timedelta
+
+import pytest
+from django.test import override_settings
+from django.utils import timezone
+
+from blog.following import follow
+from blog.get_objects import posts_by_ids, subscription_sources
+from blog.models import FeedInboxEntry, Follow
+from blog.paginator_for_posts import COUNT_FOR_PAGINATOR, merged_page
+from blog.publishing import publish_due_posts
+
+N_POSTS = 12
+
+
+@pytest.fixture
+def authors(mixer, user):
+    """Автор с раскладкой во входящие user и автор без неё."""
+    fanout_author, popular_author, fan = mixer.cycle(3).blend("auth.User")
+    with override_settings(FEED_FANOUT_LIMIT=1):
+        follow(fan, popular_author)
+        follow(user, popular_author)
+        follow(user, fanout_author)
+    return fanout_author, popular_author
+
+
+@pytest.fixture
+def feed_posts(mixer, authors, published_category):
+    now = timezone.now()
+    # Посты двух авторов вперемешку, по два с одной датой.
+    return mixer.cycle(N_POSTS * 2).blend(
+        "blog.Post",
+        author=(authors[number % 2] for number in range(N_POSTS * 2)),
+        category=published_category,
+        is_published=True,
+        pub_date=(
+            now - timedelta(hours=number // 2)
+            for number in range(N_POSTS * 2)
+        ),
+    )
+
+
+def inbox_ids(user):
+    return set(
+        FeedInboxEntry.objects.filter(user=user).values_list(
+            "post_id", flat=True
+        )
+    )
+
+
+@pytest.mark.django_db
+def test_fanout_flag_follows_limit(user, authors):
+    fanout_author, popular_author = authors
+    assert dict(
+        Follow.objects.filter(user=user).values_list("author", "fanout")
+    ) == {fanout_author.pk: True, popular_author.pk: False}
+    assert not follow(user, fanout_author), (
+        "Убедитесь, что повторная подписка не создаёт новую."
+    )
+
+
+@pytest.mark.django_db
+def test_merged_page_walks_both_sources(user, authors, feed_posts):
+    expected = [
+        post.pk for post in sorted(
+            feed_posts, key=lambda post: (post.pub_date, post.pk),
+            reverse=True,
+        )
+    ]
+    sources = subscription_sources(user)
+    pages = [merged_page(sources, {}, posts_by_ids)]
+    while pages[-1].has_next:
+        pages.append(merged_page(
+            sources, {"after": pages[-1].next_cursor}, posts_by_ids
+        ))
+    assert [post.pk for page in pages for post in page] == expected, (
+        "Убедитесь, что лента подписок сливает входящие и посты авторов "
+        "без раскладки по (дата, id), без пропусков и повторов."
+    )
+    assert [len(page) for page in pages] == [
+        COUNT_FOR_PAGINATOR, COUNT_FOR_PAGINATOR, 4
+    ]
+
+    back = [pages[-1]]
+    while back[-1].has_previous:
+        back.append(merged_page(
+            sources, {"before": back[-1].previous_cursor}, posts_by_ids
+        ))
+    assert [[post.pk for post in page] for page in back[::-1]] == [
+        [post.pk for post in page] for page in pages
+    ], "Убедитесь, что курсор before возвращает те же страницы."
+
+
+@pytest.mark.django_db
+def test_inbox_holds_only_visible_posts(mixer, user, authors,
+                                        published_category):
+    fanout_author = authors[0]
+    post = mixer.blend(
+        "blog.Post", author=fanout_author, category=published_category,
+        is_published=True, pub_date=timezone.now() + timedelta(hours=1),
+    )
+    assert post.pk not in inbox_ids(user), (
+        "Убедитесь, что отложенный пост не попадает во входящие до "
+        "публикации."
+    )
+    publish_due_posts(timezone.now() + timedelta(hours=2))
+    assert post.pk in inbox_ids(user)
+    publish_due_posts()
+    assert post.pk not in inbox_ids(user)
+
+
+@pytest.mark.django_db
+def test_category_toggle_updates_inbox(user, authors, feed_posts,
+                                       published_category):
+    fanned_out = {
+        post.pk for post in feed_posts if post.author_id == authors[0].pk
+    }
+    assert inbox_ids(user) == fanned_out
+    published_category.is_published = False
+    published_category.save()
+    assert inbox_ids(user) == set()
+    published_category.is_published = True
+    published_category.save()
+    assert inbox_ids(user) == fanned_out
+
+
+@pytest.mark.django_db
+def test_backfill_skips_hidden_posts(mixer, user, another_user,
+                                     published_category):
+    visible, hidden = mixer.cycle(2).blend(
+        "blog.Post", author=another_user, category=published_category,
+        is_published=(flag for flag in (True, False)),
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    follow(user, another_user)
+    assert inbox_ids(user) == {visible.pk}
@@ -0,0 +1,106 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.following import follow
+
+
+@pytest.fixture
+def post(mixer, user, published_category, published_location):
+    return mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        location=published_location, is_published=True,
+        title="Заметка на полях", pub_date=timezone.now() - timedelta(days=1),
+    )
+
+
+def get(client, url):
+    """Страница и число SQL-запросов, которые ушли на ответ."""
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    return response, len(queries)
+
+
+def warm(client, *urls):
+    """Кладёт страницы в кэш и проверяет, что они берутся оттуда."""
+    for url in urls:
+        client.get(url)
+        response, queries = get(client, url)
+        assert response.status_code == 200 and queries == 0
+
+
+def content(client, url):
+    return client.get(url).content.decode()
+
+
+@pytest.mark.django_db
+def test_new_and_edited_post_shown(mixer, client, user, post,
+                                   published_category):
+    warm(client, "/", f"/category/{published_category.slug}/")
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, title="Свежая заметка",
+        pub_date=timezone.now() - timedelta(hours=1),
+    )
+    post.title = "Исправленная заметка"
+    post.save()
+    for url in ("/", f"/category/{published_category.slug}/"):
+        page = content(client, url)
+        assert "Свежая заметка" in page and "Исправленная заметка" in page, (
+            "Убедитесь, что после создания и правки поста кэш страниц "
+            "для анонимов сбрасывается."
+        )
+
+
+@pytest.mark.django_db
+def test_comment_count_follows_new_and_deleted_comments(mixer, client,
+                                                        user, post):
+    warm(client, "/")
+    comment = mixer.blend("blog.Comment", post=post, author=user)
+    assert "Комментарии (1)" in content(client, "/")
+    comment.delete()
+    assert "Комментарии (0)" in content(client, "/"), (
+        "Убедитесь, что после удаления комментария анониму не отдаётся "
+        "страница из кэша со старым числом комментариев."
+    )
+
+
+@pytest.mark.django_db
+def test_category_toggle_updates_cached_pages(client, post,
+                                              published_category):
+    category_url = f"/category/{published_category.slug}/"
+    warm(client, "/", category_url)
+    published_category.is_published = False
+    published_category.save()
+    assert post.title not in content(client, "/"), (
+        "Убедитесь, что пост из снятой с публикации категории пропадает "
+        "с закэшированной главной."
+    )
+    assert client.get(category_url).status_code == 404
+
+    published_category.is_published = True
+    published_category.save()
+    assert post.title in content(client, "/")
+    assert post.title in content(client, category_url)
+
+
+@pytest.mark.django_db
+def test_location_rename_shown(client, post, published_location):
+    warm(client, "/")
+    published_location.name = "Гостиный двор"
+    published_location.save()
+    assert "Гостиный двор" in content(client, "/")
+
+
+@pytest.mark.django_db
+def test_follow_renders_profile_again(client, user, another_user, post):
+    url = f"/profile/{user.username}/"
+    warm(client, url)
+    follow(another_user, user)
+    response, queries = get(client, url)
+    assert response.status_code == 200 and queries, (
+        "Убедитесь, что подписка сбрасывает кэш страниц."
+    )
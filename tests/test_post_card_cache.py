@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+
+@pytest.mark.django_db
+def test_card_shows_renamed_author(mixer, user, published_category,
+                                   user_client):
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(days=1),
+    )
+    assert f"@{user.username}" in user_client.get("/").content.decode()
+    user.username = "renamed_author"
+    user.save()
+    content = user_client.get("/").content.decode()
+    assert "@renamed_author" in content and "/profile/renamed_author/" in (
+        content
+    ), (
+        "Убедитесь, что после смены имени пользователя карточки его постов "
+        "показывают новое имя и ссылку на профиль."
+    )
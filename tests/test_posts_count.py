@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from blog.cache import posts_count
+from blog.publishing import publish_due_posts
+
+
+@pytest.fixture
+def posts(mixer, user, published_category):
+    return mixer.cycle(3).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(days=1),
+    )
+
+
+def counts(category, author):
+    return (
+        posts_count("index"),
+        posts_count("category", category=category),
+        posts_count("profile", author=author),
+    )
+
+
+@pytest.mark.django_db
+def test_count_follows_added_hidden_and_deleted_posts(
+    mixer, user, posts, published_category
+):
+    assert counts(published_category, user) == (3, 3, 3)
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(hours=1),
+    )
+    assert counts(published_category, user) == (4, 4, 4), (
+        "Убедитесь, что кэш числа постов сбрасывается при новом посте."
+    )
+    posts[0].is_published = False
+    posts[0].save()
+    assert counts(published_category, user) == (3, 3, 4), (
+        "Убедитесь, что кэш числа постов сбрасывается, когда пост скрыт."
+    )
+    posts[1].delete()
+    assert counts(published_category, user) == (2, 2, 3)
+
+
+@pytest.mark.django_db
+def test_count_follows_scheduled_posts(mixer, user, posts,
+                                       published_category):
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() + timedelta(hours=1),
+    )
+    assert counts(published_category, user) == (3, 3, 4)
+    publish_due_posts(timezone.now() + timedelta(hours=2))
+    assert counts(published_category, user) == (4, 4, 4)
+
+
+@pytest.mark.django_db
+def test_count_follows_category_publishing(user, posts, published_category):
+    assert counts(published_category, user) == (3, 3, 3)
+    published_category.is_published = False
+    published_category.save()
+    assert posts_count("index") == 0, (
+        "Убедитесь, что кэш числа постов сбрасывается, когда категория "
+        "снята с публикации."
+    )
+    published_category.is_published = True
+    published_category.save()
+    assert counts(published_category, user) == (3, 3, 3)
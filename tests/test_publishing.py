@@ -0,0 +1,140 @@
+from datetime import timedelta
+
+import pytest
+from django.conf import settings
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from blog.cache import PAGES_VERSION_KEY, POSTS_VERSION_KEY, get_version
+from blog.models import Post
+from blog.publishing import (
+    publish_due_posts,
+    publish_if_due,
+    visibility_changed,
+)
+from blog.routers import replica_allowed
+
+# Такой базы нет: любое чтение с «реплики» упадёт с ConnectionDoesNotExist.
+LAGGING_REPLICAS = ["lagging_replica"]
+ROUTED_MIDDLEWARE = (
+    "blog.publishing.PublishScheduledMiddleware",
+    "blog.routers.ReplicaRoutingMiddleware",
+)
+
+
+@pytest.fixture
+def scheduled_post(mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() + timedelta(hours=1),
+    )
+
+
+@pytest.fixture
+def sent_changes():
+    changes = []
+
+    def record(sender, published, withdrawn, **kwargs):
+        changes.append((published, withdrawn))
+
+    visibility_changed.connect(record)
+    yield changes
+    visibility_changed.disconnect(record)
+
+
+def is_visible(post):
+    return Post.objects.values_list("is_visible", flat=True).get(pk=post.pk)
+
+
+@pytest.mark.django_db
+def test_due_post_becomes_visible(scheduled_post, sent_changes, client):
+    assert not is_visible(scheduled_post)
+    assert publish_due_posts() == (0, 0) and sent_changes == []
+
+    assert publish_due_posts(
+        timezone.now() + timedelta(hours=2)
+    ) == (1, 0)
+    assert is_visible(scheduled_post), (
+        "Убедитесь, что publish_due_posts делает видимым пост, дата "
+        "публикации которого наступила."
+    )
+    assert sent_changes == [([scheduled_post.pk], [])], (
+        "Убедитесь, что publish_due_posts сообщает об опубликованных "
+        "постах сигналом visibility_changed."
+    )
+
+
+@pytest.mark.django_db
+def test_post_moved_to_future_is_withdrawn(scheduled_post, sent_changes):
+    publish_due_posts(timezone.now() + timedelta(hours=2))
+    assert publish_due_posts() == (0, 1)
+    assert not is_visible(scheduled_post)
+    assert sent_changes[-1] == ([], [scheduled_post.pk])
+
+
+@pytest.mark.django_db
+def test_scheduled_post_appears_on_index(scheduled_post, user_client):
+    # Время публикации наступило, а is_visible ещё не пересчитан.
+    Post.objects.filter(pk=scheduled_post.pk).update(
+        pub_date=timezone.now() - timedelta(minutes=1)
+    )
+    content = user_client.get("/").getvalue().decode()
+    assert scheduled_post.title in content, (
+        "Убедитесь, что отложенный пост появляется на главной, как только "
+        "наступила дата публикации."
+    )
+
+
+def versions():
+    return get_version(POSTS_VERSION_KEY), get_version(PAGES_VERSION_KEY)
+
+
+@pytest.mark.django_db
+def test_nothing_due_keeps_versions(scheduled_post, sent_changes):
+    before = versions()
+    assert publish_due_posts() == (0, 0)
+    publish_due_posts(timezone.now() + timedelta(hours=2))
+    assert publish_due_posts(timezone.now() + timedelta(hours=2)) == (0, 0)
+    assert len(sent_changes) == 1
+    assert versions() == (before[0] + 1, before[1] + 1), (
+        "Убедитесь, что кэш сбрасывается, только если видимость постов "
+        "действительно изменилась."
+    )
+
+
+@pytest.mark.django_db
+@override_settings(DATABASE_REPLICAS=LAGGING_REPLICAS)
+def test_schedule_is_read_from_primary(scheduled_post):
+    token = replica_allowed.set(True)
+    try:
+        before = versions()
+        publish_if_due()
+        assert versions() == before
+    finally:
+        replica_allowed.reset(token)
+
+
+@pytest.mark.django_db
+@override_settings(DATABASE_REPLICAS=LAGGING_REPLICAS)
+def test_middleware_publishes_before_replica_routing(scheduled_post):
+    Post.objects.filter(pk=scheduled_post.pk).update(
+        pub_date=timezone.now() - timedelta(minutes=1)
+    )
+    seen = []
+
+    def view(request):
+        seen.append(replica_allowed.get())
+        return HttpResponse()
+
+    handler = view
+    for path in reversed(settings.MIDDLEWARE):
+        if path in ROUTED_MIDDLEWARE:
+            handler = import_string(path)(handler)
+    handler(RequestFactory().get("/"))
+    assert seen == [True]
+    assert is_visible(scheduled_post), (
+        "Убедитесь, что PublishScheduledMiddleware стоит до "
+        "ReplicaRoutingMiddleware и публикует посты по основной базе."
+    )
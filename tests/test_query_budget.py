@@ -0,0 +1,90 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.test import Client, override_settings
+from django.utils import timezone
+
+from blog.paginator_for_posts import COUNT_FOR_PAGINATOR
+from blog.publishing import publish_if_due
+from blog.query_budget import FEED_QUERY_BUDGETS, query_budget
+
+N_POSTS = COUNT_FOR_PAGINATOR * 2 + 3
+
+
+@pytest.fixture
+def feed_urls(mixer, another_user, published_category, published_location):
+    mixer.cycle(N_POSTS).blend(
+        "blog.Post", author=another_user, category=published_category,
+        location=published_location, is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    return [
+        "/",
+        f"/category/{published_category.slug}/",
+        f"/profile/{another_user.username}/",
+    ]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("page", ["", "?page=2", "?page=3"])
+def test_feeds_fit_query_budget_when_logged_in(user, feed_urls, page):
+    # QueryBudgetMiddleware работает только в режиме DEBUG.
+    with override_settings(DEBUG=True):
+        client = Client()
+        client.force_login(user)
+        for url in feed_urls:
+            cache.clear()
+            response = client.get(url + page)
+            assert response.status_code == 200, (
+                f"Убедитесь, что страница {url + page} укладывается в "
+                "бюджет SQL-запросов и при пустом кэше."
+            )
+
+
+def blend_posts(mixer, number, author, category):
+    """Посты с разными авторами и местами, у каждого есть комментарий."""
+    posts = mixer.cycle(number).blend(
+        "blog.Post", category=category, is_published=True,
+        author=(
+            author if index % 2 else mixer.blend("auth.User")
+            for index in range(number)
+        ),
+        location=(mixer.blend("blog.Location") for _ in range(number)),
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    for post in posts:
+        mixer.blend("blog.Comment", post=post, author=post.author)
+    return posts
+
+
+def feed_queries(client, view, url):
+    # Пустой кэш числа постов, но расписание публикаций уже проверено.
+    cache.clear()
+    publish_if_due()
+    with query_budget(FEED_QUERY_BUDGETS[view], view) as counter:
+        assert client.get(url).status_code == 200
+    return len(counter)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "view, url",
+    [
+        ("blog:index", "/"),
+        ("blog:category_posts", "/category/{category.slug}/"),
+        ("blog:profile", "/profile/{author.username}/"),
+    ],
+)
+def test_feed_queries_do_not_grow_with_posts(
+    mixer, user_client, another_user, published_category, view, url,
+):
+    url = url.format(category=published_category, author=another_user)
+    blend_posts(mixer, 2, another_user, published_category)
+    few = feed_queries(user_client, view, url)
+    blend_posts(mixer, COUNT_FOR_PAGINATOR * 2, another_user,
+                published_category)
+    assert feed_queries(user_client, view, url) == few, (
+        "Убедитесь, что число SQL-запросов ленты не зависит от числа "
+        "постов на странице, их авторов, мест и комментариев."
+    )
@@ -0,0 +1,78 @@
+import pytest
+from django.contrib.sessions.models import Session
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+from blog.models import Post
+from blog.routers import (
+    STICKY_COOKIE,
+    PrimaryReplicaRouter,
+    ReplicaRoutingMiddleware,
+    replica_allowed,
+)
+
+REPLICAS = ["replica1"]
+
+
+@pytest.fixture
+def allow_replica():
+    token = replica_allowed.set(True)
+    yield
+    replica_allowed.reset(token)
+
+
+@override_settings(DATABASE_REPLICAS=REPLICAS)
+def test_router_reads_from_replica_when_allowed(allow_replica):
+    router = PrimaryReplicaRouter()
+    assert router.db_for_read(Post) == "replica1"
+    assert router.db_for_read(Session) == "default", (
+        "Убедитесь, что сессии всегда читаются с основной базы."
+    )
+    assert router.db_for_write(Post) == "default"
+    assert not router.allow_migrate("replica1", "blog")
+
+
+@override_settings(DATABASE_REPLICAS=REPLICAS)
+def test_router_reads_from_primary_by_default():
+    assert PrimaryReplicaRouter().db_for_read(Post) == "default"
+
+
+@override_settings(DATABASE_REPLICAS=REPLICAS)
+@pytest.mark.parametrize(
+    "method, path, cookies, expected",
+    [
+        ("get", "/", {}, True),
+        ("get", "/posts/1/", {}, True),
+        ("get", "/", {STICKY_COOKIE: "1"}, False),
+        ("post", "/", {}, False),
+        ("get", "/posts/create/", {}, False),
+        ("get", "/no-such-page/", {}, False),
+    ],
+)
+def test_can_use_replica(method, path, cookies, expected):
+    request = getattr(RequestFactory(), method)(path)
+    request.COOKIES.update(cookies)
+    middleware = ReplicaRoutingMiddleware(lambda request: HttpResponse())
+    assert middleware.can_use_replica(request) is expected
+
+
+@override_settings(DATABASE_REPLICAS=REPLICAS)
+def test_middleware_routes_view_and_sets_sticky_cookie():
+    seen = []
+
+    def view(request):
+        seen.append(replica_allowed.get())
+        return HttpResponse()
+
+    middleware = ReplicaRoutingMiddleware(view)
+    response = middleware(RequestFactory().get("/"))
+    assert seen == [True] and STICKY_COOKIE not in response.cookies
+    assert replica_allowed.get() is False
+
+    response = middleware(RequestFactory().post("/posts/create/"))
+    assert seen[-1] is False
+    assert STICKY_COOKIE in response.cookies, (
+        "Убедитесь, что после записи клиент получает куку, которая "
+        "отправляет его чтение на основную базу."
+    )
+    assert response.cookies[STICKY_COOKIE]["max-age"] == 10
@@ -0,0 +1,63 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.utils import timezone
+
+from blog import search
+
+
+@pytest.fixture(params=["fts5", "memory"])
+def backend(request, monkeypatch):
+    if request.param == "memory":
+        monkeypatch.setattr(search, "has_search_table", lambda conn: False)
+    else:
+        assert search.has_search_table(connection), (
+            "Убедитесь, что миграции создают таблицу FTS5 blog_post_search."
+        )
+    return request.param
+
+
+@pytest.fixture
+def found_posts(backend, mixer, user, published_category):
+    def blend(title, text, is_published=True):
+        return mixer.blend(
+            "blog.Post", author=user, category=published_category,
+            title=title, text=text, is_published=is_published,
+            pub_date=timezone.now() - timedelta(days=1),
+        )
+
+    posts = {
+        "in_text": blend("Заметка", "Во дворе спит рыжая кошка."),
+        "in_title": blend("Кошка на крыше", "Во дворе тихо."),
+        "hidden": blend("Кошка, кошка, кошка", "Кошки!", is_published=False),
+    }
+    search.rebuild_index()
+    return posts
+
+
+@pytest.mark.django_db
+def test_title_match_ranks_higher(found_posts):
+    assert search.search_posts("кошки") == [
+        found_posts["in_title"].pk, found_posts["in_text"].pk
+    ], (
+        "Убедитесь, что поиск находит слово в другой форме, а совпадение в "
+        "заголовке ставит выше совпадения в тексте."
+    )
+
+
+@pytest.mark.django_db
+def test_hidden_posts_do_not_take_limit(found_posts):
+    assert search.search_posts("кошка", limit=1) == [
+        found_posts["in_title"].pk
+    ], (
+        "Убедитесь, что скрытые посты отсекаются до ограничения числа "
+        "результатов, а не после."
+    )
+
+
+@pytest.mark.django_db
+def test_search_page(found_posts, user_client):
+    content = user_client.get("/search/", {"q": "кошка"}).content.decode()
+    assert found_posts["in_title"].title in content
+    assert found_posts["hidden"].title not in content
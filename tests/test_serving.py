@@ -0,0 +1,135 @@
+import gzip
+
+import pytest
+from django.test import RequestFactory, override_settings
+
+from blog.serving import parse_range, serve_media, serve_static
+from blog.storage import IMMUTABLE_CACHE_CONTROL
+
+CONTENT = b"0123456789" * 10
+DIGEST = "ab" * 32
+# response.close() шлёт request_finished, а он закрывает соединения с базой.
+pytestmark = pytest.mark.django_db
+
+
+def body(response):
+    content = b"".join(response.streaming_content)
+    response.close()
+    return content
+
+
+@pytest.fixture
+def media_root(tmp_path):
+    (tmp_path / "notes.txt").write_bytes(CONTENT)
+    (tmp_path / "posts_images" / "ab").mkdir(parents=True)
+    (tmp_path / "posts_images" / "ab" / f"{DIGEST}.png").write_bytes(CONTENT)
+    with override_settings(MEDIA_ROOT=tmp_path):
+        yield tmp_path
+
+
+@pytest.fixture
+def static_root(tmp_path):
+    (tmp_path / "site.css").write_bytes(CONTENT)
+    (tmp_path / "site.css.gz").write_bytes(gzip.compress(CONTENT))
+    with override_settings(STATIC_ROOT=tmp_path):
+        yield tmp_path
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("bytes=0-9", (0, 9)),
+        ("bytes=90-", (90, 99)),
+        ("bytes=-5", (95, 99)),
+        ("bytes=95-200", (95, 99)),
+        ("bytes=5-2", None),
+        ("bytes=0-1,5-6", None),
+        ("items=0-1", None),
+    ],
+)
+def test_parse_range(header, expected):
+    assert parse_range(header, len(CONTENT)) == expected
+
+
+def test_media_range_request(media_root):
+    response = serve_media(
+        RequestFactory().get("/media/notes.txt", HTTP_RANGE="bytes=10-19"),
+        "notes.txt",
+    )
+    assert response.status_code == 206
+    assert response["Content-Range"] == "bytes 10-19/100"
+    assert body(response) == CONTENT[10:20], (
+        "Убедитесь, что на запрос Range отдаются только запрошенные байты."
+    )
+
+
+def test_media_range_outside_file(media_root):
+    response = serve_media(
+        RequestFactory().get("/media/notes.txt", HTTP_RANGE="bytes=100-"),
+        "notes.txt",
+    )
+    assert response.status_code == 416
+    assert response["Content-Range"] == "bytes */100"
+
+
+def test_media_stale_if_range_gets_whole_file(media_root):
+    response = serve_media(
+        RequestFactory().get(
+            "/media/notes.txt", HTTP_RANGE="bytes=10-19",
+            HTTP_IF_RANGE='"stale"',
+        ),
+        "notes.txt",
+    )
+    assert response.status_code == 200 and body(response) == CONTENT
+
+
+def test_media_cache_headers(media_root):
+    name = f"posts_images/ab/{DIGEST}.png"
+    response = serve_media(RequestFactory().get(f"/media/{name}"), name)
+    body(response)
+    assert response["Cache-Control"] == IMMUTABLE_CACHE_CONTROL, (
+        "Убедитесь, что файлы с хэшем содержимого в имени кэшируются "
+        "навсегда."
+    )
+    assert response["Content-Type"] == "image/png"
+
+    response = serve_media(RequestFactory().get("/media/notes.txt"),
+                           "notes.txt")
+    body(response)
+    assert response["Cache-Control"] == "no-cache"
+    response = serve_media(
+        RequestFactory().get(
+            "/media/notes.txt", HTTP_IF_NONE_MATCH=response["ETag"]
+        ),
+        "notes.txt",
+    )
+    assert response.status_code == 304
+
+
+def test_static_precompressed_variant(static_root):
+    response = serve_static(
+        RequestFactory().get(
+            "/static/site.css", HTTP_ACCEPT_ENCODING="br;q=0, gzip"
+        ),
+        "site.css",
+    )
+    assert response["Content-Encoding"] == "gzip"
+    assert gzip.decompress(body(response)) == CONTENT, (
+        "Убедитесь, что клиенту, принимающему gzip, отдаётся сжатая "
+        "заранее копия файла."
+    )
+    assert response["Content-Type"].startswith("text/css")
+    assert "Accept-Encoding" in response["Vary"]
+
+
+def test_static_without_accepted_encoding(static_root):
+    response = serve_static(
+        RequestFactory().get("/static/site.css", HTTP_ACCEPT_ENCODING="br"),
+        "site.css",
+    )
+    assert not response.has_header("Content-Encoding")
+    assert body(response) == CONTENT
+    assert "Accept-Encoding" in response["Vary"], (
+        "Убедитесь, что у файла со сжатыми копиями ответ зависит от "
+        "Accept-Encoding."
+    )
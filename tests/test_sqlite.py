@@ -0,0 +1,48 @@
+import pytest
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import override_settings
+
+EXPECTED_PRAGMAS = {
+    "journal_mode": "wal",
+    "synchronous": 1,
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -20000,
+    "busy_timeout": 5000,
+    "temp_store": 2,
+}
+
+
+@pytest.fixture
+def new_connection(tmp_path):
+    """Новое соединение с файловой базой: у тестовой базы в памяти
+    не бывает журнала WAL."""
+    wrapper = DatabaseWrapper(
+        {**connection.settings_dict, "NAME": str(tmp_path / "db.sqlite3")},
+        alias="pragma_check",
+    )
+    yield wrapper
+    wrapper.close()
+
+
+def read_pragmas(wrapper, names):
+    with wrapper.cursor() as cursor:
+        return {
+            name: cursor.execute(f"PRAGMA {name}").fetchone()[0]
+            for name in names
+        }
+
+
+@pytest.mark.django_db
+def test_new_connection_gets_pragmas(new_connection):
+    assert read_pragmas(new_connection, EXPECTED_PRAGMAS) == (
+        EXPECTED_PRAGMAS
+    ), "Убедитесь, что новое соединение с SQLite получает PRAGMA из настроек."
+
+
+@pytest.mark.django_db
+@override_settings(SQLITE_PRAGMAS={"busy_timeout": 1234})
+def test_pragmas_overridden_by_settings(new_connection):
+    assert read_pragmas(new_connection, ["busy_timeout", "journal_mode"]) == {
+        "busy_timeout": 1234, "journal_mode": "delete"
+    }
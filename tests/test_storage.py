@@ -0,0 +1,50 @@
+import pytest
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+
+from blog.storage import is_content_addressed
+from blog.thumbnails import rendition_name
+
+
+def stored(post):
+    return post.image.storage.exists(post.image.name)
+
+
+@pytest.mark.django_db
+def test_identical_uploads_share_file(post_with_image):
+    first = post_with_image((300, 200), color="olive")
+    second = post_with_image((300, 200), color="olive")
+    other = post_with_image((300, 200), color="navy")
+    assert first.image.name == second.image.name, (
+        "Убедитесь, что одинаковые картинки хранятся в одном файле."
+    )
+    assert other.image.name != first.image.name
+    assert is_content_addressed(first.image.name)
+    assert first.image.name.startswith("posts_images/")
+
+
+@pytest.mark.django_db
+def test_collect_media_removes_only_orphans(post_with_image):
+    kept = post_with_image((320, 200), color="maroon")
+    orphan = post_with_image((320, 200), color="purple")
+    orphan_name = orphan.image.name
+    orphan.delete()
+    assert orphan.image.storage.exists(orphan_name)
+
+    call_command("collect_media", verbosity=0)
+    assert orphan.image.storage.exists(orphan_name), (
+        "Убедитесь, что collect_media не трогает файлы моложе --min-age."
+    )
+
+    call_command("collect_media", "--min-age=0", "--dry-run", verbosity=0)
+    assert orphan.image.storage.exists(orphan_name)
+
+    call_command("collect_media", "--min-age=0", verbosity=0)
+    assert not orphan.image.storage.exists(orphan_name), (
+        "Убедитесь, что collect_media удаляет картинки, на которые не "
+        "ссылается ни один пост."
+    )
+    assert not default_storage.exists(rendition_name(orphan_name, "thumb"))
+    assert stored(kept) and default_storage.exists(
+        rendition_name(kept.image.name, "thumb")
+    ), "Убедитесь, что collect_media не удаляет картинки постов и их превью."
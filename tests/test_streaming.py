@@ -0,0 +1,74 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from blog.paginator_for_posts import COUNT_FOR_COMMENTS, COUNT_FOR_PAGINATOR
+from blog.streaming import PAGINATOR_MARKER, STREAM_MARKER
+
+N_COMMENTS = COUNT_FOR_COMMENTS + 5
+
+
+@pytest.fixture
+def commented_post(mixer, user, published_category):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(days=1),
+    )
+    mixer.cycle(N_COMMENTS).blend("blog.Comment", post=post, author=user)
+    return post
+
+
+@pytest.mark.django_db
+def test_all_comments_streamed_for_staff(commented_post, staff_client):
+    response = staff_client.get(f"/posts/{commented_post.pk}/?comments=all")
+    assert response.streaming
+    content = response.getvalue().decode()
+    assert content.count('name="comment_') == N_COMMENTS
+    assert STREAM_MARKER not in content and PAGINATOR_MARKER not in content
+
+
+@pytest.mark.django_db
+def test_all_comments_not_for_regular_users(commented_post, user_client):
+    response = user_client.get(f"/posts/{commented_post.pk}/?comments=all")
+    content = response.getvalue().decode()
+    assert not response.streaming and "?comments=all" not in content, (
+        "Убедитесь, что все комментарии одной страницей может открыть "
+        "только персонал, как и per_page."
+    )
+    assert content.count('name="comment_') == COUNT_FOR_COMMENTS
+
+
+@pytest.mark.django_db
+def test_streamed_feed_has_one_paginator(mixer, user, published_category,
+                                         staff_client):
+    mixer.cycle(15).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(days=1),
+    )
+    response = staff_client.get("/?per_page=11")
+    content = response.getvalue().decode()
+    assert response.streaming and content.count("pagination") == 1
+    assert "?after=" in content and PAGINATOR_MARKER not in content
+
+
+@pytest.mark.django_db
+def test_page_number_wins_over_per_page(mixer, user, published_category,
+                                        staff_client):
+    posts = mixer.cycle(COUNT_FOR_PAGINATOR * 2 + 5).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True,
+        pub_date=(
+            timezone.now() - timedelta(hours=number)
+            for number in range(COUNT_FOR_PAGINATOR * 2 + 5)
+        ),
+    )
+    response = staff_client.get("/?per_page=50&page=2")
+    assert not response.streaming
+    page = response.context["page_obj"]
+    assert page.number == 2 and [post.pk for post in page] == [
+        post.pk for post in posts[COUNT_FOR_PAGINATOR:COUNT_FOR_PAGINATOR * 2]
+    ], (
+        "Убедитесь, что ?page= вместе с per_page открывает страницу с этим "
+        "номером, а не первую."
+    )
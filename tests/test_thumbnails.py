@@ -0,0 +1,43 @@
+import pytest
+from django.core.files.storage import default_storage
+
+from blog.thumbnails import RENDITIONS, picture, rendition_name
+
+
+@pytest.mark.django_db
+def test_saved_post_gets_renditions(post_with_image):
+    post = post_with_image((1600, 900))
+    assert post.renditions_for == post.image.name, (
+        "Убедитесь, что после сохранения поста с картинкой для неё "
+        "строятся превью."
+    )
+    for rendition in RENDITIONS:
+        assert default_storage.exists(
+            rendition_name(post.image.name, rendition)
+        )
+        for extension in post.renditions["formats"]:
+            assert default_storage.exists(
+                rendition_name(post.image.name, rendition, extension)
+            )
+
+
+@pytest.mark.django_db
+def test_small_image_lists_only_built_widths(post_with_image):
+    post = post_with_image((800, 600))
+    assert post.renditions["widths"] == {"thumb": 640, "medium": 800}
+    srcset = picture(post, "medium")["srcset"]
+    assert "640w" in srcset and "800w" in srcset and "1280w" not in srcset, (
+        "Убедитесь, что srcset перечисляет настоящую ширину построенных "
+        "превью, а не размеры из RENDITIONS."
+    )
+
+    post = post_with_image((500, 300))
+    assert post.renditions["widths"] == {"thumb": 500}, (
+        "Убедитесь, что превью не шире оригинала не строятся."
+    )
+    assert not default_storage.exists(
+        rendition_name(post.image.name, "medium")
+    )
+    data = picture(post, "medium")
+    assert data["src"].endswith(rendition_name(post.image.name, "thumb"))
+    assert data["srcset"].endswith(" 500w")
@@ -0,0 +1,63 @@
+from datetime import timedelta
+
+import pytest
+from django import forms
+from django.test import Client, override_settings
+from django.utils import timezone
+
+from blog.models import Post
+from fixtures.images import image_upload
+
+
+@pytest.fixture
+def post_data(published_category, published_location):
+    return {
+        "title": "Пост с картинкой",
+        "text": "Текст",
+        "pub_date": (timezone.now() - timedelta(days=1)).strftime("%Y-%m-%d"),
+        "category": published_category.pk,
+        "location": published_location.pk,
+    }
+
+
+@pytest.mark.django_db
+def test_image_checked_by_header(user, user_client, post_data, monkeypatch):
+    def reopen(field, data):
+        raise AssertionError(
+            "Убедитесь, что форма берёт формат картинки из заголовка, "
+            "прочитанного обработчиком загрузки, и не открывает её снова."
+        )
+
+    monkeypatch.setattr(forms.ImageField, "to_python", reopen)
+    response = user_client.post(
+        "/posts/create/", dict(post_data, image=image_upload((40, 30)))
+    )
+    assert response.status_code == 302
+    post = Post.objects.get(author=user)
+    assert post.image.width == 40
+
+
+@pytest.mark.django_db
+@override_settings(POST_IMAGE_MAX_SIDE=100)
+def test_oversized_image_rejected(user, user_client, post_data):
+    response = user_client.post(
+        "/posts/create/", dict(post_data, image=image_upload((200, 50)))
+    )
+    assert response.status_code == 200
+    assert "image" in response.context["form"].errors, (
+        "Убедитесь, что картинку больше POST_IMAGE_MAX_SIDE форма "
+        "отклоняет с ошибкой."
+    )
+    assert not Post.objects.filter(author=user).exists()
+
+
+@pytest.mark.django_db
+def test_post_form_keeps_csrf_check(user, post_data):
+    client = Client(enforce_csrf_checks=True)
+    client.force_login(user)
+    response = client.post(
+        "/posts/create/", dict(post_data, image=image_upload((40, 30)))
+    )
+    assert response.status_code == 403, (
+        "Убедитесь, что форма поста по-прежнему проверяет CSRF-токен."
+    )